@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Structural anchor index over an enhancement page (HTML + inline JS).
+
+One pass over the page records where things are - line starts, comment
+markers (//, /* */, <!-- -->; the first on each line, with string, template
+and regex literals skipped), function declarations, <script> blocks and
+every non-blank line - with char offset, byte offset and line number. Keys
+are whitespace-normalized, so re-indenting a page does not break anchors.
+
+Patches then target spans by anchor pairs instead of DOTALL regexes:
+
+    index = AnchorIndex.from_file('enhancement_1_quantum_explorer.html')
+    start, end = index.span(comment('Create COLORED BLOCK from ground'),
+                            line('block.position.set(x, -10 + (blockHeight / 2), z);'))
+
+Each lookup is a dict hit plus a bisect (O(log n)); prefix lookups bisect a
+sorted key list. A missing anchor raises AnchorNotFound with the line it was
+searched from and the closest keys that do exist.
+
+Usage (inspect a page):
+    python anchor_index.py enhancement_1_quantum_explorer.html [function|comment|script]
+"""
+
+import bisect
+import difflib
+import re
+import sys
+from dataclasses import dataclass
+
+COMMENT = 'comment'
+FUNCTION = 'function'
+SCRIPT = 'script'
+LINE = 'line'
+
+_FUNCTION_DECL = re.compile(r'(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)\s*\(')
+_FUNCTION_ASSIGN = re.compile(r'(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s+)?(?:function\b|\([^()]*\)\s*=>|[A-Za-z_$][\w$]*\s*=>)')
+
+
+def normalize(text):
+    """Collapse whitespace runs so anchors survive re-indentation."""
+    return ' '.join(text.split())
+
+
+@dataclass(frozen=True)
+class AnchorRef:
+    """What to look for: kind + key, optionally as a key prefix."""
+    kind: str
+    key: str
+    prefix: bool = False
+
+    def __str__(self):
+        return f"{self.kind}{'^' if self.prefix else ''} '{self.key}'"
+
+
+def comment(text, prefix=True):
+    return AnchorRef(COMMENT, normalize(text), prefix)
+
+
+def function(name):
+    return AnchorRef(FUNCTION, name)
+
+
+def line(text, prefix=False):
+    return AnchorRef(LINE, normalize(text), prefix)
+
+
+@dataclass(frozen=True)
+class Anchor:
+    kind: str
+    key: str
+    start: int        # char offset of the anchor
+    end: int          # char offset just past it (end of block for scripts)
+    line: int         # 1-based line number
+    byte_start: int   # byte offset of the anchor in the UTF-8 file
+
+
+class AnchorNotFound(LookupError):
+    """An anchor needed by a patch is not in the page."""
+
+    def __init__(self, ref, after_line=None, source=None, suggestions=()):
+        self.ref = ref
+        self.after_line = after_line
+        self.source = source
+        self.suggestions = list(suggestions)
+        where = f" in {source}" if source else ''
+        after = f" after line {after_line}" if after_line else ''
+        msg = f"anchor {ref} not found{where}{after}"
+        if self.suggestions:
+            msg += '; closest: ' + ' | '.join(repr(s) for s in self.suggestions)
+        super().__init__(msg)
+
+
+_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'in', 'of', 'new', 'delete', 'void', 'throw', 'else',
+                   'do', 'yield', 'await'}
+
+
+class _CommentScanner:
+    """
+    Finds comment markers line by line, left to right. Inside <script> it
+    skips string, template (nested ${...} included) and regex literals, so
+    a '/*' in a regex or a '//' in a URL string is not a comment; <!-- -->
+    in template markup still counts. Outside scripts only <!-- --> and,
+    inside <style>, /* */ comments exist. Block comments, templates and
+    the script state carry over to the next line.
+    """
+
+    def __init__(self):
+        self.js = False          # inside a <script> element
+        self.css = False         # inside a <style> element
+        self.closer = None       # '*/' or '-->' while in a block comment
+        self.template = False    # inside the text of a `template` literal
+        self.braces = []         # open-brace depth of each enclosing ${...}
+
+    def scan(self, body):
+        """(column, text after the marker) of the first comment opened on this line, or None."""
+        first = None
+        lowered = body.lower()
+        prev = ''                # last significant character
+        word = ''                # last identifier, for `return /re/`
+        i, n = 0, len(body)
+        while i < n:
+            if self.closer:
+                end = body.find(self.closer, i)
+                if end == -1:
+                    return first
+                i = end + len(self.closer)
+                self.closer = None
+                continue
+            if self.template:
+                while i < n and body[i] != '`' and not body.startswith('${', i):
+                    if not first and body.startswith('<!--', i):
+                        first = self._comment(body, i, '<!--', '-->')   # markup built in JS
+                    i += 2 if body[i] == '\\' else 1
+                if i >= n:
+                    return first
+                self.template = False
+                if body[i] == '`':
+                    i += 1
+                    prev, word = '`', ''
+                else:
+                    self.braces.append(0)
+                    i += 2
+                    prev, word = '{', ''
+                continue
+
+            c = body[i]
+            if not self.js:
+                if lowered.startswith('<script', i):
+                    close = body.find('>', i)
+                    if close == -1:
+                        return first
+                    self.js = True
+                    i = close + 1
+                    prev, word = '', ''
+                    continue
+                if lowered.startswith('<style', i) or lowered.startswith('</style', i):
+                    self.css = lowered[i + 1] != '/'
+                for marker, closer in (('<!--', '-->'), ('/*', '*/')):
+                    if body.startswith(marker, i) and (marker == '<!--' or self.css):
+                        first = first or self._comment(body, i, marker, closer)
+                        self.closer = closer
+                        i += len(marker)
+                        break
+                else:
+                    i += 1
+                continue
+
+            if lowered.startswith('</script', i):
+                self.js = False
+                continue
+            if body.startswith('//', i):
+                return first or (i, body[i + 2:])
+            if body.startswith('/*', i):
+                first = first or self._comment(body, i, '/*', '*/')
+                self.closer = '*/'
+                i += 2
+            elif c in '"\'':
+                i += 1
+                while i < n and body[i] != c:
+                    i += 2 if body[i] == '\\' else 1
+                i += 1
+                prev, word = c, ''
+            elif c == '`':
+                self.template = True
+                i += 1
+            elif c == '\\':
+                i += 2
+            elif c == '{' and self.braces:
+                self.braces[-1] += 1
+                prev, word = c, ''
+                i += 1
+            elif c == '}' and self.braces:
+                if self.braces[-1]:
+                    self.braces[-1] -= 1
+                    prev, word = c, ''
+                else:
+                    self.braces.pop()
+                    self.template = True
+                i += 1
+            elif c == '/' and (prev == '' or prev in _REGEX_AFTER or word in _REGEX_KEYWORDS):
+                i = self._skip_regex(body, i)
+                prev, word = '/', ''
+            elif c.isspace():
+                i += 1
+            else:
+                if c.isalnum() or c in '_$':
+                    start = i
+                    while i < n and (body[i].isalnum() or body[i] in '_$'):
+                        i += 1
+                    word = body[start:i]
+                    prev = body[i - 1]
+                    continue
+                prev, word = c, ''
+                i += 1
+        return first
+
+    @staticmethod
+    def _comment(body, col, marker, closer):
+        inner = body[col + len(marker):]
+        if closer in inner:
+            inner = inner[:inner.index(closer)]
+        return col, inner
+
+    @staticmethod
+    def _skip_regex(body, i):
+        """Offset just past the regex literal starting at body[i] == '/' (and its flags)."""
+        n = len(body)
+        i += 1
+        in_class = False
+        while i < n:
+            c = body[i]
+            if c == '\\':
+                i += 2
+                continue
+            if c == '[':
+                in_class = True
+            elif c == ']':
+                in_class = False
+            elif c == '/' and not in_class:
+                i += 1
+                while i < n and (body[i].isalnum() or body[i] == '_'):
+                    i += 1
+                return i
+            i += 1
+        return n
+
+
+class AnchorIndex:
+    """Offsets of comments, functions, script blocks and lines in one page."""
+
+    def __init__(self, text, source=None):
+        self.text = text
+        self.source = source
+        self.line_starts = []
+        self._byte_starts = []
+        self._offsets = {}      # (kind, key) -> sorted [start, ...]
+        self._anchors = {}      # (kind, key, start) -> Anchor
+        self._sorted_keys = {}  # kind -> sorted [key, ...] for prefix lookups
+        self._build()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read(), source=path)
+
+    # ============================================
+    # BUILD (single pass over the lines)
+    # ============================================
+
+    def _add(self, kind, key, start, end, line_no, byte_start):
+        anchor = Anchor(kind, key, start, end, line_no, byte_start)
+        self._offsets.setdefault((kind, key), []).append(start)
+        self._anchors[(kind, key, start)] = anchor
+
+    def _build(self):
+        text = self.text
+        pos = 0
+        byte_pos = 0
+        comments = _CommentScanner()
+        script_open = None
+
+        for line_no, raw in enumerate(text.splitlines(keepends=True), 1):
+            self.line_starts.append(pos)
+            self._byte_starts.append(byte_pos)
+            body = raw.rstrip('\r\n')
+            stripped = body.strip()
+
+            def at(col):
+                return pos + col, byte_pos + len(body[:col].encode('utf-8'))
+
+            if stripped:
+                indent = len(body) - len(body.lstrip())
+                start, byte_start = at(indent)
+                self._add(LINE, normalize(stripped), start, pos + len(body.rstrip()), line_no, byte_start)
+
+            # Comment markers: the first one on the line, outside literals
+            found = comments.scan(body)
+            if found:
+                col, inner = found
+                key = normalize(inner.lstrip('*! '))
+                if key:
+                    start, byte_start = at(col)
+                    self._add(COMMENT, key, start, pos + len(body.rstrip()), line_no, byte_start)
+
+            # Function declarations
+            m = _FUNCTION_DECL.search(body) or _FUNCTION_ASSIGN.search(body)
+            if m:
+                start, byte_start = at(m.start())
+                self._add(FUNCTION, m.group(1), start, pos + len(body.rstrip()), line_no, byte_start)
+
+            # <script> blocks
+            lowered = body.lower()
+            search_from = 0
+            if script_open is None and '<script' in lowered:
+                search_from = lowered.index('<script')
+                script_open = at(search_from) + (line_no,)
+            if script_open is not None:
+                close = lowered.find('</script>', search_from)
+                if close != -1:
+                    start, byte_start, open_line = script_open
+                    end = pos + close + len('</script>')
+                    n = len(self._offsets.get((SCRIPT, SCRIPT), ()))
+                    self._add(SCRIPT, SCRIPT, start, end, open_line, byte_start)
+                    self._add(SCRIPT, f'script#{n + 1}', start, end, open_line, byte_start)
+                    script_open = None
+
+            pos += len(raw)
+            byte_pos += len(raw.encode('utf-8'))
+
+        for kind in (COMMENT, FUNCTION, LINE, SCRIPT):
+            self._sorted_keys[kind] = sorted({k for (kd, k) in self._offsets if kd == kind})
+
+    # ============================================
+    # LOOKUPS
+    # ============================================
+
+    def line_of(self, offset):
+        """1-based line number containing char offset."""
+        return bisect.bisect_right(self.line_starts, offset)
+
+    def byte_offset(self, offset):
+        """UTF-8 byte offset of char offset."""
+        i = self.line_of(offset) - 1
+        start = self.line_starts[i]
+        return self._byte_starts[i] + len(self.text[start:offset].encode('utf-8'))
+
+    def anchors(self, kind):
+        """Every anchor of one kind, in file order."""
+        found = [self._anchors[(kind, key, s)]
+                 for key in self._sorted_keys.get(kind, ())
+                 for s in self._offsets[(kind, key)]]
+        return sorted(found, key=lambda a: a.start)
+
+    def _keys_for(self, ref):
+        if not ref.prefix:
+            return [ref.key] if (ref.kind, ref.key) in self._offsets else []
+        keys = self._sorted_keys.get(ref.kind, [])
+        lo = bisect.bisect_left(keys, ref.key)
+        hi = bisect.bisect_left(keys, ref.key + '\uffff')
+        return keys[lo:hi]
+
+    def find(self, ref, after=0):
+        """First anchor matching ref at or after char offset `after`."""
+        best = None
+        for key in self._keys_for(ref):
+            starts = self._offsets[(ref.kind, key)]
+            i = bisect.bisect_left(starts, after)
+            if i < len(starts) and (best is None or starts[i] < best.start):
+                best = self._anchors[(ref.kind, key, starts[i])]
+        if best is None:
+            candidates = self._sorted_keys.get(ref.kind, [])
+            suggestions = difflib.get_close_matches(ref.key, candidates, n=3, cutoff=0.6)
+            raise AnchorNotFound(ref, self.line_of(after) if after else None, self.source, suggestions)
+        return best
+
+    def span(self, start_ref, end_ref, after=0, include_end=True):
+        """
+        (start, end) char offsets from start_ref to the first end_ref after it.
+
+        With include_end the span runs through the end anchor, otherwise it
+        stops where the end anchor begins.
+        """
+        first = self.find(start_ref, after)
+        last = self.find(end_ref, first.end)
+        return first.start, (last.end if include_end else last.start)
+
+    def spans(self, start_ref, end_ref, after=0, include_end=True):
+        """Every non-overlapping span(start_ref, end_ref) in file order; [] if there is none."""
+        found = []
+        while True:
+            try:
+                start, end = self.span(start_ref, end_ref, after, include_end)
+            except AnchorNotFound:
+                return found
+            found.append((start, end))
+            after = max(end, start + 1)
+
+    def replace_span(self, start_ref, end_ref, new_text, after=0, include_end=True):
+        """Return the page text with the anchored span replaced by new_text."""
+        start, end = self.span(start_ref, end_ref, after, include_end)
+        return self.text[:start] + new_text + self.text[end:]
+
+    def replace_spans(self, start_ref, end_ref, new_text, after=0, include_end=True):
+        """
+        Return the page text with every anchored span replaced by new_text,
+        like re.sub over the page. Raises AnchorNotFound when there is none.
+        """
+        found = self.spans(start_ref, end_ref, after, include_end)
+        if not found:
+            self.span(start_ref, end_ref, after, include_end)   # raises with suggestions
+        parts, pos = [], 0
+        for start, end in found:
+            parts += [self.text[pos:start], new_text]
+            pos = end
+        return ''.join(parts) + self.text[pos:]
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args:
+        print(__doc__)
+        return 2
+    index = AnchorIndex.from_file(args[0])
+    kinds = args[1:] or [SCRIPT, FUNCTION]
+    for kind in kinds:
+        for anchor in index.anchors(kind):
+            if kind == SCRIPT and anchor.key == SCRIPT:
+                continue
+            print(f"{anchor.line:>6}  {anchor.byte_start:>9}  {kind:<8} {anchor.key[:80]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,6 +14,7 @@ class DataImporter {
         this.dataManager = null;
         this.scoringEngine = null;
         this.validationRules = this.initializeValidationRules();
+        this.lastImportStats = null;
     }
 
     /**
@@ -41,6 +42,7 @@ class DataImporter {
             const mapping = columnMapping || this.autoDetectColumns(data[0]);
 
             const properties = [];
+            const rows = [];
             const errors = [];
 
             // Skip header row
@@ -51,6 +53,7 @@ class DataImporter {
 
                     if (validation.isValid) {
                         properties.push(property);
+                        rows.push(i);
                     } else {
                         errors.push({
                             row: i + 1,
@@ -69,13 +72,18 @@ class DataImporter {
 
             // Import valid properties
             const imported = await this.importProperties(properties);
+            this.lastImportStats.errors.forEach(failure => {
+                const i = rows[failure.index];
+                errors.push({ row: i + 1, data: data[i], error: failure.error });
+            });
 
             return {
                 success: true,
                 imported: imported.length,
                 total: data.length - 1,
                 errors: errors,
-                properties: imported
+                properties: imported,
+                stats: this.lastImportStats
             };
 
         } catch (error) {
@@ -267,45 +275,107 @@ class DataImporter {
 
     /**
      * Import from JSON file
+     *
+     * Streams the file through readJSONItems (json-item-stream.js), so a
+     * multi-GB exportAllData file is never held in memory. Without that
+     * script the file is read whole and parsed with JSON.parse. Records are
+     * normalized and validated as they arrive and handed to importProperties
+     * every `batchSize` records, sharing one PropertyDeduper index. Records of
+     * an exportAllData envelope are stored as exported (no normalization),
+     * other stores go straight to dataManager.bulkWrite.
+     *
+     * @param {File|Blob|string} file
+     * @param {Object} options - { batchSize, previewLimit, onProgress }
      */
-    async importFromJSON(file) {
-        try {
-            const text = await this.readFile(file);
-            const data = JSON.parse(text);
+    async importFromJSON(file, options = {}) {
+        const { batchSize = 1000, previewLimit = 100, onProgress = null } = options;
 
-            const properties = Array.isArray(data) ? data : [data];
-            const results = [];
+        try {
+            const deduper = typeof PropertyDeduper !== 'undefined'
+                ? new PropertyDeduper(await this.dataManager.getAllProperties())
+                : null;
+            const storeNames = new Set(Object.values(this.dataManager.stores));
             const errors = [];
+            const preview = [];
+            let stats = null;
+            let total = 0;
+            let imported = 0;
+            let pending = [];
+            let pendingIndex = [];      // record index of each pending property
+            const otherStores = {};
+
+            const flushProperties = async () => {
+                if (!pending.length) return;
+                const batch = pending;
+                const indices = pendingIndex;
+                pending = [];
+                pendingIndex = [];
+                const saved = await this.importProperties(batch, { batchSize, dedupe: !!deduper, deduper });
+                imported += saved.length;
+                preview.push(...saved.slice(0, Math.max(0, previewLimit - preview.length)));
+                this.lastImportStats.errors.forEach(failure => {
+                    failure.index = indices[failure.index];
+                    if (errors.length < previewLimit) errors.push({ index: failure.index, error: failure.error });
+                });
+                stats = this.mergeImportStats(stats, this.lastImportStats);
+                if (onProgress) onProgress({ current: total, imported });
+            };
 
-            for (let i = 0; i < properties.length; i++) {
-                try {
-                    const property = this.normalizeJSONProperty(properties[i]);
-                    const validation = this.validateProperty(property);
+            const flushStore = async (storeName) => {
+                const records = otherStores[storeName];
+                if (!records || !records.length) return;
+                otherStores[storeName] = [];
+                await this.dataManager.bulkWrite(storeName, records);
+            };
 
-                    if (validation.isValid) {
-                        results.push(property);
-                    } else {
-                        errors.push({
-                            index: i,
-                            errors: validation.errors
-                        });
+            const source = typeof readJSONItems !== 'undefined'
+                ? readJSONItems(file)
+                : [this.parseJSONItems(typeof file === 'string' ? file : await this.readFile(file))];
+
+            for await (const items of source) {
+                for (const { section, value } of items) {
+                    const index = total++;
+
+                    if (section !== null && section !== 'properties') {
+                        // exportAllData envelope: clients, portfolios, alerts, ...
+                        if (!storeNames.has(section)) continue;
+                        (otherStores[section] = otherStores[section] || []).push(value);
+                        if (otherStores[section].length >= batchSize) await flushStore(section);
+                        continue;
                     }
-                } catch (error) {
-                    errors.push({
-                        index: i,
-                        error: error.message
-                    });
+
+                    try {
+                        // Exported store records go back as they were; anything else is mapped
+                        const property = section === 'properties' && value.property_id
+                            ? value
+                            : this.normalizeJSONProperty(value);
+                        const validation = section === 'properties' && value.property_id
+                            ? { isValid: true }
+                            : this.validateProperty(property);
+
+                        if (validation.isValid) {
+                            pending.push(property);
+                            pendingIndex.push(index);
+                        } else if (errors.length < previewLimit) {
+                            errors.push({ index, errors: validation.errors });
+                        }
+                    } catch (error) {
+                        if (errors.length < previewLimit) errors.push({ index, error: error.message });
+                    }
+                    if (pending.length >= batchSize) await flushProperties();
                 }
             }
-
-            const imported = await this.importProperties(results);
+            await flushProperties();
+            for (const storeName of Object.keys(otherStores)) await flushStore(storeName);
+            this.lastImportStats = stats;
 
             return {
                 success: true,
-                imported: imported.length,
-                total: properties.length,
+                imported,
+                total,
                 errors: errors,
-                properties: imported
+                properties: preview,
+                stats
             };
 
         } catch (error) {
@@ -317,6 +387,42 @@ class DataImporter {
         }
     }
 
+    /**
+     * The { section, value } records readJSONItems would yield, from parsed text
+     */
+    parseJSONItems(text) {
+        const data = JSON.parse(text);
+        if (Array.isArray(data)) return data.map(value => ({ section: null, value }));
+        if (data && Array.isArray(data.properties)) {
+            return data.properties.map(value => ({ section: 'properties', value }));
+        }
+        if (data && data.data && typeof data.data === 'object') {
+            return Object.entries(data.data)
+                .filter(([, records]) => Array.isArray(records))
+                .flatMap(([section, records]) => records.map(value => ({ section, value })));
+        }
+        return [{ section: null, value: data }];
+    }
+
+    /**
+     * Sum two importProperties stats objects (streamed imports run several)
+     */
+    mergeImportStats(total, stats) {
+        if (!total) return stats ? JSON.parse(JSON.stringify(stats)) : null;
+        if (!stats) return total;
+        for (const [key, value] of Object.entries(stats)) {
+            if (key === 'timings') {
+                for (const [stage, ms] of Object.entries(value)) total.timings[stage] = (total.timings[stage] || 0) + ms;
+            } else if (typeof value === 'number') {
+                total[key] = (total[key] || 0) + value;
+            } else if (Array.isArray(value)) {
+                total[key] = (total[key] || []).concat(value);
+            }
+        }
+        total.propertiesPerSecond = total.seconds > 0 ? total.imported / total.seconds : 0;
+        return total;
+    }
+
     /**
      * Normalize JSON property to internal format
      */
@@ -1116,9 +1222,11 @@ class DataImporter {
         // Calculate quality score
         let qualityScore = 100;
 
-        if (!property.basic.city) qualityScore -= 5;
-        if (!property.basic.state) qualityScore -= 5;
-        if (!property.basic.zipCode) qualityScore -= 5;
+        // City/state/ZIP live under location (basic never has them)
+        const location = property.location || {};
+        if (!location.city) qualityScore -= 5;
+        if (!location.state) qualityScore -= 5;
+        if (!location.zipCode) qualityScore -= 5;
         if (!property.basic.bedrooms) qualityScore -= 10;
         if (!property.basic.bathrooms) qualityScore -= 10;
         if (!property.basic.squareFeet) qualityScore -= 15;
@@ -1154,31 +1262,190 @@ class DataImporter {
 
     /**
      * Import properties to database
+     *
+     * Runs in batches of `batchSize`: validate, transform (ids/timestamps),
+     * dedupe against the store (PropertyDeduper: insert / update / unchanged),
+     * score the rows that changed, then write them in one IndexedDB
+     * transaction via dataManager.bulkWrite. Unchanged rows are not written.
+     * A row whose write fails (duplicate MLS number, uncloneable value,
+     * invalid key) is skipped without aborting the rest of its batch and
+     * listed in stats.errors as { index, property_id, error }, index being
+     * its position in `properties`. The write of one batch overlaps the
+     * scoring of the next. Per-stage timings and throughput are kept in
+     * this.lastImportStats.
+     *
+     * @param {Array} properties - Properties in the importer's shape (basic/financial/location)
+     * @param {Object} options - { batchSize, validate, dedupe, deduper, profile, onProgress }
+     * @returns {Promise<Array>} Inserted and updated properties with their ids
      */
-    async importProperties(properties) {
+    async importProperties(properties, options = {}) {
+        const {
+            batchSize = 1000,
+            validate = false,     // importFromCSV/JSON validate while mapping rows
+            dedupe = typeof PropertyDeduper !== 'undefined',
+            profile = 'balanced',
+            onProgress = null
+        } = options;
+
+        const stats = {
+            total: properties.length,
+            imported: 0,
+            inserted: 0,
+            updated: 0,
+            unchanged: 0,
+            invalid: 0,
+            failed: 0,
+            batches: 0,
+            errors: [],
+            timings: { validate: 0, transform: 0, dedupe: 0, score: 0, write: 0 },
+            seconds: 0,
+            propertiesPerSecond: 0
+        };
+        const started = performance.now();
         const imported = [];
+        const storeName = this.dataManager.stores.properties;
+        let pendingWrite = null;
+
+        let deduper = options.deduper || null;
+        if (dedupe && !deduper) {
+            const t0 = performance.now();
+            deduper = new PropertyDeduper(await this.dataManager.getAllProperties());
+            stats.timings.dedupe += performance.now() - t0;
+        }
 
-        for (let property of properties) {
-            try {
-                // Add to database
-                const id = await this.dataManager.addProperty(property);
+        const time = (stage, fn) => {
+            const t0 = performance.now();
+            const result = fn();
+            stats.timings[stage] += performance.now() - t0;
+            return result;
+        };
 
-                // Calculate score
-                if (this.scoringEngine) {
-                    const score = await this.scoringEngine.calculatePropertyScore(id);
-                    await this.dataManager.updateProperty(id, { score: score });
+        const finishWrite = async () => {
+            if (!pendingWrite) return;
+            const { promise, batch, positions, updates, failures } = pendingWrite;
+            pendingWrite = null;
+            let failed;
+            try {
+                await promise;
+                failed = new Map(failures.map(failure => [failure.index, failure.error]));
+            } catch (error) {
+                // The transaction itself failed (quota, closed database): nothing was written
+                console.error('Failed to import batch:', error);
+                failed = new Map(batch.map((_, i) => [i, error]));
+            }
+            batch.forEach((property, i) => {
+                if (failed.has(i)) {
+                    const error = failed.get(i);
+                    stats.failed++;
+                    stats.errors.push({ index: positions[i], property_id: property.property_id, error: error?.message || String(error) });
+                    // The deduper indexed the row as stored: point it back at what is
+                    if (deduper) {
+                        deduper.unindex(property);
+                        if (updates.has(i)) deduper.index(updates.get(i));
+                    }
+                    return;
                 }
+                imported.push({ ...property, id: property.property_id });
+                this.dataManager.notifyPropertyChange(property.property_id, updates.has(i) ? 'update' : 'add');
+                stats.imported++;
+                if (updates.has(i)) stats.updated++;
+                else stats.inserted++;
+            });
+            if (onProgress) {
+                onProgress({
+                    current: stats.imported + stats.unchanged + stats.invalid + stats.failed,
+                    total: stats.total
+                });
+            }
+        };
 
-                imported.push({ ...property, id: id });
+        for (let start = 0; start < properties.length; start += batchSize) {
+            let batch = properties.slice(start, start + batchSize);
+            const position = new Map(batch.map((property, i) => [property, start + i]));
 
-            } catch (error) {
-                console.error('Failed to import property:', error);
+            if (validate) {
+                batch = time('validate', () => batch.filter(property => {
+                    const valid = this.validateProperty(property).isValid;
+                    if (!valid) stats.invalid++;
+                    return valid;
+                }));
+            }
+
+            time('transform', () => {
+                const now = Date.now();
+                batch.forEach(property => {
+                    if (!property.property_id) property.property_id = this.dataManager.generateUUID();
+                    if (!property.created_at) property.created_at = now;
+                    property.updated_at = now;
+                });
+            });
+
+            // Position in the batch -> stored property it overwrites
+            let updates = new Map();
+            let positions = batch.map(property => position.get(property));
+            if (deduper) {
+                batch = time('dedupe', () => {
+                    const { insert, update, unchanged } = deduper.classify(batch);
+                    stats.unchanged += unchanged.length;
+                    updates = new Map(update.map((entry, i) => [insert.length + i, entry.previous]));
+                    positions = [...insert, ...update.map(entry => entry.source)].map(property => position.get(property));
+                    return [...insert, ...update.map(entry => entry.property)];
+                });
+            }
+
+            if (this.scoringEngine) {
+                time('score', () => this.scoreForImport(batch, profile));
+            }
+
+            // Let the previous transaction finish before queueing the next one
+            const t0 = performance.now();
+            await finishWrite();
+            if (batch.length) {
+                const failures = [];
+                pendingWrite = {
+                    promise: this.dataManager.bulkWrite(storeName, batch, [], { failures }),
+                    batch, positions, updates, failures
+                };
             }
+            stats.timings.write += performance.now() - t0;
+            stats.batches++;
         }
 
+        const t0 = performance.now();
+        await finishWrite();
+        stats.timings.write += performance.now() - t0;
+
+        stats.seconds = (performance.now() - started) / 1000;
+        stats.propertiesPerSecond = stats.seconds > 0 ? stats.imported / stats.seconds : 0;
+        this.lastImportStats = stats;
         return imported;
     }
 
+    /**
+     * Attach a compact score (no per-variable breakdown) to each property
+     */
+    scoreForImport(properties, profile = 'balanced') {
+        // SharedDataAdapter maps the importer's shape to what calculateScore reads
+        const inputs = typeof sharedDataAdapter !== 'undefined'
+            ? properties.map(property => sharedDataAdapter.transformForScoring(property))
+            : properties;
+        const results = this.scoringEngine.calculateScores(inputs, profile);
+        const scoredAt = Date.now();
+
+        properties.forEach((property, i) => {
+            const by_category = {};
+            for (const [category, data] of Object.entries(results[i].by_category)) {
+                by_category[category] = data.score;
+            }
+            property.score = {
+                profile,
+                overall: results[i].overall,
+                by_category,
+                scored_at: scoredAt
+            };
+        });
+    }
+
     /**
      * Batch import from multiple URLs
      */
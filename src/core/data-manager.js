@@ -6,10 +6,147 @@
  * @version 1.0.0
  */
 
+const AGGREGATES_VERSION = 1;
+const PRICE_HISTOGRAM_EDGES = [0, 100000, 200000, 300000, 400000, 500000, 750000,
+    1000000, 1500000, 2000000, 3000000, 5000000];
+
+// store -> { group name: record => group key }
+const AGGREGATE_GROUPS = {
+    properties: {
+        byStatus: p => p.status?.current ?? p.status,
+        byCity: p => p.address?.city ?? p.location?.city,
+        byType: p => p.property_type
+    },
+    alerts: {
+        bySeverity: a => a.severity,
+        byType: a => a.type,
+        byRead: a => (a.read ? 'read' : 'unread')
+    },
+    clients: { byStatus: c => c.status, byType: c => c.type },
+    portfolios: { byStatus: p => p.status },
+    showings: { byStatus: s => s.status }
+};
+
+/**
+ * Counts, group counts and price sums/histogram per store, maintained by
+ * applying (old record, new record) pairs on every write
+ */
+class StoreAggregates {
+    constructor(storeNames, data = null) {
+        this.storeNames = storeNames;
+        this.data = data || StoreAggregates.empty(storeNames);
+    }
+
+    static empty(storeNames) {
+        const data = { version: AGGREGATES_VERSION, counts: {}, groups: {} };
+        storeNames.forEach(name => {
+            data.counts[name] = 0;
+            data.groups[name] = {};
+            Object.keys(AGGREGATE_GROUPS[name] || {}).forEach(group => {
+                data.groups[name][group] = {};
+            });
+        });
+        data.price = { count: 0, sum: 0, histogram: PRICE_HISTOGRAM_EDGES.map(() => 0) };
+        return data;
+    }
+
+    static groupKey(value) {
+        if (typeof value === 'string') return value || null;
+        return typeof value === 'number' && Number.isFinite(value) ? String(value) : null;
+    }
+
+    static propertyPrice(property) {
+        const price = property.price?.current ?? property.financial?.listingPrice ?? property.price;
+        return typeof price === 'number' && Number.isFinite(price) && price > 0 ? price : null;
+    }
+
+    static priceBucket(price) {
+        let bucket = 0;
+        while (bucket + 1 < PRICE_HISTOGRAM_EDGES.length && price >= PRICE_HISTOGRAM_EDGES[bucket + 1]) bucket++;
+        return bucket;
+    }
+
+    add(storeName, record, sign) {
+        const { data } = this;
+        data.counts[storeName] += sign;
+
+        for (const [group, keyOf] of Object.entries(AGGREGATE_GROUPS[storeName] || {})) {
+            const key = StoreAggregates.groupKey(keyOf(record));
+            if (key === null) continue;
+            const counts = data.groups[storeName][group];
+            counts[key] = (counts[key] || 0) + sign;
+            if (counts[key] === 0) delete counts[key];
+        }
+
+        if (storeName === 'properties') {
+            const price = StoreAggregates.propertyPrice(record);
+            if (price !== null) {
+                data.price.count += sign;
+                data.price.sum += sign * price;
+                data.price.histogram[StoreAggregates.priceBucket(price)] += sign;
+            }
+        }
+    }
+
+    /**
+     * Account for one write: previous and next are undefined for insert / delete
+     */
+    apply(storeName, previous, next) {
+        if (!(storeName in this.data.counts)) return;
+        if (previous) this.add(storeName, previous, -1);
+        if (next) this.add(storeName, next, 1);
+    }
+
+    clearStore(storeName) {
+        const fresh = StoreAggregates.empty([storeName]);
+        this.data.counts[storeName] = 0;
+        this.data.groups[storeName] = fresh.groups[storeName];
+        if (storeName === 'properties') this.data.price = fresh.price;
+    }
+
+    /**
+     * [path, maintained, actual] for every value that differs from `other`
+     */
+    diff(other) {
+        const differences = [];
+        const walk = (a, b, path) => {
+            if (typeof a === 'object' && a && typeof b === 'object' && b) {
+                new Set([...Object.keys(a), ...Object.keys(b)]).forEach(key => walk(a[key], b[key], `${path}.${key}`));
+            } else if (typeof a === 'number' && typeof b === 'number') {
+                if (Math.abs(a - b) > 1e-6 * Math.max(1, Math.abs(b))) differences.push([path.slice(1), a, b]);
+            } else if ((a ?? 0) !== (b ?? 0)) {
+                differences.push([path.slice(1), a, b]);
+            }
+        };
+        walk(this.data, other.data, '');
+        return differences;
+    }
+
+    /**
+     * Plain-object view for dashboards
+     */
+    summary() {
+        const { counts, groups, price } = this.data;
+        return {
+            counts: { ...counts },
+            groups: JSON.parse(JSON.stringify(groups)),
+            price: {
+                count: price.count,
+                sum: price.sum,
+                mean: price.count ? price.sum / price.count : 0,
+                histogram: PRICE_HISTOGRAM_EDGES.map((low, i) => ({
+                    low, high: PRICE_HISTOGRAM_EDGES[i + 1] ?? null, count: price.histogram[i]
+                }))
+            },
+            unreadAlerts: groups.alerts?.byRead?.unread || 0
+        };
+    }
+}
+
 class DataManager {
     constructor() {
         this.dbName = 'CLUES_Quantum_DB';
-        this.version = 1;
+        this.version = 3;
         this.db = null;
 
         // Object store names matching schema
@@ -22,6 +159,22 @@ class DataManager {
             marketData: 'market_data',
             userSettings: 'user_settings'
         };
+
+        // Derived-data caches: kept out of this.stores so exportAllData,
+        // importData and getStats only ever see real records
+        this.cacheStores = {
+            scoreCache: 'score_cache',
+            statsCache: 'stats_cache'
+        };
+
+        // StoreAggregates, persisted in stats_cache inside every write transaction
+        this.aggregates = null;
+
+        // Callbacks fired with (propertyId, action) when a property changes
+        this.propertyListeners = [];
+
+        // SpatialIndex over property coordinates, built on the first geo query
+        this.spatialIndex = null;
     }
 
     /**
@@ -37,9 +190,15 @@ class DataManager {
                 reject(request.error);
             };
 
-            request.onsuccess = (event) => {
+            request.onsuccess = async (event) => {
                 this.db = event.target.result;
                 console.log('✅ IndexedDB initialized successfully');
+                try {
+                    await this.loadAggregates();
+                } catch (error) {
+                    reject(error);
+                    return;
+                }
                 resolve(this.db);
             };
 
@@ -139,6 +298,26 @@ class DataManager {
                     console.log('✅ User Settings store created');
                 }
 
+                // SCORE_CACHE store (v2)
+                if (!db.objectStoreNames.contains(this.cacheStores.scoreCache)) {
+                    const cacheStore = db.createObjectStore(this.cacheStores.scoreCache, {
+                        keyPath: 'key'
+                    });
+
+                    cacheStore.createIndex('property_id', 'property_id', { unique: false });
+
+                    console.log('✅ Score Cache store created');
+                }
+
+                // STATS_CACHE store (v3)
+                if (!db.objectStoreNames.contains(this.cacheStores.statsCache)) {
+                    db.createObjectStore(this.cacheStores.statsCache, {
+                        keyPath: 'key'
+                    });
+
+                    console.log('✅ Stats Cache store created');
+                }
+
                 console.log('✅ Database schema upgrade complete');
             };
         });
@@ -148,30 +327,16 @@ class DataManager {
      * Generic add method
      */
     async add(storeName, data) {
-        const transaction = this.db.transaction([storeName], 'readwrite');
-        const store = transaction.objectStore(storeName);
-
-        return new Promise((resolve, reject) => {
-            const request = store.add(data);
-
-            request.onsuccess = () => resolve(request.result);
-            request.onerror = () => reject(request.error);
-        });
+        const [key] = await this.writeRecords(storeName, [data], [], { addOnly: true });
+        return key;
     }
 
     /**
      * Generic update method (put)
      */
     async update(storeName, data) {
-        const transaction = this.db.transaction([storeName], 'readwrite');
-        const store = transaction.objectStore(storeName);
-
-        return new Promise((resolve, reject) => {
-            const request = store.put(data);
-
-            request.onsuccess = () => resolve(request.result);
-            request.onerror = () => reject(request.error);
-        });
+        const [key] = await this.writeRecords(storeName, [data], []);
+        return key;
     }
 
     /**
@@ -193,15 +358,8 @@ class DataManager {
      * Generic delete by key
      */
     async delete(storeName, key) {
-        const transaction = this.db.transaction([storeName], 'readwrite');
-        const store = transaction.objectStore(storeName);
-
-        return new Promise((resolve, reject) => {
-            const request = store.delete(key);
-
-            request.onsuccess = () => resolve(true);
-            request.onerror = () => reject(request.error);
-        });
+        await this.writeRecords(storeName, [], [key]);
+        return true;
     }
 
     /**
@@ -247,32 +405,225 @@ class DataManager {
      * Bulk add with transaction
      */
     async bulkAdd(storeName, dataArray) {
-        const transaction = this.db.transaction([storeName], 'readwrite');
+        return this.writeRecords(storeName, dataArray, [], { addOnly: true });
+    }
+
+    /**
+     * Bulk put and delete in a single transaction.
+     * `options.failures`: collect per-record failures instead of aborting (see writeRecords)
+     */
+    async bulkWrite(storeName, putArray = [], deleteKeys = [], options = {}) {
+        const keys = await this.writeRecords(storeName, putArray, deleteKeys, options);
+        if (storeName === this.stores.properties && this.spatialIndex) {
+            putArray.forEach((property, i) => {
+                if (keys[i] !== undefined) this.spatialIndex.set(property);
+            });
+            const failedDeletes = new Set((options.failures || [])
+                .filter(failure => failure.index === undefined).map(failure => failure.key));
+            deleteKeys.forEach(key => {
+                if (!failedDeletes.has(key)) this.spatialIndex.delete(key);
+            });
+        }
+        return true;
+    }
+
+    /**
+     * Put (or add) and delete records in one transaction. For the stores in
+     * this.stores the previous version of each record is read first, and the
+     * stored aggregates record is read, adjusted and written back in the same
+     * transaction, so it commits or rolls back with the data and never
+     * overwrites another tab's writes. this.aggregates caches the committed
+     * record. A failed write aborts the transaction; the promise rejects with
+     * that write's error. With a `failures` array the failed write is skipped
+     * instead, pushed there as { index, key, error } (index into `puts`,
+     * undefined for a delete), and the other writes commit.
+     * @param {Object} options - { addOnly, failures }
+     * @returns {Promise<Array>} Keys of the written records, once committed
+     */
+    writeRecords(storeName, puts = [], deletes = [], options = {}) {
+        const { addOnly = false, failures = null } = options;
+        const tracked = this.aggregates !== null && Object.values(this.stores).includes(storeName);
+        const scope = tracked ? [storeName, this.cacheStores.statsCache] : [storeName];
+        const transaction = this.db.transaction(scope, 'readwrite');
         const store = transaction.objectStore(storeName);
+        const keyPath = store.keyPath;
+        const keys = [];
+        let failure = null;
+        let aborted = false;
+        let aggregates = null;
+
+        const abort = (error) => {
+            failure = failure || error;
+            if (aborted) return;
+            aborted = true;
+            transaction.abort();
+        };
+        const skip = (op, error) => {
+            failures.push({ index: op.slot, key: op.key, error });
+        };
 
-        const promises = dataArray.map(data => {
-            return new Promise((resolve, reject) => {
-                const request = store.add(data);
-                request.onsuccess = () => resolve(request.result);
-                request.onerror = () => reject(request.error);
+        // done(succeeded) runs once the write has settled
+        const write = (op, done) => {
+            let request;
+            try {
+                request = op.next === undefined ? store.delete(op.key)
+                    : addOnly ? store.add(op.next) : store.put(op.next);
+            } catch (error) {
+                // DataCloneError and DataError are thrown, not reported on a request
+                if (!failures) {
+                    abort(error);
+                    return;
+                }
+                skip(op, error);
+                done(false);
+                return;
+            }
+            request.onsuccess = () => {
+                if (op.slot !== undefined) keys[op.slot] = request.result;
+                done(true);
+            };
+            request.onerror = (event) => {
+                if (failures) {
+                    // Handled: the transaction carries on without this write
+                    event.preventDefault();
+                    skip(op, request.error);
+                } else {
+                    failure = failure || request.error;
+                }
+                done(false);
+            };
+        };
+
+        const ops = [
+            ...puts.map((next, slot) => ({ key: next[keyPath], next, slot })),
+            ...deletes.map(key => ({ key, next: undefined }))
+        ];
+
+        if (!tracked) {
+            ops.forEach(op => write(op, () => {}));
+        } else {
+            // Requests run in the order they are placed, so the aggregates
+            // record is read before any of the writes below complete
+            const statsStore = transaction.objectStore(this.cacheStores.statsCache);
+            this.readStoredAggregates(statsStore, stored => {
+                aggregates = stored;
             });
+
+            let outstanding = ops.length;
+            const settled = () => {
+                if (--outstanding === 0) statsStore.put({ key: 'aggregates', ...aggregates.data });
+            };
+
+            // Writes to one key apply in order on top of the stored record;
+            // only the first write per key needs to read it
+            const byKey = new Map();
+            ops.forEach(op => {
+                if (op.key === undefined) {
+                    byKey.set(Symbol('generated key'), [op]);
+                } else if (byKey.has(op.key)) {
+                    byKey.get(op.key).push(op);
+                } else {
+                    byKey.set(op.key, [op]);
+                }
+            });
+
+            const writeChain = (chain, stored) => {
+                let current = stored;
+                chain.forEach(op => write(op, succeeded => {
+                    if (succeeded) {
+                        aggregates.apply(storeName, current, op.next);
+                        current = op.next;
+                    }
+                    settled();
+                }));
+            };
+            for (const [key, chain] of byKey) {
+                if (typeof key === 'symbol') {
+                    writeChain(chain, undefined);
+                    continue;
+                }
+                let request;
+                try {
+                    request = store.get(key);
+                } catch (error) {
+                    // An invalid key: none of its writes can succeed
+                    if (!failures) {
+                        abort(error);
+                        break;
+                    }
+                    chain.forEach(op => skip(op, error));
+                    // Still synchronous, so nothing has completed yet
+                    outstanding -= chain.length;
+                    continue;
+                }
+                request.onsuccess = () => writeChain(chain, request.result);
+            }
+        }
+
+        return new Promise((resolve, reject) => {
+            transaction.oncomplete = () => {
+                if (aggregates) this.aggregates = aggregates;
+                resolve(keys);
+            };
+            transaction.onabort = () => {
+                // The persisted aggregates rolled back with the data: reload them
+                if (tracked) this.loadAggregates().catch(error => console.error('Reloading aggregates failed:', error));
+                reject(failure || transaction.error);
+            };
         });
+    }
 
-        return Promise.all(promises);
+    /**
+     * Read the aggregates record in a readwrite transaction: fn gets it as a
+     * StoreAggregates (a copy of this.aggregates if none is stored yet)
+     */
+    readStoredAggregates(statsStore, fn) {
+        const request = statsStore.get('aggregates');
+        request.onsuccess = () => {
+            const stored = request.result;
+            if (stored && stored.version === AGGREGATES_VERSION) {
+                const { key, ...data } = stored;
+                fn(new StoreAggregates(Object.values(this.stores), data));
+            } else {
+                fn(new StoreAggregates(Object.values(this.stores), JSON.parse(JSON.stringify(this.aggregates.data))));
+            }
+        };
     }
 
     /**
      * Clear all data from a store
      */
     async clear(storeName) {
-        const transaction = this.db.transaction([storeName], 'readwrite');
+        const tracked = this.aggregates !== null && Object.values(this.stores).includes(storeName);
+        const scope = tracked ? [storeName, this.cacheStores.statsCache] : [storeName];
+        const transaction = this.db.transaction(scope, 'readwrite');
         const store = transaction.objectStore(storeName);
+        let aggregates = null;
+
+        store.clear();
+        if (tracked) {
+            // Adjust the stored record, not this tab's copy of it
+            const statsStore = transaction.objectStore(this.cacheStores.statsCache);
+            this.readStoredAggregates(statsStore, stored => {
+                aggregates = stored;
+                aggregates.clearStore(storeName);
+                statsStore.put({ key: 'aggregates', ...aggregates.data });
+            });
+        }
 
         return new Promise((resolve, reject) => {
-            const request = store.clear();
-
-            request.onsuccess = () => resolve(true);
-            request.onerror = () => reject(request.error);
+            transaction.oncomplete = () => {
+                if (aggregates) this.aggregates = aggregates;
+                if (storeName === this.stores.properties) {
+                    this.spatialIndex?.clear();
+                    this.notifyPropertyChange(null, 'clear');
+                }
+                resolve(true);
+            };
+            transaction.onabort = () => {
+                if (tracked) this.loadAggregates().catch(error => console.error('Reloading aggregates failed:', error));
+                reject(transaction.error);
+            };
         });
     }
 
@@ -303,12 +654,18 @@ class DataManager {
         }
         property.updated_at = Date.now();
 
-        return this.add(this.stores.properties, property);
+        const result = await this.add(this.stores.properties, property);
+        this.spatialIndex?.set(property);
+        this.notifyPropertyChange(property.property_id, 'add');
+        return result;
     }
 
     async updateProperty(property) {
         property.updated_at = Date.now();
-        return this.update(this.stores.properties, property);
+        const result = await this.update(this.stores.properties, property);
+        this.spatialIndex?.set(property);
+        this.notifyPropertyChange(property.property_id, 'update');
+        return result;
     }
 
     async getProperty(propertyId) {
@@ -320,7 +677,29 @@ class DataManager {
     }
 
     async deleteProperty(propertyId) {
-        return this.delete(this.stores.properties, propertyId);
+        const result = await this.delete(this.stores.properties, propertyId);
+        this.spatialIndex?.delete(propertyId);
+        this.notifyPropertyChange(propertyId, 'delete');
+        return result;
+    }
+
+    /**
+     * Register a callback for property changes: fn(propertyId, action),
+     * action is 'add' | 'update' | 'delete' | 'clear' | 'import'
+     * (propertyId is null for clear/import)
+     */
+    onPropertyChange(fn) {
+        this.propertyListeners.push(fn);
+    }
+
+    notifyPropertyChange(propertyId, action) {
+        for (const fn of this.propertyListeners) {
+            try {
+                fn(propertyId, action);
+            } catch (error) {
+                console.error('Property change listener failed:', error);
+            }
+        }
     }
 
     async getPropertiesByStatus(status) {
@@ -358,6 +737,44 @@ class DataManager {
         });
     }
 
+    // ===== GEOSPATIAL QUERIES =====
+
+    /**
+     * The SpatialIndex over all stored properties (spatial-index.js).
+     * Built once from the store, then kept current by every property write.
+     */
+    async getSpatialIndex() {
+        if (!this.spatialIndex) {
+            if (typeof SpatialIndex === 'undefined') {
+                throw new Error('Geo queries need core/spatial-index.js');
+            }
+            const properties = await this.getAllProperties();
+            this.spatialIndex = this.spatialIndex || new SpatialIndex().build(properties);
+        }
+        return this.spatialIndex;
+    }
+
+    /**
+     * Properties within `miles` of a point, nearest first: [{ property, distance }]
+     */
+    async getPropertiesNear(lat, lng, miles) {
+        return (await this.getSpatialIndex()).radius(lat, lng, miles);
+    }
+
+    /**
+     * Properties inside { south, west, north, east } (e.g. a map viewport)
+     */
+    async getPropertiesInBounds(bounds) {
+        return (await this.getSpatialIndex()).bbox(bounds);
+    }
+
+    /**
+     * The k properties nearest a point, optionally within maxMiles: [{ property, distance }]
+     */
+    async getNearestProperties(lat, lng, k = 10, maxMiles = Infinity) {
+        return (await this.getSpatialIndex()).nearest(lat, lng, k, maxMiles);
+    }
+
     // ===== CLIENT-SPECIFIC METHODS =====
 
     async addClient(client) {
@@ -503,21 +920,193 @@ class DataManager {
             }
         }
 
+        if (stores[this.stores.properties]?.length > 0) {
+            stores[this.stores.properties].forEach(property => this.spatialIndex?.set(property));
+            this.notifyPropertyChange(null, 'import');
+        }
+
         return true;
     }
 
     /**
-     * Get database statistics
+     * Up to `count` records of a store with keys after `afterKey` (undefined: from the start)
+     * @returns {Promise<{records: Array, lastKey: *}>}
+     */
+    async getPage(storeName, afterKey, count) {
+        const transaction = this.db.transaction([storeName], 'readonly');
+        const store = transaction.objectStore(storeName);
+        const range = afterKey === undefined ? null : IDBKeyRange.lowerBound(afterKey, true);
+
+        const request = (req) => new Promise((resolve, reject) => {
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => reject(req.error);
+        });
+        const [records, keys] = await Promise.all([
+            request(store.getAll(range, count)),
+            request(store.getAllKeys(range, count))
+        ]);
+        return { records, lastKey: keys[keys.length - 1] };
+    }
+
+    /**
+     * Stream all stores as a compressed binary snapshot (snapshot.js):
+     * yields Uint8Array chunks, reading blockRecords records per transaction
+     */
+    async *exportSnapshot(options = {}) {
+        if (typeof writeSnapshot === 'undefined') {
+            throw new Error('Snapshots need core/snapshot.js');
+        }
+        const { blockRecords } = { ...SNAPSHOT_DEFAULTS, ...options };
+        const storeNames = Object.values(this.stores);
+        const keyPaths = {};
+        const transaction = this.db.transaction(storeNames, 'readonly');
+        storeNames.forEach(name => {
+            keyPaths[name] = transaction.objectStore(name).keyPath;
+        });
+
+        const manager = this;
+        async function* sections() {
+            for (const store of storeNames) {
+                let afterKey;
+                for (;;) {
+                    const page = await manager.getPage(store, afterKey, blockRecords);
+                    if (page.records.length) yield { store, records: page.records };
+                    if (page.records.length < blockRecords) break;
+                    afterKey = page.lastKey;
+                }
+            }
+        }
+
+        const header = {
+            db: this.dbName,
+            db_version: this.version,
+            stores: storeNames.map(name => ({ name, keyPath: keyPaths[name] }))
+        };
+        yield* writeSnapshot(header, sections(), options);
+    }
+
+    /**
+     * Restore a snapshot. The whole file is verified first (verifySnapshot),
+     * so a truncated or corrupt file throws before any store is cleared or
+     * written. Then each block is written with one bulkWrite while the next
+     * blocks decompress. `clear: true` empties the snapshot's stores first.
+     * @param {Blob|File|ReadableStream|ArrayBuffer|Uint8Array} source - a
+     *        ReadableStream is read into a Blob, since it is read twice
+     * @returns {Promise<Object>} Records written per store
+     */
+    async importSnapshot(source, options = {}) {
+        if (typeof readSnapshot === 'undefined') {
+            throw new Error('Snapshots need core/snapshot.js');
+        }
+        const { clear = false } = options;
+        const written = {};
+        let pendingWrite = null;
+
+        if (typeof source.getReader === 'function') source = await new Response(source).blob();
+        const { header } = await verifySnapshot(source, options);
+        for (const { name } of header.stores) {
+            if (!Object.values(this.stores).includes(name)) {
+                throw new Error(`Snapshot store "${name}" does not exist in this database`);
+            }
+        }
+
+        for await (const block of readSnapshot(source, options)) {
+            if (block.header) {
+                for (const { name } of block.header.stores) {
+                    written[name] = 0;
+                    if (clear) await this.clear(name);
+                }
+                continue;
+            }
+            if (pendingWrite) await pendingWrite;
+            pendingWrite = this.bulkWrite(block.store, block.records);
+            written[block.store] += block.records.length;
+        }
+        if (pendingWrite) await pendingWrite;
+
+        if (written[this.stores.properties] > 0) {
+            this.notifyPropertyChange(null, 'import');
+        }
+        return written;
+    }
+
+    /**
+     * Get database statistics (record counts per store, from the maintained aggregates)
      */
     async getStats() {
+        const aggregates = this.aggregates ? await this.loadAggregates() : null;
         const stats = {};
 
         for (const [key, storeName] of Object.entries(this.stores)) {
-            stats[key] = await this.count(storeName);
+            stats[key] = aggregates ? aggregates.data.counts[storeName] : await this.count(storeName);
         }
 
         return stats;
     }
+
+    /**
+     * Maintained aggregates: counts, group counts (status, city, type,
+     * severity, ...), price sum/mean/histogram and unread alerts. O(1) in
+     * the number of records. Re-read from stats_cache first, since another
+     * tab may have written since this one last did.
+     */
+    async getAggregates() {
+        return (await this.loadAggregates()).summary();
+    }
+
+    /**
+     * Aggregates by reading every store (the slow path they replace)
+     */
+    async computeAggregates() {
+        const storeNames = Object.values(this.stores);
+        const aggregates = new StoreAggregates(storeNames);
+        for (const storeName of storeNames) {
+            let afterKey;
+            for (;;) {
+                const page = await this.getPage(storeName, afterKey, 5000);
+                page.records.forEach(record => aggregates.apply(storeName, undefined, record));
+                if (page.records.length < 5000) break;
+                afterKey = page.lastKey;
+            }
+        }
+        return aggregates;
+    }
+
+    /**
+     * Load the persisted aggregates, recomputing them when missing or outdated
+     */
+    async loadAggregates() {
+        const stored = await this.get(this.cacheStores.statsCache, 'aggregates');
+        const storeNames = Object.values(this.stores);
+        if (stored && stored.version === AGGREGATES_VERSION) {
+            const { key, ...data } = stored;
+            this.aggregates = new StoreAggregates(storeNames, data);
+            return this.aggregates;
+        }
+
+        console.log('🔧 Computing store aggregates...');
+        this.aggregates = null;
+        const aggregates = await this.computeAggregates();
+        await this.update(this.cacheStores.statsCache, { key: 'aggregates', ...aggregates.data });
+        this.aggregates = aggregates;
+        return aggregates;
+    }
+
+    /**
+     * Check the maintained aggregates against a full recompute.
+     * `repair: true` replaces them with the recomputed values.
+     * @returns {Promise<{ok: boolean, differences: Array}>} differences are [path, maintained, actual]
+     */
+    async verifyStats({ repair = false } = {}) {
+        await this.loadAggregates();
+        const actual = await this.computeAggregates();
+        const differences = this.aggregates.diff(actual);
+        if (differences.length && repair) {
+            this.aggregates = actual;
+            await this.writeRecords(this.cacheStores.statsCache, [{ key: 'aggregates', ...actual.data }]);
+        }
+        return { ok: differences.length === 0, differences };
+    }
 }
 
 // Create singleton instance
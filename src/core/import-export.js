@@ -279,8 +279,15 @@ class ImportExportHandler {
 
     /**
      * Import properties from JSON file
+     *
+     * With json-item-stream.js loaded the file is read record by record and
+     * imported per chunk; otherwise it is parsed whole.
      */
     async importJSON(file) {
+        if (typeof readJSONItems !== 'undefined' && typeof file.stream === 'function') {
+            return this.importJSONStream(file);
+        }
+
         return new Promise((resolve, reject) => {
             const reader = new FileReader();
 
@@ -312,6 +319,28 @@ class ImportExportHandler {
         });
     }
 
+    /**
+     * Streamed importJSON: only the records of one chunk are held at a time
+     */
+    async importJSONStream(file) {
+        const results = { total: 0, succeeded: 0, failed: 0, errors: [] };
+
+        for await (const items of readJSONItems(file)) {
+            const properties = items
+                .filter(item => item.section === null || item.section === 'properties')
+                .map(item => item.value);
+            if (!properties.length) continue;
+
+            const chunk = await this.importProperties(properties);
+            results.total += chunk.total;
+            results.succeeded += chunk.succeeded;
+            results.failed += chunk.failed;
+            results.errors.push(...chunk.errors);
+        }
+
+        return results;
+    }
+
     /**
      * Import array of property objects
      */
@@ -403,6 +432,22 @@ class ImportExportHandler {
         return JSON.stringify(exportData, null, 2);
     }
 
+    /**
+     * Export all stores as a compressed binary snapshot (snapshot.js)
+     */
+    async exportToSnapshot(options = {}) {
+        const chunks = [];
+        for await (const chunk of this.dataManager.exportSnapshot(options)) chunks.push(chunk);
+        return new Blob(chunks, { type: 'application/octet-stream' });
+    }
+
+    /**
+     * Restore a snapshot file written by exportToSnapshot
+     */
+    async importSnapshot(file, options = {}) {
+        return this.dataManager.importSnapshot(file, options);
+    }
+
     /**
      * Download file helper
      */
@@ -435,6 +480,15 @@ class ImportExportHandler {
         const filename = `clues_backup_${Date.now()}.json`;
         this.downloadFile(json, filename, 'application/json');
     }
+
+    /**
+     * Export and download a binary snapshot
+     */
+    async downloadSnapshot() {
+        const snapshot = await this.exportToSnapshot();
+        const filename = `clues_backup_${Date.now()}.cluesnap`;
+        this.downloadFile(snapshot, filename, 'application/octet-stream');
+    }
 }
 
 // Export for use in other modules
@@ -0,0 +1,253 @@
+/**
+ * CLUES™ Quantum Property Intelligence System
+ * Incremental Weighted Scorer
+ * Keeps per-category partial sums so weight changes rescore in O(N)
+ *
+ * Every overall score in the app has the form
+ *
+ *     overall = Σ_c m_c · W_c · S_c  /  Σ_c m_c · W_c
+ *
+ * where S_c is a property's category score, W_c the category's base weight
+ * (1 for the weight slider's percentages, Σ variable weights for
+ * calculateScore) and m_c the user's multiplier for that category. The
+ * scorer stores P_c = W_c · S_c per property and one running numerator per
+ * property, so moving one slider is a single multiply-add per property,
+ * and sensitivities come from the closed-form gradient instead of rescoring.
+ *
+ * @version 1.0.0
+ */
+
+class IncrementalScorer {
+    /**
+     * @param {Array<string>} categories - Category ids, in column order
+     * @param {Object} options - { baseWeights: {category: W_c}, weights: {category: m_c} }
+     */
+    constructor(categories, options = {}) {
+        this.categories = [...categories];
+        this.categoryIndex = {};
+        this.categories.forEach((id, c) => { this.categoryIndex[id] = c; });
+
+        const C = this.categories.length;
+        this.baseWeights = new Float64Array(C).fill(1);
+        this.weights = new Float64Array(C).fill(1);
+        Object.entries(options.baseWeights || {}).forEach(([id, w]) => this.setBaseWeight(id, w));
+        Object.entries(options.weights || {}).forEach(([id, m]) => {
+            if (id in this.categoryIndex) this.weights[this.categoryIndex[id]] = m;
+        });
+
+        this.count = 0;
+        this.partials = new Float64Array(0);     // N x C, row-major: W_c · S_c
+        this.numerators = new Float64Array(0);   // N: Σ_c m_c · P_c
+        this.denominator = 0;                    // Σ_c m_c · W_c
+        this.updatesSinceRebuild = 0;
+
+        // Re-sum from scratch every so often so float drift cannot build up
+        this.rebuildEvery = options.rebuildEvery || 1000;
+    }
+
+    setBaseWeight(categoryId, weight) {
+        if (categoryId in this.categoryIndex) {
+            this.baseWeights[this.categoryIndex[categoryId]] = weight;
+        }
+    }
+
+    /**
+     * Load N properties' category scores
+     * @param {Array} items - Anything; scoresOf(item) returns {category: S_c}
+     * @param {Function} scoresOf - Category score lookup (missing -> 0)
+     */
+    load(items, scoresOf) {
+        const N = items.length;
+        const C = this.categories.length;
+        this.count = N;
+        this.partials = new Float64Array(N * C);
+        this.numerators = new Float64Array(N);
+
+        for (let i = 0; i < N; i++) {
+            const scores = scoresOf(items[i]) || {};
+            const row = i * C;
+            for (let c = 0; c < C; c++) {
+                this.partials[row + c] = (Number(scores[this.categories[c]]) || 0) * this.baseWeights[c];
+            }
+        }
+        this.rebuild();
+    }
+
+    /**
+     * Replace one property's category scores (e.g. after an edit)
+     */
+    updateRow(i, scores) {
+        const C = this.categories.length;
+        const row = i * C;
+        let numerator = 0;
+        for (let c = 0; c < C; c++) {
+            const partial = (Number(scores[this.categories[c]]) || 0) * this.baseWeights[c];
+            this.partials[row + c] = partial;
+            numerator += this.weights[c] * partial;
+        }
+        this.numerators[i] = numerator;
+    }
+
+    /**
+     * Recompute every numerator and the denominator from the partial sums
+     */
+    rebuild() {
+        const N = this.count;
+        const C = this.categories.length;
+        const { partials, weights, numerators } = this;
+
+        for (let i = 0; i < N; i++) {
+            const row = i * C;
+            let numerator = 0;
+            for (let c = 0; c < C; c++) {
+                numerator += weights[c] * partials[row + c];
+            }
+            numerators[i] = numerator;
+        }
+
+        this.denominator = 0;
+        for (let c = 0; c < C; c++) {
+            this.denominator += weights[c] * this.baseWeights[c];
+        }
+        this.updatesSinceRebuild = 0;
+    }
+
+    /**
+     * Change one category multiplier: numerator_i += Δm · P_ic for every i
+     */
+    setWeight(categoryId, weight) {
+        const c = this.categoryIndex[categoryId];
+        if (c === undefined) return;
+
+        const delta = weight - this.weights[c];
+        if (delta === 0) return;
+        this.weights[c] = weight;
+
+        if (++this.updatesSinceRebuild >= this.rebuildEvery) {
+            this.rebuild();
+            return;
+        }
+
+        const N = this.count;
+        const C = this.categories.length;
+        const { partials, numerators } = this;
+        for (let i = 0, p = c; i < N; i++, p += C) {
+            numerators[i] += delta * partials[p];
+        }
+        this.denominator += delta * this.baseWeights[c];
+    }
+
+    /**
+     * Set several multipliers at once ({category: m_c}); one rebuild when many change
+     */
+    setWeights(weights) {
+        const changed = Object.keys(weights).filter(id =>
+            id in this.categoryIndex && this.weights[this.categoryIndex[id]] !== weights[id]);
+        if (changed.length > 1) {
+            changed.forEach(id => { this.weights[this.categoryIndex[id]] = weights[id]; });
+            this.rebuild();
+        } else {
+            changed.forEach(id => this.setWeight(id, weights[id]));
+        }
+    }
+
+    score(i) {
+        return this.denominator > 0 ? this.numerators[i] / this.denominator : 0;
+    }
+
+    /**
+     * All overall scores as a Float64Array
+     */
+    scores() {
+        const out = new Float64Array(this.count);
+        if (this.denominator > 0) {
+            const inv = 1 / this.denominator;
+            for (let i = 0; i < this.count; i++) out[i] = this.numerators[i] * inv;
+        }
+        return out;
+    }
+
+    /**
+     * Index of the highest-scoring property (first one on ties), -1 when empty
+     */
+    topIndex() {
+        let best = -1;
+        let bestValue = -Infinity;
+        for (let i = 0; i < this.count; i++) {
+            if (this.numerators[i] > bestValue) {
+                bestValue = this.numerators[i];
+                best = i;
+            }
+        }
+        return best;
+    }
+
+    /**
+     * Exact gradient of property i's score w.r.t. each category multiplier:
+     * ∂score/∂m_c = (P_ic − score_i · W_c) / Σ m·W
+     */
+    gradient(i = this.topIndex()) {
+        const gradient = {};
+        if (i < 0 || this.denominator <= 0) return gradient;
+
+        const C = this.categories.length;
+        const score = this.score(i);
+        for (let c = 0; c < C; c++) {
+            gradient[this.categories[c]] =
+                (this.partials[i * C + c] - score * this.baseWeights[c]) / this.denominator;
+        }
+        return gradient;
+    }
+
+    /**
+     * Exact change of the top score if each category multiplier alone moved by
+     * `delta` (the top property may change). One pass over N for all categories.
+     */
+    topScoreDeltas(delta) {
+        const C = this.categories.length;
+        const current = this.count > 0 ? this.score(this.topIndex()) : 0;
+        const best = new Float64Array(C).fill(-Infinity);
+        const denominators = new Float64Array(C);
+        for (let c = 0; c < C; c++) {
+            denominators[c] = this.denominator + delta * this.baseWeights[c];
+        }
+
+        const { partials, numerators } = this;
+        for (let i = 0; i < this.count; i++) {
+            const row = i * C;
+            const numerator = numerators[i];
+            for (let c = 0; c < C; c++) {
+                const shifted = numerator + delta * partials[row + c];
+                if (shifted > best[c]) best[c] = shifted;
+            }
+        }
+
+        const deltas = {};
+        for (let c = 0; c < C; c++) {
+            const top = this.count > 0 && denominators[c] > 0 ? best[c] / denominators[c] : 0;
+            deltas[this.categories[c]] = top - current;
+        }
+        return deltas;
+    }
+
+    /**
+     * Property indexes ordered by score, best first (at most `limit`)
+     */
+    rankedIndices(limit = this.count) {
+        // Bounded heap from ranking-index.js when loaded: O(n log k) instead of a full sort
+        if (limit < this.count && typeof topKIndices === 'function') {
+            return topKIndices(this.numerators, limit, this.count);
+        }
+
+        const order = new Uint32Array(this.count);
+        for (let i = 0; i < this.count; i++) order[i] = i;
+        const numerators = this.numerators;
+        order.sort((a, b) => numerators[b] - numerators[a] || a - b);
+        return order.subarray(0, Math.min(limit, this.count));
+    }
+}
+
+// Export for use in other modules
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = IncrementalScorer;
+}
@@ -0,0 +1,198 @@
+/**
+ * CLUES™ Quantum Property Intelligence System
+ * JSON Item Stream
+ * Reads the records of a JSON export one at a time, without loading the file
+ *
+ * Accepts the two layouts the app produces:
+ *   [ {...}, {...} ]                                   - a top-level array
+ *   { "version": 1, "data": { "properties": [...] } }  - DataManager.exportAllData
+ * plus { "properties": [...] } from ImportExportHandler, and a single
+ * top-level property object (importFromJSON's old behavior). The scanner tracks
+ * only nesting depth, string/escape state and the keys above the record
+ * arrays. Each record's text is cut out and handed to JSON.parse, so memory
+ * holds one chunk plus one partial record, whatever the file size.
+ *
+ * @version 1.0.0
+ */
+
+const JSON_CHAR = {
+    QUOTE: 34, BACKSLASH: 92, COLON: 58,
+    OPEN_BRACE: 123, CLOSE_BRACE: 125, OPEN_BRACKET: 91, CLOSE_BRACKET: 93
+};
+
+class JSONItemStream {
+    constructor() {
+        this.depth = 0;
+        this.containers = [];     // container char per depth (1-based)
+        this.keys = [];           // last object key per depth
+        this.inString = false;
+        this.escape = false;
+
+        this.lastString = '';     // last string seen outside a record (key candidate)
+        this.stringStart = -1;
+        this.stringPartial = '';
+
+        this.inItem = false;
+        this.itemDepth = 0;
+        this.itemStart = -1;
+        this.itemPartial = '';
+        this.itemSection = null;
+
+        // A top-level object is kept as one record until a record array shows up inside it
+        this.topStart = -1;
+        this.topPartial = null;
+
+        this.items = 0;
+    }
+
+    /**
+     * Section a record at this depth belongs to, or undefined if it is not a record
+     *   top-level array            -> null
+     *   { properties: [...] }      -> 'properties'
+     *   { data: { store: [...] } } -> store
+     */
+    sectionAt(depth) {
+        if (this.containers[depth] !== JSON_CHAR.OPEN_BRACKET) return undefined;
+        if (depth === 1) return null;
+        if (depth === 2 && this.keys[1] === 'properties') return 'properties';
+        if (depth === 3 && this.keys[1] === 'data') return this.keys[2];
+        return undefined;
+    }
+
+    /**
+     * Scan one text chunk; returns [{ section, value }] for every record completed in it
+     */
+    push(chunk) {
+        const out = [];
+        const n = chunk.length;
+        let backslash = -1;       // next backslash at or after i (n if none), found lazily
+
+        for (let i = 0; i < n; i++) {
+            const c = chunk.charCodeAt(i);
+
+            if (this.inString) {
+                if (this.escape) {
+                    this.escape = false;
+                } else if (c === JSON_CHAR.BACKSLASH) {
+                    this.escape = true;
+                } else if (c === JSON_CHAR.QUOTE) {
+                    this.inString = false;
+                    if (!this.inItem) {
+                        this.lastString = JSON.parse('"' + this.stringPartial + chunk.slice(this.stringStart, i) + '"');
+                        this.stringPartial = '';
+                    }
+                } else if (this.inItem) {
+                    // Skip ahead to the next quote or backslash inside record strings
+                    if (backslash < i) {
+                        backslash = chunk.indexOf('\\', i);
+                        if (backslash === -1) backslash = n;
+                    }
+                    let quote = chunk.indexOf('"', i);
+                    if (quote === -1) quote = n;
+                    i = Math.min(quote, backslash) - 1;
+                }
+                continue;
+            }
+
+            if (c === JSON_CHAR.QUOTE) {
+                this.inString = true;
+                if (!this.inItem) this.stringStart = i + 1;
+            } else if (c === JSON_CHAR.OPEN_BRACE || c === JSON_CHAR.OPEN_BRACKET) {
+                if (!this.inItem && c === JSON_CHAR.OPEN_BRACE) {
+                    if (this.depth === 0) {
+                        this.topStart = i;
+                        this.topPartial = '';
+                    }
+                    const section = this.sectionAt(this.depth);
+                    if (section !== undefined) {
+                        this.topPartial = null;
+                        this.inItem = true;
+                        this.itemDepth = this.depth;
+                        this.itemStart = i;
+                        this.itemSection = section;
+                    }
+                }
+                this.depth++;
+                if (!this.inItem) {
+                    this.containers[this.depth] = c;
+                    this.keys[this.depth] = undefined;
+                }
+            } else if (c === JSON_CHAR.CLOSE_BRACE || c === JSON_CHAR.CLOSE_BRACKET) {
+                this.depth--;
+                if (this.depth < 0) throw new Error('Unbalanced JSON: unexpected closing bracket');
+                if (this.inItem && this.depth === this.itemDepth) {
+                    const text = this.itemPartial + chunk.slice(this.itemStart, i + 1);
+                    out.push({ section: this.itemSection, value: JSON.parse(text) });
+                    this.items++;
+                    this.inItem = false;
+                    this.itemPartial = '';
+                } else if (this.depth === 0 && this.topPartial !== null) {
+                    const text = this.topPartial + chunk.slice(this.topStart, i + 1);
+                    out.push({ section: null, value: JSON.parse(text) });
+                    this.items++;
+                    this.topPartial = null;
+                }
+            } else if (c === JSON_CHAR.COLON && !this.inItem) {
+                this.keys[this.depth] = this.lastString;
+                if (this.depth === 1 && (this.lastString === 'data' || this.lastString === 'properties')) {
+                    this.topPartial = null;     // an export envelope, not a single record
+                }
+            }
+        }
+
+        // Carry unfinished record / key text over to the next chunk
+        if (this.inItem) {
+            this.itemPartial += chunk.slice(this.itemStart);
+            this.itemStart = 0;
+        }
+        if (this.topPartial !== null && this.depth > 0) {
+            this.topPartial += chunk.slice(this.topStart);
+            this.topStart = 0;
+        }
+        if (this.inString && !this.inItem) {
+            this.stringPartial += chunk.slice(this.stringStart);
+            this.stringStart = 0;
+        }
+        return out;
+    }
+
+    end() {
+        if (this.inItem || this.inString || this.depth !== 0) {
+            throw new Error('Unexpected end of JSON input');
+        }
+    }
+}
+
+/**
+ * Records of a JSON export, chunk by chunk: yields arrays of { section, value }
+ * @param {Blob|File|ReadableStream|string} source
+ */
+async function* readJSONItems(source) {
+    const scanner = new JSONItemStream();
+
+    if (typeof source === 'string') {
+        yield scanner.push(source);
+        scanner.end();
+        return;
+    }
+
+    const stream = typeof source.stream === 'function' ? source.stream() : source;
+    const reader = stream.pipeThrough(new TextDecoderStream()).getReader();
+    try {
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            const items = scanner.push(value);
+            if (items.length) yield items;
+        }
+    } finally {
+        reader.releaseLock();
+    }
+    scanner.end();
+}
+
+// Export for use in other modules
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = JSONItemStream;
+    module.exports.readJSONItems = readJSONItems;
+}
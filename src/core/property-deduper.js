@@ -0,0 +1,142 @@
+/**
+ * CLUES™ Quantum Property Intelligence System
+ * Property Deduper
+ * Classifies incoming properties as insert / update / unchanged before import
+ *
+ * Builds two hash indexes over the stored properties: MLS number and a
+ * normalized street + 5-digit ZIP key. Each incoming property is looked up
+ * by MLS number first, then by address. A match becomes an update carrying
+ * the list of changed field paths, or unchanged when nothing but
+ * bookkeeping differs. Properties accepted from the current import are
+ * indexed as they are classified, so a feed that lists the same home twice
+ * yields one insert and one update instead of two records.
+ *
+ * @version 1.0.0
+ */
+
+// Fields that differ on every import of the same listing
+const DEDUPE_IGNORED_FIELDS = new Set([
+    'id', 'property_id', 'created_at', 'updated_at', 'importDate', 'source', 'score', 'qualityScore'
+]);
+
+const STREET_ABBREVIATIONS = {
+    street: 'st', avenue: 'ave', boulevard: 'blvd', drive: 'dr', road: 'rd', lane: 'ln',
+    court: 'ct', place: 'pl', terrace: 'ter', circle: 'cir', parkway: 'pkwy', highway: 'hwy',
+    north: 'n', south: 's', east: 'e', west: 'w', apartment: 'apt', suite: 'ste', unit: 'apt'
+};
+
+class PropertyDeduper {
+    /**
+     * @param {Array} existing - Stored properties (any shape the app uses)
+     */
+    constructor(existing = []) {
+        this.byMLS = new Map();
+        this.byAddress = new Map();
+        existing.forEach(property => this.index(property));
+    }
+
+    static mlsKey(property) {
+        const mls = property.mls_number || property.basic?.mlsNumber;
+        return mls ? String(mls).trim().toUpperCase() : null;
+    }
+
+    static addressKey(property) {
+        const street = property.basic?.address || property.address?.street;
+        const zip = property.location?.zipCode || property.address?.zip;
+        if (!street || !zip) return null;
+
+        const normalized = String(street).toLowerCase()
+            .replace(/[.,#]/g, ' ')
+            .split(/\s+/)
+            .filter(Boolean)
+            .map(word => STREET_ABBREVIATIONS[word] || word)
+            .join(' ');
+        return normalized + '|' + String(zip).trim().slice(0, 5);
+    }
+
+    index(property) {
+        const mls = PropertyDeduper.mlsKey(property);
+        const address = PropertyDeduper.addressKey(property);
+        if (mls) this.byMLS.set(mls, property);
+        if (address) this.byAddress.set(address, property);
+    }
+
+    unindex(property) {
+        const mls = PropertyDeduper.mlsKey(property);
+        const address = PropertyDeduper.addressKey(property);
+        if (mls && this.byMLS.get(mls) === property) this.byMLS.delete(mls);
+        if (address && this.byAddress.get(address) === property) this.byAddress.delete(address);
+    }
+
+    find(property) {
+        const mls = PropertyDeduper.mlsKey(property);
+        if (mls && this.byMLS.has(mls)) return this.byMLS.get(mls);
+        const address = PropertyDeduper.addressKey(property);
+        return address ? this.byAddress.get(address) : undefined;
+    }
+
+    /**
+     * Leaf paths whose values differ between two properties (bookkeeping ignored)
+     */
+    static changedFields(incoming, existing, prefix = '', changes = []) {
+        const keys = new Set([...Object.keys(incoming || {}), ...Object.keys(existing || {})]);
+        for (const key of keys) {
+            if (!prefix && DEDUPE_IGNORED_FIELDS.has(key)) continue;
+            const a = incoming?.[key];
+            const b = existing?.[key];
+            const path = prefix + key;
+            const aObject = a !== null && typeof a === 'object' && !Array.isArray(a);
+            const bObject = b !== null && typeof b === 'object' && !Array.isArray(b);
+
+            if (aObject && bObject) {
+                PropertyDeduper.changedFields(a, b, path + '.', changes);
+            } else if (Array.isArray(a) || Array.isArray(b)) {
+                if (JSON.stringify(a) !== JSON.stringify(b)) changes.push(path);
+            } else if (a !== b && !(a === undefined && b === null) && !(a === null && b === undefined)) {
+                changes.push(path);
+            }
+        }
+        return changes;
+    }
+
+    /**
+     * Classify a batch. Updates keep the stored property_id/created_at.
+     * @returns {Object} { insert: [property], update: [{ property, previous, changes, source }], unchanged: [property] }
+     *          where source is the incoming property an update was merged from
+     */
+    classify(properties) {
+        const result = { insert: [], update: [], unchanged: [] };
+
+        for (const property of properties) {
+            const existing = this.find(property);
+            if (!existing) {
+                result.insert.push(property);
+                this.index(property);
+                continue;
+            }
+
+            const changes = PropertyDeduper.changedFields(property, existing);
+            if (changes.length === 0) {
+                result.unchanged.push(existing);
+                continue;
+            }
+
+            const merged = {
+                ...existing,
+                ...property,
+                id: existing.id ?? property.id,
+                property_id: existing.property_id,
+                created_at: existing.created_at
+            };
+            this.unindex(existing);
+            this.index(merged);
+            result.update.push({ property: merged, previous: existing, changes, source: property });
+        }
+        return result;
+    }
+}
+
+// Export for use in other modules
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = PropertyDeduper;
+}
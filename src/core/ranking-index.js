@@ -0,0 +1,330 @@
+/**
+ * CLUES™ Quantum Property Intelligence System
+ * Ranking Index
+ * Ordered score index: O(log n) score updates, O(k) top-k, O(log n) rank-of
+ *
+ * RankingIndex is an array-backed treap ordered by (score desc, insertion
+ * slot asc), with subtree sizes, so "top k", "rank of X" and point updates
+ * never need a full sort. ProfileRankings keeps one index per weight
+ * profile. topKIndices is the bounded-heap selection for the case where
+ * every score changes at once (a weight change), where rebuilding an index
+ * would cost more than one O(n log k) pass.
+ *
+ * @version 1.0.0
+ */
+
+const RANKING_NIL = -1;
+
+class RankingIndex {
+    constructor(capacity = 1024) {
+        this.root = RANKING_NIL;
+        this.slots = new Map();      // id -> slot
+        this.ids = [];               // slot -> id
+        this.freeSlots = [];
+        this.allocate(Math.max(16, capacity));
+    }
+
+    allocate(capacity) {
+        const grow = (Type, old) => {
+            const arr = new Type(capacity);
+            if (old) arr.set(old);
+            return arr;
+        };
+        this.score = grow(Float64Array, this.score);
+        this.left = grow(Int32Array, this.left);
+        this.right = grow(Int32Array, this.right);
+        this.size = grow(Int32Array, this.size);
+        this.priority = grow(Float64Array, this.priority);
+        this.capacity = capacity;
+    }
+
+    get count() {
+        return this.slots.size;
+    }
+
+    /**
+     * Build from scratch: [[id, score], ...] or a Map. O(n log n) once.
+     */
+    build(entries) {
+        this.root = RANKING_NIL;
+        this.slots.clear();
+        this.ids = [];
+        this.freeSlots = [];
+
+        const list = [...entries];
+        if (list.length > this.capacity) this.allocate(list.length);
+
+        list.forEach(([id, score], slot) => {
+            this.slots.set(id, slot);
+            this.ids[slot] = id;
+            this.score[slot] = score;
+            this.left[slot] = RANKING_NIL;
+            this.right[slot] = RANKING_NIL;
+            this.size[slot] = 1;
+            this.priority[slot] = Math.random();
+        });
+
+        // Sorted order, then a linear-time Cartesian tree build (treap shape)
+        const order = Array.from(list.keys()).sort((a, b) => this.compare(a, b));
+        const stack = [];
+        for (const node of order) {
+            let last = RANKING_NIL;
+            while (stack.length && this.priority[stack[stack.length - 1]] < this.priority[node]) {
+                last = stack.pop();
+                this.pull(last);
+            }
+            this.left[node] = last;
+            if (stack.length) this.right[stack[stack.length - 1]] = node;
+            stack.push(node);
+        }
+        while (stack.length > 1) this.pull(stack.pop());
+        if (stack.length) {
+            this.pull(stack[0]);
+            this.root = stack[0];
+        }
+        return this;
+    }
+
+    // Negative when slot a ranks above slot b
+    compare(a, b) {
+        return (this.score[b] - this.score[a]) || (a - b);
+    }
+
+    pull(node) {
+        const l = this.left[node], r = this.right[node];
+        this.size[node] = 1 + (l === RANKING_NIL ? 0 : this.size[l]) + (r === RANKING_NIL ? 0 : this.size[r]);
+    }
+
+    // Split t into [ranks above key, key and below]
+    split(t, key) {
+        if (t === RANKING_NIL) return [RANKING_NIL, RANKING_NIL];
+        if (this.compare(t, key) < 0) {
+            const [l, r] = this.split(this.right[t], key);
+            this.right[t] = l;
+            this.pull(t);
+            return [t, r];
+        }
+        const [l, r] = this.split(this.left[t], key);
+        this.left[t] = r;
+        this.pull(t);
+        return [l, t];
+    }
+
+    merge(a, b) {
+        if (a === RANKING_NIL) return b;
+        if (b === RANKING_NIL) return a;
+        if (this.priority[a] > this.priority[b]) {
+            this.right[a] = this.merge(this.right[a], b);
+            this.pull(a);
+            return a;
+        }
+        this.left[b] = this.merge(a, this.left[b]);
+        this.pull(b);
+        return b;
+    }
+
+    insertSlot(slot) {
+        this.left[slot] = RANKING_NIL;
+        this.right[slot] = RANKING_NIL;
+        this.size[slot] = 1;
+        const [l, r] = this.split(this.root, slot);
+        this.root = this.merge(this.merge(l, slot), r);
+    }
+
+    removeSlot(slot) {
+        const [l, rest] = this.split(this.root, slot);
+        // slot is the first node of rest; unlink it by merging its children in
+        this.root = this.merge(l, this.removeFirst(rest));
+    }
+
+    removeFirst(t) {
+        if (this.left[t] === RANKING_NIL) return this.right[t];
+        this.left[t] = this.removeFirst(this.left[t]);
+        this.pull(t);
+        return t;
+    }
+
+    /**
+     * Add or move a property. O(log n)
+     */
+    set(id, score) {
+        let slot = this.slots.get(id);
+        if (slot !== undefined) {
+            if (this.score[slot] === score) return;
+            this.removeSlot(slot);
+        } else {
+            slot = this.freeSlots.length ? this.freeSlots.pop() : this.ids.length;
+            if (slot >= this.capacity) this.allocate(this.capacity * 2);
+            this.slots.set(id, slot);
+            this.ids[slot] = id;
+            this.priority[slot] = Math.random();
+        }
+        this.score[slot] = score;
+        this.insertSlot(slot);
+    }
+
+    delete(id) {
+        const slot = this.slots.get(id);
+        if (slot === undefined) return false;
+        this.removeSlot(slot);
+        this.slots.delete(id);
+        this.ids[slot] = undefined;
+        this.freeSlots.push(slot);
+        return true;
+    }
+
+    has(id) {
+        return this.slots.has(id);
+    }
+
+    scoreOf(id) {
+        const slot = this.slots.get(id);
+        return slot === undefined ? undefined : this.score[slot];
+    }
+
+    /**
+     * 1-based rank of a property (1 = best), or 0 if unknown. O(log n)
+     */
+    rankOf(id) {
+        const slot = this.slots.get(id);
+        if (slot === undefined) return 0;
+
+        let rank = 0;
+        let t = this.root;
+        while (t !== RANKING_NIL) {
+            const order = this.compare(slot, t);
+            const leftSize = this.left[t] === RANKING_NIL ? 0 : this.size[this.left[t]];
+            if (order === 0) return rank + leftSize + 1;
+            if (order < 0) {
+                t = this.left[t];
+            } else {
+                rank += leftSize + 1;
+                t = this.right[t];
+            }
+        }
+        return 0;
+    }
+
+    /**
+     * Best k as [{ id, score, rank }], in order. O(k + log n)
+     */
+    top(k = 10) {
+        const out = [];
+        const stack = [];
+        let t = this.root;
+        while ((t !== RANKING_NIL || stack.length) && out.length < k) {
+            while (t !== RANKING_NIL) {
+                stack.push(t);
+                t = this.left[t];
+            }
+            t = stack.pop();
+            out.push({ id: this.ids[t], score: this.score[t], rank: out.length + 1 });
+            t = this.right[t];
+        }
+        return out;
+    }
+
+    /**
+     * Property at a 1-based rank. O(log n)
+     */
+    atRank(rank) {
+        let t = this.root;
+        while (t !== RANKING_NIL) {
+            const leftSize = this.left[t] === RANKING_NIL ? 0 : this.size[this.left[t]];
+            if (rank === leftSize + 1) return { id: this.ids[t], score: this.score[t], rank };
+            if (rank <= leftSize) {
+                t = this.left[t];
+            } else {
+                rank -= leftSize + 1;
+                t = this.right[t];
+            }
+        }
+        return null;
+    }
+}
+
+/**
+ * One RankingIndex per weight profile
+ */
+class ProfileRankings {
+    constructor() {
+        this.indexes = new Map();
+    }
+
+    for(profile) {
+        if (!this.indexes.has(profile)) {
+            this.indexes.set(profile, new RankingIndex());
+        }
+        return this.indexes.get(profile);
+    }
+
+    /**
+     * Update a property's score under several profiles: { profile: score }
+     */
+    set(id, scoresByProfile) {
+        for (const [profile, score] of Object.entries(scoresByProfile)) {
+            this.for(profile).set(id, score);
+        }
+    }
+
+    delete(id) {
+        this.indexes.forEach(index => index.delete(id));
+    }
+}
+
+/**
+ * Indexes of the k largest values (best first, lower index wins ties), with
+ * a bounded min-heap of size k: O(n log k), no full sort
+ */
+function topKIndices(values, k, count = values.length) {
+    k = Math.min(k, count);
+    if (k <= 0) return new Uint32Array(0);
+
+    const heap = new Uint32Array(k);   // heap[0] = weakest of the current best k
+    const worse = (a, b) => values[a] < values[b] || (values[a] === values[b] && a > b);
+    let size = 0;
+
+    const siftDown = (i) => {
+        for (;;) {
+            const l = 2 * i + 1, r = l + 1;
+            let m = i;
+            if (l < size && worse(heap[l], heap[m])) m = l;
+            if (r < size && worse(heap[r], heap[m])) m = r;
+            if (m === i) return;
+            [heap[i], heap[m]] = [heap[m], heap[i]];
+            i = m;
+        }
+    };
+
+    for (let i = 0; i < count; i++) {
+        if (size < k) {
+            let j = size++;
+            heap[j] = i;
+            while (j > 0) {
+                const p = (j - 1) >> 1;
+                if (!worse(heap[j], heap[p])) break;
+                [heap[j], heap[p]] = [heap[p], heap[j]];
+                j = p;
+            }
+        } else if (worse(heap[0], i)) {
+            heap[0] = i;
+            siftDown(0);
+        }
+    }
+
+    // Pop weakest-first into the back of the result
+    const out = new Uint32Array(k);
+    for (let n = k - 1; n >= 0; n--) {
+        out[n] = heap[0];
+        heap[0] = heap[--size];
+        siftDown(0);
+    }
+    return out;
+}
+
+// Export for use in other modules
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = RankingIndex;
+    module.exports.ProfileRankings = ProfileRankings;
+    module.exports.topKIndices = topKIndices;
+}
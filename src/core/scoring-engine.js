@@ -840,6 +840,9 @@ class ScoringEngine {
             total_weight: 0
         };
 
+        // Every raw value in one pass instead of one mapping build per variable
+        const values = this.getPropertyValues(property);
+
         // Calculate for each category
         for (const [categoryName, variables] of Object.entries(this.VARIABLE_SYSTEM)) {
             let categoryScore = 0;
@@ -848,7 +851,7 @@ class ScoringEngine {
             // Calculate for each variable in category
             for (const [variableName, config] of Object.entries(variables)) {
                 // Get property value
-                const rawValue = this.getPropertyValue(property, variableName);
+                const rawValue = values[variableName];
 
                 // Normalize to 0-100
                 const normalizedValue = this.normalize(rawValue, config.range, config.higher_is_better);
@@ -899,6 +902,52 @@ class ScoringEngine {
         return scores;
     }
 
+    /**
+     * Score many properties at once: overall and category scores only (no
+     * by_variable breakdown). Weights and ranges are resolved once for the
+     * whole batch; results match calculateScore's overall/by_category.
+     * @returns {Array} [{ overall, by_category: {category: {score, weight}}, total_weight }]
+     */
+    calculateScores(properties, weightProfile = 'balanced', customWeights = {}) {
+        const profile = typeof weightProfile === 'string'
+            ? this.WEIGHT_PROFILES[weightProfile]
+            : weightProfile;
+
+        const categories = Object.entries(this.VARIABLE_SYSTEM).map(([categoryName, variables]) => ({
+            name: categoryName,
+            variables: Object.entries(variables).map(([variableName, config]) => ({
+                name: variableName,
+                range: config.range,
+                higher_is_better: config.higher_is_better,
+                weight: (customWeights[variableName] || config.weight) * (profile[categoryName] || 1.0)
+            }))
+        }));
+
+        return properties.map(property => {
+            const values = this.getPropertyValues(property);
+            const scores = { overall: 0, by_category: {}, total_weight: 0 };
+
+            for (const category of categories) {
+                let categoryScore = 0;
+                let categoryWeight = 0;
+                for (const variable of category.variables) {
+                    const normalizedValue = this.normalize(values[variable.name], variable.range, variable.higher_is_better);
+                    categoryScore += normalizedValue * variable.weight;
+                    categoryWeight += variable.weight;
+                }
+                scores.by_category[category.name] = {
+                    score: categoryWeight > 0 ? categoryScore / categoryWeight : 0,
+                    weight: categoryWeight
+                };
+                scores.total_weight += categoryWeight;
+                scores.overall += categoryScore;
+            }
+
+            scores.overall = scores.total_weight > 0 ? scores.overall / scores.total_weight : 0;
+            return scores;
+        });
+    }
+
     /**
      * Normalize a value to 0-100 scale
      */
@@ -925,6 +974,13 @@ class ScoringEngine {
      * Extract property value for a given variable
      */
     getPropertyValue(property, variableName) {
+        return this.getPropertyValues(property)[variableName];
+    }
+
+    /**
+     * Extract every variable's raw value: { variableName: value }
+     */
+    getPropertyValues(property) {
         // Map variable names to property data paths
         const mapping = {
             // Physical
@@ -1044,7 +1100,7 @@ class ScoringEngine {
             showing_availability_score: property.analytics?.variable_values?.showing_availability_score || 70
         };
 
-        return mapping[variableName];
+        return mapping;
     }
 
     /**
@@ -0,0 +1,224 @@
+/**
+ * CLUES™ Quantum Property Intelligence System
+ * Snapshot Format
+ * Chunked, gzip-compressed binary backups of the IndexedDB stores
+ *
+ * Layout (integers little-endian):
+ *   "CLUESNAP", uint32 format version, uint32 schema header length
+ *   schema header JSON: { codec, db, db_version, exported_at, stores: [{ name, keyPath }] }
+ *   blocks, each a 16-byte header + payload:
+ *     uint8 kind (1 = records, 0 = end), uint8 store index, uint16 reserved,
+ *     uint32 record count, uint32 raw length, uint32 payload length
+ *     records: gzip of the JSON array of up to blockRecords records of one store
+ *     end:     uncompressed JSON { stores: { name: record count } }, checked on read
+ *
+ * Blocks are independent, so the writer compresses several at once and the
+ * reader decompresses several at once while keeping file order. Both sides
+ * hold only a window of blocks in memory. Compression runs through the
+ * native CompressionStream, which has no zstd, hence gzip.
+ *
+ * readSnapshot yields blocks before it reaches the trailer, so a truncated
+ * or corrupt file only fails after earlier blocks were handed out. Restores
+ * run verifySnapshot over the whole file first.
+ *
+ * @version 1.0.0
+ */
+
+const SNAPSHOT_MAGIC = 'CLUESNAP';
+const SNAPSHOT_FORMAT = 1;
+const SNAPSHOT_BLOCK_HEADER_BYTES = 16;
+const SNAPSHOT_BLOCK = { END: 0, RECORDS: 1 };
+const SNAPSHOT_DEFAULTS = { blockRecords: 2000, concurrency: 4 };
+
+async function snapshotTransform(bytes, stream) {
+    const piped = new Blob([bytes]).stream().pipeThrough(stream);
+    return new Uint8Array(await new Response(piped).arrayBuffer());
+}
+
+function snapshotBlockHeader(kind, storeIndex, count, rawLength, payloadLength) {
+    const header = new Uint8Array(SNAPSHOT_BLOCK_HEADER_BYTES);
+    const view = new DataView(header.buffer);
+    view.setUint8(0, kind);
+    view.setUint8(1, storeIndex);
+    view.setUint32(4, count, true);
+    view.setUint32(8, rawLength, true);
+    view.setUint32(12, payloadLength, true);
+    return header;
+}
+
+/**
+ * Snapshot file chunks (Uint8Array) for a stream of store sections
+ * @param {Object} header - { db, db_version, stores: [{ name, keyPath }] }
+ * @param {AsyncIterable} sections - { store, records } in any order, a store may repeat
+ */
+async function* writeSnapshot(header, sections, options = {}) {
+    const { concurrency } = { ...SNAPSHOT_DEFAULTS, ...options };
+    const encoder = new TextEncoder();
+    const storeIndex = new Map(header.stores.map((store, i) => [store.name, i]));
+    const counts = Object.fromEntries(header.stores.map(store => [store.name, 0]));
+
+    const schema = encoder.encode(JSON.stringify({
+        codec: 'gzip', exported_at: new Date().toISOString(), ...header
+    }));
+    const preamble = new Uint8Array(16);
+    const view = new DataView(preamble.buffer);
+    preamble.set(encoder.encode(SNAPSHOT_MAGIC));
+    view.setUint32(8, SNAPSHOT_FORMAT, true);
+    view.setUint32(12, schema.length, true);
+    yield preamble;
+    yield schema;
+
+    const compress = async (store, records) => {
+        const raw = encoder.encode(JSON.stringify(records));
+        const payload = await snapshotTransform(raw, new CompressionStream('gzip'));
+        return [snapshotBlockHeader(SNAPSHOT_BLOCK.RECORDS, storeIndex.get(store), records.length,
+            raw.length, payload.length), payload];
+    };
+
+    // Up to `concurrency` blocks compress at once; output keeps input order
+    const pending = [];
+    for await (const { store, records } of sections) {
+        if (!storeIndex.has(store)) throw new Error(`Snapshot header has no store "${store}"`);
+        if (!records.length) continue;
+        counts[store] += records.length;
+        pending.push(compress(store, records));
+        if (pending.length >= concurrency) yield* await pending.shift();
+    }
+    while (pending.length) yield* await pending.shift();
+
+    const trailer = encoder.encode(JSON.stringify({ stores: counts }));
+    const total = Object.values(counts).reduce((sum, n) => sum + n, 0);
+    yield snapshotBlockHeader(SNAPSHOT_BLOCK.END, 0, total, trailer.length, trailer.length);
+    yield trailer;
+}
+
+/**
+ * Exact-length reads over a byte stream
+ */
+class SnapshotByteReader {
+    constructor(stream) {
+        this.reader = stream.getReader();
+        this.chunks = [];
+        this.buffered = 0;
+    }
+
+    async read(length) {
+        while (this.buffered < length) {
+            const { value, done } = await this.reader.read();
+            if (done) throw new Error('Snapshot is truncated');
+            this.chunks.push(value);
+            this.buffered += value.length;
+        }
+        const out = new Uint8Array(length);
+        let filled = 0;
+        while (filled < length) {
+            const chunk = this.chunks[0];
+            const take = Math.min(chunk.length, length - filled);
+            out.set(chunk.subarray(0, take), filled);
+            filled += take;
+            if (take === chunk.length) this.chunks.shift();
+            else this.chunks[0] = chunk.subarray(take);
+        }
+        this.buffered -= length;
+        return out;
+    }
+
+    release() {
+        this.reader.releaseLock();
+    }
+}
+
+/**
+ * Blocks of a snapshot in file order, decompressed up to `concurrency` at a
+ * time. Yields { header } first, then { store, keyPath, records } per block.
+ * @param {Blob|File|ReadableStream|ArrayBuffer|Uint8Array} source
+ */
+async function* readSnapshot(source, options = {}) {
+    const { concurrency } = { ...SNAPSHOT_DEFAULTS, ...options };
+    const decoder = new TextDecoder();
+
+    let stream = source;
+    if (source instanceof ArrayBuffer || ArrayBuffer.isView(source)) stream = new Blob([source]).stream();
+    else if (typeof source.stream === 'function') stream = source.stream();
+
+    const bytes = new SnapshotByteReader(stream);
+    try {
+        const preamble = await bytes.read(16);
+        if (decoder.decode(preamble.subarray(0, 8)) !== SNAPSHOT_MAGIC) {
+            throw new Error('Not a CLUES snapshot');
+        }
+        const view = new DataView(preamble.buffer);
+        const format = view.getUint32(8, true);
+        if (format !== SNAPSHOT_FORMAT) throw new Error(`Unsupported snapshot format ${format}`);
+
+        const header = JSON.parse(decoder.decode(await bytes.read(view.getUint32(12, true))));
+        if (header.codec !== 'gzip') throw new Error(`Unsupported snapshot codec ${header.codec}`);
+        yield { header };
+
+        const counts = Object.fromEntries(header.stores.map(store => [store.name, 0]));
+        const decompress = async (store, count, payload) => {
+            const raw = await snapshotTransform(payload, new DecompressionStream('gzip'));
+            const records = JSON.parse(decoder.decode(raw));
+            if (records.length !== count) throw new Error(`Snapshot block of ${store.name} is corrupt`);
+            return { store: store.name, keyPath: store.keyPath, records };
+        };
+
+        const pending = [];
+        for (;;) {
+            const blockView = new DataView((await bytes.read(SNAPSHOT_BLOCK_HEADER_BYTES)).buffer);
+            const kind = blockView.getUint8(0);
+            const count = blockView.getUint32(4, true);
+            const payload = await bytes.read(blockView.getUint32(12, true));
+
+            if (kind === SNAPSHOT_BLOCK.END) {
+                while (pending.length) yield await pending.shift();
+                const trailer = JSON.parse(decoder.decode(payload));
+                let total = 0;
+                for (const name of Object.keys(counts)) {
+                    const expected = trailer.stores[name];
+                    if (counts[name] !== expected) {
+                        throw new Error(`Snapshot has ${counts[name]} ${name} records, expected ${expected}`);
+                    }
+                    total += expected;
+                }
+                if (total !== count) throw new Error('Snapshot trailer is corrupt');
+                return;
+            }
+
+            const store = header.stores[blockView.getUint8(1)];
+            if (kind !== SNAPSHOT_BLOCK.RECORDS || !store) throw new Error('Snapshot block is corrupt');
+            counts[store.name] += count;
+            pending.push(decompress(store, count, payload));
+            if (pending.length >= concurrency) yield await pending.shift();
+        }
+    } finally {
+        bytes.release();
+    }
+}
+
+/**
+ * Read a whole snapshot without keeping its records: every block is
+ * decompressed and parsed, and the counts are checked against the trailer.
+ * Throws on a truncated or corrupt file.
+ * @returns {Promise<Object>} { header, counts } - records per store
+ */
+async function verifySnapshot(source, options = {}) {
+    let header = null;
+    const counts = {};
+    for await (const block of readSnapshot(source, options)) {
+        if (block.header) {
+            header = block.header;
+            header.stores.forEach(store => {
+                counts[store.name] = 0;
+            });
+            continue;
+        }
+        counts[block.store] += block.records.length;
+    }
+    return { header, counts };
+}
+
+// Export for use in other modules
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = { writeSnapshot, readSnapshot, verifySnapshot, SNAPSHOT_DEFAULTS };
+}
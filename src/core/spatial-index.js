@@ -0,0 +1,308 @@
+/**
+ * CLUES™ Quantum Property Intelligence System
+ * Spatial Index
+ * Grid index over property coordinates: radius, bounding-box and k-nearest queries
+ *
+ * Coordinates are bucketed into fixed lat/lng cells (a geohash-style grid,
+ * about 1.4 miles per side by default). A query visits only the cells its
+ * area overlaps, so its cost follows the number of nearby properties, not
+ * the size of the store. Points are added, moved and removed one at a time,
+ * so DataManager keeps the index current on every property write.
+ *
+ * Distances are great-circle miles.
+ *
+ * @version 1.0.0
+ */
+
+const EARTH_RADIUS_MILES = 3958.8;
+const MILES_PER_DEGREE_LAT = 69.09;
+const DEFAULT_CELL_DEGREES = 0.02;
+
+class SpatialIndex {
+    /**
+     * @param {number} cellDegrees - Grid cell size in degrees
+     */
+    constructor(cellDegrees = DEFAULT_CELL_DEGREES) {
+        this.cellDegrees = cellDegrees;
+        this.columns = Math.ceil(360 / cellDegrees);
+        this.rows = Math.ceil(180 / cellDegrees);
+        this.points = new Map();     // id -> { lat, lng, cell, property }
+        this.cells = new Map();      // cell -> Set of ids
+    }
+
+    get count() {
+        return this.points.size;
+    }
+
+    static idOf(property) {
+        return property.property_id || property.id;
+    }
+
+    /**
+     * { lat, lng } from any of the shapes the app stores, or null
+     */
+    static coordinates(property) {
+        const lat = property.location?.latitude ?? property.location?.lat ??
+            property.address?.latitude ?? property.basic?.coordinates?.latitude ?? property.latitude;
+        const lng = property.location?.longitude ?? property.location?.lng ??
+            property.address?.longitude ?? property.basic?.coordinates?.longitude ?? property.longitude;
+        const latNum = Number(lat);
+        const lngNum = Number(lng);
+        if (lat == null || lng == null || !Number.isFinite(latNum) || !Number.isFinite(lngNum)) return null;
+        // 0,0 is the "unknown" placeholder used across the app
+        if (latNum === 0 && lngNum === 0) return null;
+        if (Math.abs(latNum) > 90 || Math.abs(lngNum) > 180) return null;
+        return { lat: latNum, lng: lngNum };
+    }
+
+    static distanceMiles(lat1, lng1, lat2, lng2) {
+        const toRad = Math.PI / 180;
+        const dLat = (lat2 - lat1) * toRad;
+        const dLng = (lng2 - lng1) * toRad;
+        const a = Math.sin(dLat / 2) ** 2 +
+            Math.cos(lat1 * toRad) * Math.cos(lat2 * toRad) * Math.sin(dLng / 2) ** 2;
+        return 2 * EARTH_RADIUS_MILES * Math.asin(Math.min(1, Math.sqrt(a)));
+    }
+
+    rowOf(lat) {
+        return Math.min(this.rows - 1, Math.max(0, Math.floor((lat + 90) / this.cellDegrees)));
+    }
+
+    columnOf(lng) {
+        return Math.min(this.columns - 1, Math.max(0, Math.floor((lng + 180) / this.cellDegrees)));
+    }
+
+    /**
+     * Index from scratch
+     */
+    build(properties) {
+        this.clear();
+        for (const property of properties) this.set(property);
+        return this;
+    }
+
+    clear() {
+        this.points.clear();
+        this.cells.clear();
+    }
+
+    /**
+     * Add or move a property; one without usable coordinates is removed.
+     * Returns true when the property is indexed.
+     */
+    set(property) {
+        const id = SpatialIndex.idOf(property);
+        if (id == null) return false;
+
+        const coords = SpatialIndex.coordinates(property);
+        if (!coords) {
+            this.delete(id);
+            return false;
+        }
+
+        const cell = this.rowOf(coords.lat) * this.columns + this.columnOf(coords.lng);
+        const previous = this.points.get(id);
+        if (previous && previous.cell !== cell) this.removeFromCell(previous.cell, id);
+        if (!previous || previous.cell !== cell) {
+            if (!this.cells.has(cell)) this.cells.set(cell, new Set());
+            this.cells.get(cell).add(id);
+        }
+        this.points.set(id, { lat: coords.lat, lng: coords.lng, cell, property });
+        return true;
+    }
+
+    delete(id) {
+        const point = this.points.get(id);
+        if (!point) return false;
+        this.removeFromCell(point.cell, id);
+        this.points.delete(id);
+        return true;
+    }
+
+    removeFromCell(cell, id) {
+        const ids = this.cells.get(cell);
+        if (!ids) return;
+        ids.delete(id);
+        if (ids.size === 0) this.cells.delete(cell);
+    }
+
+    /**
+     * Calls fn(point) for every point in cells [row0..row1] x [col0..col1].
+     * Falls back to walking the occupied cells when the window is larger.
+     */
+    forEachInCells(row0, row1, col0, col1, fn) {
+        const visit = ids => {
+            for (const id of ids) fn(this.points.get(id));
+        };
+        if ((row1 - row0 + 1) * (col1 - col0 + 1) > this.cells.size) {
+            for (const [cell, ids] of this.cells) {
+                const row = Math.floor(cell / this.columns);
+                const col = cell - row * this.columns;
+                if (row >= row0 && row <= row1 && col >= col0 && col <= col1) visit(ids);
+            }
+            return;
+        }
+        for (let row = row0; row <= row1; row++) {
+            for (let col = col0; col <= col1; col++) {
+                const ids = this.cells.get(row * this.columns + col);
+                if (ids) visit(ids);
+            }
+        }
+    }
+
+    /**
+     * Properties inside a bounding box. A box with west > east crosses the
+     * antimeridian.
+     */
+    bbox({ south, west, north, east }) {
+        if (west > east) {
+            return [
+                ...this.bbox({ south, west, north, east: 180 }),
+                ...this.bbox({ south, west: -180, north, east })
+            ];
+        }
+        const result = [];
+        this.forEachInCells(this.rowOf(south), this.rowOf(north), this.columnOf(west), this.columnOf(east), point => {
+            if (point.lat >= south && point.lat <= north && point.lng >= west && point.lng <= east) {
+                result.push(point.property);
+            }
+        });
+        return result;
+    }
+
+    /**
+     * Properties within `miles` of a point, nearest first: [{ property, distance }]
+     */
+    radius(lat, lng, miles) {
+        const dLat = miles / MILES_PER_DEGREE_LAT;
+        const cosLat = Math.cos(Math.min(89.9, Math.abs(lat) + dLat) * Math.PI / 180);
+        const dLng = Math.min(180, dLat / Math.max(cosLat, 1e-6));
+
+        const result = [];
+        const collect = point => {
+            const distance = SpatialIndex.distanceMiles(lat, lng, point.lat, point.lng);
+            if (distance <= miles) result.push({ property: point.property, distance });
+        };
+        const row0 = this.rowOf(lat - dLat);
+        const row1 = this.rowOf(lat + dLat);
+        const west = lng - dLng;
+        const east = lng + dLng;
+        if (dLng >= 180) {
+            this.forEachInCells(row0, row1, 0, this.columns - 1, collect);
+        } else if (west < -180) {
+            this.forEachInCells(row0, row1, this.columnOf(west + 360), this.columns - 1, collect);
+            this.forEachInCells(row0, row1, 0, this.columnOf(east), collect);
+        } else if (east > 180) {
+            this.forEachInCells(row0, row1, this.columnOf(west), this.columns - 1, collect);
+            this.forEachInCells(row0, row1, 0, this.columnOf(east - 360), collect);
+        } else {
+            this.forEachInCells(row0, row1, this.columnOf(west), this.columnOf(east), collect);
+        }
+        return result.sort((a, b) => a.distance - b.distance);
+    }
+
+    /**
+     * The k properties nearest a point, nearest first: [{ property, distance }].
+     * Searches rings of cells outward and stops once no unvisited cell can
+     * hold anything closer than the k-th match.
+     */
+    nearest(lat, lng, k = 10, maxMiles = Infinity) {
+        if (k <= 0 || this.points.size === 0) return [];
+
+        const centerRow = this.rowOf(lat);
+        const centerCol = this.columnOf(lng);
+        // Miles covered by one cell step, at the widest latitude the search can reach
+        const rowMiles = this.cellDegrees * MILES_PER_DEGREE_LAT;
+        const maxRing = Math.max(this.rows, this.columns);
+
+        const best = [];
+        const consider = point => {
+            const distance = SpatialIndex.distanceMiles(lat, lng, point.lat, point.lng);
+            if (distance > maxMiles) return;
+            if (best.length === k && distance >= best[k - 1].distance) return;
+            let i = best.length - (best.length === k ? 1 : 0);
+            while (i > 0 && best[i - 1].distance > distance) {
+                best[i] = best[i - 1];
+                i--;
+            }
+            best[i] = { property: point.property, distance };
+        };
+
+        let seen = 0;
+        for (let ring = 0; ring <= maxRing; ring++) {
+            // Anything outside ring-1 is at least (ring - 1) cells away
+            const cosLat = Math.cos(Math.min(89.9, Math.abs(lat) + ring * this.cellDegrees) * Math.PI / 180);
+            const floor = Math.max(0, ring - 1) * rowMiles * Math.min(1, cosLat);
+            if (floor > maxMiles) break;
+            if (best.length === k && floor > best[k - 1].distance) break;
+            if (seen === this.points.size) break;
+
+            if ((2 * ring + 1) ** 2 > 4 * this.cells.size) {
+                // Sparse surroundings: visit the remaining occupied cells nearest-first
+                const remaining = [];
+                for (const [cell, ids] of this.cells) {
+                    const row = Math.floor(cell / this.columns);
+                    const col = cell - row * this.columns;
+                    const dCol = Math.abs(col - centerCol);
+                    if (Math.max(Math.abs(row - centerRow), Math.min(dCol, this.columns - dCol)) < ring) continue;
+                    remaining.push({ ids, floor: this.cellFloorMiles(lat, lng, row, col) });
+                }
+                remaining.sort((a, b) => a.floor - b.floor);
+                for (const { ids, floor: cellFloor } of remaining) {
+                    if (cellFloor > maxMiles) break;
+                    if (best.length === k && cellFloor > best[k - 1].distance) break;
+                    for (const id of ids) consider(this.points.get(id));
+                }
+                break;
+            }
+
+            const row0 = centerRow - ring;
+            const row1 = centerRow + ring;
+            for (let row = row0; row <= row1; row++) {
+                if (row < 0 || row >= this.rows) continue;
+                const step = row === row0 || row === row1 ? 1 : 2 * ring;
+                for (let col = centerCol - ring; col <= centerCol + ring; col += step) {
+                    const wrapped = ((col % this.columns) + this.columns) % this.columns;
+                    const ids = this.cells.get(row * this.columns + wrapped);
+                    if (!ids) continue;
+                    for (const id of ids) {
+                        seen++;
+                        consider(this.points.get(id));
+                    }
+                }
+            }
+        }
+        return best;
+    }
+
+    /**
+     * Lower bound on the miles from a point to anything in grid cell (row, col)
+     */
+    cellFloorMiles(lat, lng, row, col) {
+        // Triangle inequality: distance to the cell center minus its half diagonal
+        const centerLat = (row + 0.5) * this.cellDegrees - 90;
+        const centerLng = (col + 0.5) * this.cellDegrees - 180;
+        const halfDiagonal = Math.SQRT1_2 * this.cellDegrees * MILES_PER_DEGREE_LAT;
+        return SpatialIndex.distanceMiles(lat, lng, centerLat, centerLng) - halfDiagonal;
+    }
+
+    /**
+     * { south, west, north, east } of the indexed points, or null when empty
+     */
+    bounds() {
+        if (this.points.size === 0) return null;
+        let south = Infinity, north = -Infinity, west = Infinity, east = -Infinity;
+        for (const point of this.points.values()) {
+            if (point.lat < south) south = point.lat;
+            if (point.lat > north) north = point.lat;
+            if (point.lng < west) west = point.lng;
+            if (point.lng > east) east = point.lng;
+        }
+        return { south, west, north, east };
+    }
+}
+
+// Export for use in other modules
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = SpatialIndex;
+}
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Single-pass patch engine for the enhancement HTML patchers.
+
+Every patcher in this folder (flip_y_axis.py, remove_house_colors.py,
+final_enhancements.py, ...) reads an enhancement page, runs a chain of
+content.replace() calls that each rescan the whole file, and writes it back.
+
+This engine loads those chains as patch specs WITHOUT running the scripts,
+compiles every anchor for a target file into one multi-pattern matcher and
+applies the whole stack with one read, one scan and one write per file.
+
+A replacement whose anchor could only appear after an earlier replacement in
+the same stack (it matches text produced by that replacement) is pushed into
+a follow-up scan, so results are identical to running the scripts in order.
+
+With --stream, pages are memory-mapped and patched as a list of byte
+splices streamed to a temp file plus an atomic rename (see
+patch_file_streaming), so peak memory stays flat however many patches run.
+
+Usage:
+    python patch_engine.py flip_y_axis.py remove_house_colors.py
+    python patch_engine.py --dry-run *.py
+    python patch_engine.py --stream *.py
+"""
+
+import ast
+import bisect
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+
+class PatchSpecError(Exception):
+    """Raised when a patcher script cannot be expressed as a patch spec."""
+
+
+@dataclass(frozen=True)
+class Replacement:
+    """One content.replace(old, new[, count]) call."""
+    old: str
+    new: str
+    count: int = -1
+
+
+@dataclass
+class PatchSpec:
+    """The replacement chain of one patcher, in script order."""
+    patch_id: str
+    target: str
+    replacements: tuple
+    source: str = None
+
+
+@dataclass
+class PatchResult:
+    """What applying one PatchSpec did to its target."""
+    patch_id: str
+    hits: list = field(default_factory=list)
+
+    @property
+    def applied(self):
+        return sum(1 for h in self.hits if h > 0)
+
+    @property
+    def missing(self):
+        return [i for i, h in enumerate(self.hits) if h == 0]
+
+
+# ============================================
+# SPEC LOADING (static - scripts are never executed)
+# ============================================
+
+def _const_str(node, env):
+    """Evaluate a string literal, a known name or a '+' concatenation."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name) and node.id in env:
+        return env[node.id]
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left = _const_str(node.left, env)
+        right = _const_str(node.right, env)
+        if left is not None and right is not None:
+            return left + right
+    return None
+
+
+def _open_call(node):
+    """Return (filename, mode) for open('file', 'mode', ...) or None."""
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id == 'open' and node.args):
+        return None
+    path = _const_str(node.args[0], {})
+    mode = _const_str(node.args[1], {}) if len(node.args) > 1 else 'r'
+    if path is None or mode is None:
+        return None
+    return path, mode
+
+
+def _replace_call(node, env, var):
+    """Return a Replacement for `var.replace(old, new[, count])` or None."""
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and node.func.attr == 'replace'
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == var
+            and 2 <= len(node.args) <= 3 and not node.keywords):
+        return None
+    old = _const_str(node.args[0], env)
+    new = _const_str(node.args[1], env)
+    if old is None or new is None:
+        return None
+    count = -1
+    if len(node.args) == 3:
+        arg = node.args[2]
+        if not (isinstance(arg, ast.Constant) and isinstance(arg.value, int)):
+            return None
+        count = arg.value
+    if not old:
+        raise PatchSpecError('empty replace anchor')
+    return Replacement(old, new, count)
+
+
+def _mentions(node, name):
+    return any(isinstance(n, ast.Name) and n.id == name for n in ast.walk(node))
+
+
+def load_patch_spec(script_path):
+    """
+    Extract the replacement chain from a patcher script.
+
+    Supported shape (what almost every patcher in src/ looks like):
+        with open('page.html', 'r', ...) as f: content = f.read()
+        old_x = '''...'''; new_x = '''...'''
+        content = content.replace(old_x, new_x)
+        with open('page.html', 'w', ...) as f: f.write(content)
+
+    Anything else that touches the content (regexes, conditionals, slicing)
+    raises PatchSpecError - those scripts still have to be run directly.
+    """
+    with open(script_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=script_path)
+
+    env = {}
+    var = None
+    target = None
+    replacements = []
+
+    for stmt in tree.body:
+        if isinstance(stmt, ast.With) and len(stmt.items) == 1:
+            opened = _open_call(stmt.items[0].context_expr)
+            if opened and 'r' in opened[1] and target is None:
+                body = stmt.body
+                if (len(body) == 1 and isinstance(body[0], ast.Assign)
+                        and len(body[0].targets) == 1
+                        and isinstance(body[0].targets[0], ast.Name)):
+                    target = opened[0]
+                    var = body[0].targets[0].id
+                    continue
+            if opened and 'w' in opened[1] and opened[0] == target:
+                continue
+            raise PatchSpecError(f'line {stmt.lineno}: unsupported with-block')
+
+        if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+            continue
+
+        if isinstance(stmt, ast.Expr):
+            # print(...) and docstrings are fine; anything using content is not
+            if var and _mentions(stmt, var):
+                raise PatchSpecError(f'line {stmt.lineno}: unsupported use of {var}')
+            continue
+
+        if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                and isinstance(stmt.targets[0], ast.Name)):
+            name = stmt.targets[0].id
+            if var and name == var:
+                replacement = _replace_call(stmt.value, env, var)
+                if replacement is None:
+                    raise PatchSpecError(f'line {stmt.lineno}: non-literal edit of {var}')
+                replacements.append(replacement)
+                continue
+            value = _const_str(stmt.value, env)
+            if value is not None:
+                env[name] = value
+                continue
+            if var and _mentions(stmt.value, var):
+                raise PatchSpecError(f'line {stmt.lineno}: derived value from {var}')
+            env.pop(name, None)
+            continue
+
+        raise PatchSpecError(f'line {stmt.lineno}: unsupported {type(stmt).__name__} statement')
+
+    if target is None:
+        raise PatchSpecError('no target file opened for reading')
+    if not replacements:
+        raise PatchSpecError('no replacements found')
+
+    patch_id = os.path.splitext(os.path.basename(script_path))[0]
+    return PatchSpec(patch_id, target, tuple(replacements), source=script_path)
+
+
+def find_target(script_path):
+    """Return the file a patcher edits (first opened for reading, else for writing)."""
+    with open(script_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=script_path)
+    opened = [o for o in map(_open_call, ast.walk(tree)) if o]
+    for path, mode in opened:
+        if 'r' in mode:
+            return path
+    return opened[0][0] if opened else None
+
+
+def load_patch_specs(paths):
+    """Load specs for many scripts. Returns (specs, [(path, reason), ...])."""
+    specs = []
+    skipped = []
+    for path in paths:
+        try:
+            specs.append(load_patch_spec(path))
+        except (PatchSpecError, SyntaxError, OSError) as e:
+            skipped.append((path, str(e)))
+    return specs, skipped
+
+
+# ============================================
+# MULTI-PATTERN MATCHER
+# ============================================
+
+class MultiPatternMatcher:
+    """
+    Finds every occurrence of every anchor in one scan of the text.
+
+    Wu-Manber style: each anchor contributes a window of the same length m
+    (skipping its leading indentation, which every HTML line shares), and a
+    shift table over BLOCK-character blocks of those windows lets the scan
+    jump ahead up to m - BLOCK + 1 characters at a time. Only positions whose
+    block ends some window are verified with startswith(). Overlapping
+    occurrences are all reported, which rule priority in apply_patches needs.
+
+    The skip distance is bounded by the shortest window, so anchors shorter
+    than MIN_WINDOW (e.g. '<div') are located with find() instead of
+    dragging the whole scan down to one character per step.
+    """
+
+    BLOCK = 4
+    MIN_WINDOW = 8
+
+    def __init__(self, patterns):
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        self._offsets = {}
+        self._short = []
+        long_patterns = []
+        for p in self.patterns:
+            indent = len(p) - len(p.lstrip())
+            self._offsets[p] = indent if indent < len(p) else 0
+            if len(p) - self._offsets[p] < self.MIN_WINDOW:
+                self._short.append(p)
+            else:
+                long_patterns.append(p)
+        self._long = long_patterns
+
+        self.m = min((len(p) - self._offsets[p] for p in long_patterns), default=0)
+        self.block = min(self.BLOCK, self.m)
+        self._default_shift = self.m - self.block + 1
+        self._shift = {}
+        self._candidates = {}
+
+        m, b = self.m, self.block
+        for p in long_patterns:
+            offset = self._offsets[p]
+            window = p[offset:offset + m]
+            for j in range(b - 1, m):
+                blk = window[j - b + 1:j + 1]
+                shift = m - 1 - j
+                if self._shift.get(blk, self._default_shift) > shift:
+                    self._shift[blk] = shift
+            self._candidates.setdefault(window[m - b:], []).append((p, offset))
+
+    def scan(self, text):
+        """Return {pattern: [start, ...]} for every anchor found in text."""
+        found = {}
+        for p in self._short:
+            starts = []
+            i = text.find(p)
+            while i != -1:
+                starts.append(i)
+                i = text.find(p, i + 1)
+            if starts:
+                found[p] = starts
+        if not self._long:
+            return found
+
+        m, b = self.m, self.block
+        get_shift = self._shift.get
+        default = self._default_shift
+        candidates = self._candidates
+        startswith = getattr(text, 'startswith', None) or (lambda p, i: text[i:i + len(p)] == p)
+
+        n = len(text)
+        pos = m - 1
+        while pos < n:
+            blk = text[pos - b + 1:pos + 1]
+            shift = get_shift(blk, default)
+            if shift:
+                pos += shift
+                continue
+            window_start = pos - m + 1
+            for p, offset in candidates[blk]:
+                start = window_start - offset
+                if start >= 0 and startswith(p, start):
+                    found.setdefault(p, []).append(start)
+            pos += 1
+        return found
+
+
+def _may_interact(pattern, produced):
+    """True if `pattern` could match text that `produced` introduces."""
+    # inside the new text, wrapping it, or across the seam it leaves behind
+    if pattern in produced or produced in pattern:
+        return True
+    for k in range(1, min(len(pattern), len(produced) + 1)):
+        if produced.endswith(pattern[:k]) or produced.startswith(pattern[-k:]):
+            return True
+    return False
+
+
+def _select(starts, length, count, claimed):
+    """
+    Pick non-overlapping occurrences left to right, like str.replace, that do
+    not overlap spans claimed by earlier rules. `claimed` is a sorted list of
+    (start, end) spans; chosen spans are inserted into it.
+    """
+    chosen = []
+    if count == 0:
+        return chosen
+    last_end = -1
+    for s in starts:
+        if s < last_end:
+            continue
+        e = s + length
+        i = bisect.bisect_left(claimed, (s, s))
+        if (i > 0 and claimed[i - 1][1] > s) or (i < len(claimed) and claimed[i][0] < e):
+            continue
+        chosen.append(s)
+        last_end = e
+        if 0 <= count <= len(chosen):
+            break
+    for s in chosen:
+        bisect.insort(claimed, (s, s + length))
+    return chosen
+
+
+def _plan_pass(text, rules, results):
+    """
+    Scan text once and pick the edits for the longest prefix of rules that
+    can safely share this pass. Returns (sorted edits, number of rules taken).
+    """
+    found = MultiPatternMatcher(r.old for _, _, r in rules).scan(text)
+
+    claimed = []          # (start, end) spans already rewritten this pass
+    edits = []            # (start, end, new)
+    produced = []         # replacement texts emitted this pass
+    taken = 0
+    for si, ri, rule in rules:
+        if any(_may_interact(rule.old, p) for p in produced):
+            break
+        taken += 1
+        starts = _select(found.get(rule.old, ()), len(rule.old), rule.count, claimed)
+        if not starts:
+            continue
+        for s in starts:
+            edits.append((s, s + len(rule.old), rule.new))
+        produced.append(rule.new)
+        results[si].hits[ri] += len(starts)
+
+    edits.sort()
+    return edits, taken
+
+
+def apply_patches(text, specs):
+    """
+    Apply every replacement of every spec, in order, to text.
+
+    Returns (new_text, [PatchResult, ...], passes). `passes` is the number
+    of scans needed: 1 unless a replacement depends on an earlier one's output.
+    """
+    rules = [(si, ri, r) for si, spec in enumerate(specs) for ri, r in enumerate(spec.replacements)]
+    results = [PatchResult(spec.patch_id, [0] * len(spec.replacements)) for spec in specs]
+    passes = 0
+
+    while rules:
+        passes += 1
+        edits, taken = _plan_pass(text, rules, results)
+        if edits:
+            out = []
+            pos = 0
+            for s, e, new in edits:
+                out.append(text[pos:s])
+                out.append(new)
+                pos = e
+            out.append(text[pos:])
+            text = ''.join(out)
+        rules = rules[taken:]
+
+    return text, results, passes
+
+
+def patch_file(path, specs, dry_run=False):
+    """Read path once, apply all specs, write once. Returns (results, passes, changed)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    new_content, results, passes = apply_patches(content, specs)
+    changed = new_content != content
+
+    if changed and not dry_run:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+
+    return results, passes, changed
+
+
+def _stream_splice(source, edits, out):
+    """Write source with edits applied to out, copying untouched runs zero-copy."""
+    view = memoryview(source)
+    try:
+        pos = 0
+        for s, e, new in edits:
+            out.write(view[pos:s])
+            out.write(new)
+            pos = e
+        out.write(view[pos:])
+    finally:
+        view.release()
+
+
+def patch_file_streaming(path, specs, dry_run=False):
+    """
+    Like patch_file, but for very large pages (enhancement_3, the legacy
+    CLUES_Master_Base_v1.html): the page is memory-mapped instead of read
+    into a string, each pass is an edit list of byte splices, and the output
+    is streamed to a temp file next to the page and renamed over it
+    atomically. No copy of the page is ever held on the Python heap.
+
+    Works on raw UTF-8 bytes, so line endings are left exactly as they are.
+    Returns (results, passes, changed).
+    """
+    rules = [
+        (si, ri, Replacement(r.old.encode('utf-8'), r.new.encode('utf-8'), r.count))
+        for si, spec in enumerate(specs) for ri, r in enumerate(spec.replacements)
+    ]
+    results = [PatchResult(spec.patch_id, [0] * len(spec.replacements)) for spec in specs]
+    passes = 0
+    directory = os.path.dirname(os.path.abspath(path))
+    current = path
+
+    try:
+        while rules:
+            if os.path.getsize(current) == 0:
+                break   # nothing to map, nothing can match
+            passes += 1
+            with open(current, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                edits, taken = _plan_pass(source, rules, results)
+                if edits:
+                    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+                    with os.fdopen(fd, 'wb') as out:
+                        _stream_splice(source, edits, out)
+            if edits:
+                if current != path:
+                    os.remove(current)
+                current = tmp
+            rules = rules[taken:]
+
+        changed = current != path
+        if changed and not dry_run:
+            shutil.copymode(path, current)
+            os.replace(current, path)
+            current = path
+    finally:
+        if current != path and os.path.exists(current):
+            os.remove(current)
+
+    return results, passes, changed
+
+
+def group_by_target(specs, base_dir='.'):
+    """
+    Group specs per target file, keeping their relative order. Targets are
+    relative to the patcher script (that is where the scripts run from), or
+    to base_dir for specs built in code.
+    """
+    groups = {}
+    for spec in specs:
+        directory = os.path.dirname(spec.source) if spec.source else base_dir
+        path = os.path.normpath(os.path.join(directory, spec.target))
+        groups.setdefault(path, []).append(spec)
+    return groups
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    dry_run = '--dry-run' in args
+    stream = '--stream' in args
+    scripts = [a for a in args if a not in ('--dry-run', '--stream')]
+    if not scripts:
+        print(__doc__)
+        return 2
+
+    specs, skipped = load_patch_specs(scripts)
+    for path, reason in skipped:
+        print(f"⚠️  SKIPPED {path}: {reason} (run it directly)")
+
+    for path, group in group_by_target(specs).items():
+        t0 = time.perf_counter()
+        apply = patch_file_streaming if stream else patch_file
+        results, passes, changed = apply(path, group, dry_run=dry_run)
+        elapsed = (time.perf_counter() - t0) * 1000
+
+        status = 'changed' if changed else 'unchanged'
+        print(f"{path}: {len(group)} patches, {passes} scan(s), {status} in {elapsed:.1f}ms")
+        for result, spec in zip(results, group):
+            print(f"  {result.patch_id}: {result.applied}/{len(spec.replacements)} replacements applied")
+            for i in result.missing:
+                first_line = spec.replacements[i].old.strip().splitlines()[0]
+                print(f"    - anchor #{i + 1} not found: {first_line[:70]}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
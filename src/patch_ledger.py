@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Content-hash ledger for the enhancement HTML patchers.
+
+Records, per target page, the content hash the page had after the last run
+and, per patch, the spec hash plus the before/after content hashes it saw.
+A patch is skipped when the page is still at the recorded hash and the
+patch's spec has not changed - one dictionary lookup, no rescan.
+
+Ledger layout (.patch_ledger.json next to the pages):
+    {
+      "version": 1,
+      "files": {
+        "enhancement_1_quantum_explorer.html": {
+          "hash": "<sha256 after last run>",
+          "patches": {
+            "flip_y_axis": {"spec": "...", "before": "...", "after": "...", "hits": 6}
+          }
+        }
+      }
+    }
+"""
+
+import hashlib
+import json
+import os
+
+LEDGER_VERSION = 1
+DEFAULT_LEDGER = '.patch_ledger.json'
+
+
+def content_hash(data):
+    """sha256 of page content (str or bytes)."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return content_hash(f.read())
+
+
+def spec_hash(spec):
+    """Stable hash of a declarative PatchSpec (target + replacement chain)."""
+    payload = json.dumps(
+        [spec.target, [[r.old, r.new, r.count] for r in spec.replacements]],
+        ensure_ascii=False
+    )
+    return content_hash(payload)
+
+
+def script_hash(script_path):
+    """Hash of a patcher's source, for scripts that have to be run directly."""
+    return file_hash(script_path)
+
+
+class PatchLedger:
+    """Which patches have already been applied to which page content."""
+
+    def __init__(self, path=DEFAULT_LEDGER):
+        self.path = path
+        self.files = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == LEDGER_VERSION:
+                    self.files = data.get('files', {})
+            except (OSError, ValueError):
+                # A corrupt ledger only costs a full rebuild
+                self.files = {}
+
+    def _key(self, target):
+        return os.path.normpath(target)
+
+    def is_current(self, target, current_hash, patch_id, patch_spec_hash):
+        """True if patch_id (unchanged) already ran and the page is untouched since."""
+        entry = self.files.get(self._key(target))
+        if not entry or entry.get('hash') != current_hash:
+            return False
+        patch = entry['patches'].get(patch_id)
+        return patch is not None and patch.get('spec') == patch_spec_hash
+
+    def record(self, target, patch_id, patch_spec_hash, before, after, hits=None):
+        """Record one applied (or verified no-op) patch and move the page head."""
+        entry = self.files.setdefault(self._key(target), {'hash': None, 'patches': {}})
+        entry['patches'][patch_id] = {
+            'spec': patch_spec_hash,
+            'before': before,
+            'after': after,
+            'hits': hits
+        }
+        entry['hash'] = after
+        self.dirty = True
+
+    def forget(self, target=None):
+        """Drop everything known about target (or about every page)."""
+        if target is None:
+            self.files = {}
+        else:
+            self.files.pop(self._key(target), None)
+        self.dirty = True
+
+    def entry(self, target):
+        """The raw record for one page (used to hand a slice to a worker)."""
+        return self.files.get(self._key(target))
+
+    def merge(self, target, entry):
+        """Take back a page record updated elsewhere (e.g. in a worker process)."""
+        if entry is not None and entry != self.files.get(self._key(target)):
+            self.files[self._key(target)] = entry
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty or not self.path:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': LEDGER_VERSION, 'files': self.files}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
 # Patch the Quantum Explorer with REAL 3D textured houses
 
-import re
+from anchor_index import AnchorIndex, AnchorNotFound, comment, line
 
-# Read the file
-with open('enhancement_1_quantum_explorer.html', 'r', encoding='utf-8') as f:
-    content = f.read()
+# Index the file (comment markers, functions, lines - whitespace-normalized)
+index = AnchorIndex.from_file('enhancement_1_quantum_explorer.html')
 
-# Find and replace the block creation code
-# Use regex to handle any whitespace variations
-old_pattern = r'// Create COLORED BLOCK from ground.*?block\.position\.set\(x, -10 \+ \(blockHeight / 2\), z\);'
+# The block creation code runs from this comment to the block.position line
+start_anchor = comment('Create COLORED BLOCK from ground')
+end_anchor = line('block.position.set(x, -10 + (blockHeight / 2), z);')
 
 new_code = '''// Create 3D TEXTURED HOUSE from Google Street View
                 const blockHeight = Math.max(0.2, y - (-10)); // Ensure minimum height
@@ -119,35 +118,17 @@ new_code = '''// Create 3D TEXTURED HOUSE from Google Street View
                 // Position block so bottom is at ground plane (y=-10) and top is at y
                 block.position.set(x, -10 + (blockHeight / 2), z);'''
 
-# Replace
-new_content = re.sub(old_pattern, new_code, content, flags=re.DOTALL)
-
-if new_content == content:
-    print("❌ ERROR: Could not find the pattern to replace!")
-    print("Searching for a simpler pattern...")
-
-    # Try simpler replacement
-    if '// Create COLORED BLOCK from ground' in content:
-        # Find the section manually
-        start_idx = content.find('// Create COLORED BLOCK from ground')
-        end_idx = content.find('block.position.set(x, -10 + (blockHeight / 2), z);', start_idx)
-
-        if start_idx != -1 and end_idx != -1:
-            end_idx += len('block.position.set(x, -10 + (blockHeight / 2), z);')
-            old_section = content[start_idx:end_idx]
-            new_content = content[:start_idx] + new_code + content[end_idx:]
-            print("✅ Found and replaced using manual method!")
-        else:
-            print("❌ Still couldn't find it")
-            exit(1)
-    else:
-        print("❌ Pattern not found at all")
-        exit(1)
+# Replace every block (the page may build blocks in more than one place)
+try:
+    new_content = index.replace_spans(start_anchor, end_anchor, new_code)
+except AnchorNotFound as e:
+    print(f"❌ ERROR: {e}")
+    exit(1)
 
 # Write the patched file
 with open('enhancement_1_quantum_explorer.html', 'w', encoding='utf-8') as f:
     f.write(new_content)
 
-print("✅ SUCCESS! Patched enhancement_1_quantum_explorer.html")
+print(f"✅ SUCCESS! Patched {len(index.spans(start_anchor, end_anchor))} block(s) in enhancement_1_quantum_explorer.html")
 print("🏠 Properties will now load as 3D textured houses with Street View images")
 print("📍 Reload the Quantum Explorer to see the changes!")
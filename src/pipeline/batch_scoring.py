@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Vectorized batch scoring that mirrors ScoringEngine.calculateScore
+(src/core/scoring-engine.js).
+
+VARIABLE_SYSTEM and WEIGHT_PROFILES are read straight from scoring-engine.js
+(via node), so the JS file stays the single source of truth. They are compiled
+into arrays - per-variable range, weight, higher_is_better and category - and
+an N x V feature matrix is scored against every profile with a handful of
+matrix operations:
+
+    normalized  = clip((X - min) / (max - min)) * 100, flipped where lower is better,
+                  NaN (missing) -> 50
+    partial     = normalized @ W            (N x C, W = base weight per category)
+    by_category = partial / sum(W)          (profile multipliers cancel inside a category)
+    overall     = partial @ P / (sum(W) @ P)  for all profiles P at once
+
+JS quirks are kept on purpose: a custom weight or profile multiplier of 0
+falls back to the default (the `||` in calculateScore).
+
+Usage:
+    python batch_scoring.py --bench 500000
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+ENGINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core', 'scoring-engine.js')
+
+_DUMP_CONFIG_JS = r"""
+const fs = require('fs');
+const code = fs.readFileSync(process.argv[1], 'utf8');
+const ScoringEngine = new Function(code + '\nreturn ScoringEngine;')();
+const engine = new ScoringEngine();
+process.stdout.write(JSON.stringify({
+    variables: engine.getVariableSystem(),
+    profiles: engine.getWeightProfiles()
+}));
+"""
+
+
+@dataclass
+class ScoringConfig:
+    """VARIABLE_SYSTEM / WEIGHT_PROFILES compiled to arrays (variables in JS order)."""
+    categories: list           # [category, ...]
+    variables: list            # [variable, ...]
+    category_index: np.ndarray  # (V,) int - category of each variable
+    weights: np.ndarray        # (V,) default weights
+    mins: np.ndarray           # (V,)
+    maxs: np.ndarray           # (V,)
+    higher_is_better: np.ndarray  # (V,) bool
+    importance: list
+    descriptions: list
+    profiles: dict             # name -> {category: multiplier}
+
+    def variable_position(self):
+        return {name: i for i, name in enumerate(self.variables)}
+
+    def profile_vector(self, profile):
+        """Multipliers (C,) for a profile name or {category: multiplier} dict."""
+        if isinstance(profile, str):
+            profile = self.profiles[profile]
+        # JS: profile[categoryName] || 1.0
+        return np.array([profile.get(c) or 1.0 for c in self.categories], dtype=np.float64)
+
+
+def _compile_config(raw):
+    categories = list(raw['variables'].keys())
+    variables, category_index = [], []
+    weights, mins, maxs, hib, importance, descriptions = [], [], [], [], [], []
+    for ci, category in enumerate(categories):
+        for name, spec in raw['variables'][category].items():
+            variables.append(name)
+            category_index.append(ci)
+            weights.append(spec['weight'])
+            mins.append(spec['range'][0])
+            maxs.append(spec['range'][1])
+            hib.append(spec.get('higher_is_better', True))
+            importance.append(spec.get('importance'))
+            descriptions.append(spec.get('description'))
+    return ScoringConfig(
+        categories=categories,
+        variables=variables,
+        category_index=np.array(category_index, dtype=np.intp),
+        weights=np.array(weights, dtype=np.float64),
+        mins=np.array(mins, dtype=np.float64),
+        maxs=np.array(maxs, dtype=np.float64),
+        higher_is_better=np.array(hib, dtype=bool),
+        importance=importance,
+        descriptions=descriptions,
+        profiles=raw['profiles']
+    )
+
+
+@lru_cache(maxsize=None)
+def load_scoring_config(engine_path=ENGINE_PATH):
+    """Read VARIABLE_SYSTEM and WEIGHT_PROFILES out of scoring-engine.js."""
+    proc = subprocess.run(
+        ['node', '-e', _DUMP_CONFIG_JS, os.path.abspath(engine_path)],
+        capture_output=True, text=True, check=True
+    )
+    return _compile_config(json.loads(proc.stdout))
+
+
+@dataclass
+class BatchScores:
+    """calculateScore's output for N properties under one profile, as arrays."""
+    overall: np.ndarray           # (N,)
+    by_category: np.ndarray       # (N, C) category scores 0-100
+    category_weight: np.ndarray   # (C,) total (profile-scaled) weight per category
+    by_variable: np.ndarray       # (N, V) normalized 0-100 values
+    variable_weight: np.ndarray   # (V,) final (profile-scaled) weight per variable
+    total_weight: float
+
+    @property
+    def weighted(self):
+        """(N, V) weighted_score per variable, computed on demand."""
+        return self.by_variable * self.variable_weight
+
+
+class BatchScoringEngine:
+    """Scores feature matrices (rows = properties, columns = config.variables)."""
+
+    def __init__(self, config=None, dtype=np.float32):
+        self.config = config or load_scoring_config()
+        self.dtype = dtype
+        cfg = self.config
+        self._span = (cfg.maxs - cfg.mins).astype(dtype)
+        self._mins = cfg.mins.astype(dtype)
+        self._maxs = cfg.maxs.astype(dtype)
+        # (V, C) membership matrix
+        self._membership = np.zeros((len(cfg.variables), len(cfg.categories)), dtype=np.float64)
+        self._membership[np.arange(len(cfg.variables)), cfg.category_index] = 1.0
+
+    def base_weights(self, custom_weights=None):
+        """(V,) base weights with custom overrides (0/missing -> default, like JS)."""
+        weights = self.config.weights.copy()
+        if custom_weights:
+            position = self.config.variable_position()
+            for name, value in custom_weights.items():
+                if value and name in position:
+                    weights[position[name]] = value
+        return weights
+
+    def normalize(self, X):
+        """(N, V) feature matrix -> (N, V) normalized 0-100, NaN -> 50."""
+        X = np.asarray(X, dtype=self.dtype)
+        out = np.clip(X, self._mins, self._maxs)
+        out -= self._mins
+        out /= self._span
+        out *= 100
+        flip = ~self.config.higher_is_better
+        out[:, flip] = 100 - out[:, flip]
+        np.nan_to_num(out, copy=False, nan=50.0)
+        return out
+
+    def partial_sums(self, normalized, custom_weights=None):
+        """(N, C) sum of normalized * base weight per category, plus (C,) weight totals."""
+        weights = self.base_weights(custom_weights)
+        W = self._membership * weights[:, None]
+        return normalized @ W.astype(normalized.dtype), W.sum(axis=0)
+
+    def score(self, X, profile='balanced', custom_weights=None, normalized=None):
+        """Score every row of X under one profile."""
+        return self.score_profiles(X, [profile], custom_weights, normalized)[
+            profile if isinstance(profile, str) else 0]
+
+    def score_columns(self, columns, profiles=None, custom_weights=None):
+        """Score FeatureColumns (feature_columns.extract_features) under several profiles."""
+        if list(columns.variables) != self.config.variables:
+            raise ValueError('feature columns were extracted for a different variable order')
+        return self.score_profiles(columns.matrix, profiles, custom_weights)
+
+    def score_profiles(self, X, profiles=None, custom_weights=None, normalized=None):
+        """
+        Score every row of X under several profiles at once (default: all of
+        WEIGHT_PROFILES). Returns {profile name (or index): BatchScores}; the
+        normalized matrix and category scores are shared between profiles.
+        """
+        cfg = self.config
+        if profiles is None:
+            profiles = list(cfg.profiles)
+        if normalized is None:
+            normalized = self.normalize(X)
+
+        partial, cat_weight = self.partial_sums(normalized, custom_weights)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            by_category = np.where(cat_weight > 0, partial / cat_weight, 0.0)
+
+        P = np.stack([cfg.profile_vector(p) for p in profiles], axis=1)    # (C, K)
+        totals = cat_weight @ P                                               # (K,)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            overall = np.where(totals > 0, (partial @ P) / totals, 0.0)       # (N, K)
+
+        base = self.base_weights(custom_weights)
+        results = {}
+        for k, profile in enumerate(profiles):
+            key = profile if isinstance(profile, str) else k
+            multipliers = P[:, k]
+            results[key] = BatchScores(
+                overall=overall[:, k],
+                by_category=by_category,
+                category_weight=cat_weight * multipliers,
+                by_variable=normalized,
+                variable_weight=base * multipliers[cfg.category_index],
+                total_weight=float(totals[k])
+            )
+        return results
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) != 2 or args[0] != '--bench':
+        print(__doc__)
+        return 2
+
+    n = int(args[1])
+    engine = BatchScoringEngine()
+    cfg = engine.config
+    rng = np.random.default_rng(0)
+    X = rng.uniform(cfg.mins, cfg.maxs, size=(n, len(cfg.variables))).astype(np.float32)
+    X[rng.random(X.shape) < 0.2] = np.nan
+
+    t0 = time.perf_counter()
+    results = engine.score_profiles(X)
+    elapsed = time.perf_counter() - t0
+    print(f"Scored {n:,} properties x {len(results)} profiles x {len(cfg.variables)} variables "
+          f"in {elapsed:.2f}s ({n * len(results) / elapsed:,.0f} scores/sec)")
+    for name, scores in results.items():
+        print(f"  {name:<18} mean {scores.overall.mean():6.2f}  max {scores.overall.max():6.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Header-fingerprint column mapping for CSV imports.
+
+DataImporter.autoDetectColumns (data-importer.js) fuzzy-matches every header
+cell against every keyword list on each import, and mapCSVRow then runs
+parseNumber on every numeric cell. Nightly feeds send the same header every
+time, so this resolves a header once:
+
+    1. exact pass - a cell equal to a canonical column name or a keyword
+    2. fuzzy pass - the autoDetectColumns rule (keyword contained in the
+       cell) for the columns and cells still unclaimed, one column per cell
+    3. types      - a sample of rows picks a converter per numeric column
+                    (plain numbers / numbers and blanks / needs cleaning)
+
+and stores the result under the sha256 of the normalized header. Later
+imports with that header skip detection and parse with the stored plan. A
+batch whose cells do not fit the sampled converter is cleaned cell by cell
+(csv_ingest.to_numeric), so a stale converter costs speed, not correctness.
+
+Cache layout (.column_mappings.json next to the feeds):
+    {
+      "version": 1,
+      "mappings": {
+        "<sha256 of header>": {
+          "header": ["Property Address", "City", ...],
+          "positions": {"street": 0, "city": 1, ...},
+          "converters": {"price": "dirty", "bedrooms": "plain", ...},
+          "created_at": "2026-10-17T02:00:00", "hits": 41
+        }
+      }
+    }
+
+Usage:
+    python column_mapping.py <file.csv> [--cache .column_mappings.json]
+    python column_mapping.py --forget [--cache .column_mappings.json]
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+from csv_ingest import (BLANKS, COLUMN_TYPES, DIRTY, PLAIN, TEXT, ColumnPlan,
+                        CSVFormatError)
+
+MAPPING_VERSION = 1
+DEFAULT_CACHE = '.column_mappings.json'
+DEFAULT_SAMPLE_ROWS = 200
+HEADER_SEPARATOR = '\x1f'
+
+# autoDetectColumns patterns, keyed by csv_ingest column names (same order)
+HEADER_PATTERNS = (
+    ('street', ('address', 'street', 'location', 'property address')),
+    ('city', ('city', 'town')),
+    ('state', ('state', 'province')),
+    ('zip', ('zip', 'postal', 'zipcode', 'zip code')),
+    ('price', ('price', 'listing price', 'asking price', 'sale price')),
+    ('bedrooms', ('bed', 'bedroom', 'beds', 'br')),
+    ('bathrooms', ('bath', 'bathroom', 'baths', 'ba')),
+    ('sqft_living', ('sqft_living', 'living_area', 'sqft', 'square feet', 'sq ft', 'area', 'size')),
+    ('sqft_lot', ('sqft_lot', 'lot_size', 'lot size', 'lot', 'land')),
+    ('year_built', ('year_built', 'year built', 'year', 'built')),
+    ('property_type', ('property_type', 'property type', 'type', 'category')),
+    ('description', ('description', 'details', 'notes')),
+    ('listing_url', ('url', 'link', 'listing url', 'source')),
+    ('mls_number', ('mls_number', 'mls', 'mls#', 'mls number')),
+    ('days_on_market', ('dom', 'days on market', 'days listed')),
+    ('hoa_fees', ('hoa', 'hoa fee', 'hoa dues')),
+    ('annual_taxes', ('tax', 'taxes', 'property tax', 'annual tax')),
+    ('latitude', ('latitude', 'lat')),
+    ('longitude', ('longitude', 'lng', 'lon', 'long')),
+)
+
+
+def normalize_header(cell):
+    return cell.strip().lower()
+
+
+def header_fingerprint(header):
+    """sha256 of the normalized header cells, in order."""
+    payload = HEADER_SEPARATOR.join(normalize_header(c) for c in header)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def detect_columns(header):
+    """{column name: position} by exact then fuzzy header matching."""
+    cells = [normalize_header(c) for c in header]
+    positions = {}
+    claimed = set()
+
+    # Exact: canonical names (CSV_FORMAT.txt exports), then keyword equality
+    for i, cell in enumerate(cells):
+        if cell in COLUMN_TYPES and cell not in positions:
+            positions[cell] = i
+            claimed.add(i)
+    for name, keywords in HEADER_PATTERNS:
+        if name in positions:
+            continue
+        for i, cell in enumerate(cells):
+            if i not in claimed and cell in keywords:
+                positions[name] = i
+                claimed.add(i)
+                break
+
+    # Fuzzy: autoDetectColumns' "keyword contained in header", first cell wins
+    for i, cell in enumerate(cells):
+        if i in claimed or not cell:
+            continue
+        for name, keywords in HEADER_PATTERNS:
+            if name not in positions and any(k in cell for k in keywords):
+                positions[name] = i
+                claimed.add(i)
+                break
+    return positions
+
+
+def _is_number(cell):
+    try:
+        float(cell)
+        return True
+    except ValueError:
+        return False
+
+
+def infer_converter(cells):
+    """Cheapest csv_ingest converter that handles every sampled cell."""
+    blanks = False
+    for cell in cells:
+        if not cell:
+            blanks = True
+        elif not _is_number(cell):
+            return DIRTY
+    return BLANKS if blanks else PLAIN
+
+
+def infer_converters(positions, sample):
+    converters = {}
+    for name, pos in positions.items():
+        if COLUMN_TYPES[name] == TEXT:
+            continue
+        converters[name] = infer_converter([row[pos].strip() for row in sample if pos < len(row)])
+    return converters
+
+
+class ColumnMappingResolver:
+    """Header -> ColumnPlan, detected once per header and cached on disk."""
+
+    def __init__(self, path=DEFAULT_CACHE):
+        self.path = path
+        self.mappings = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MAPPING_VERSION:
+                    self.mappings = data.get('mappings', {})
+            except (OSError, ValueError):
+                # A corrupt cache only costs one detection per header
+                self.mappings = {}
+
+    def lookup(self, header):
+        """Cached ColumnPlan for this header, or None."""
+        entry = self.mappings.get(header_fingerprint(header))
+        if entry is None or any(pos >= len(header) for pos in entry['positions'].values()):
+            return None
+        entry['hits'] = entry.get('hits', 0) + 1
+        self.hits += 1
+        self.dirty = True
+        return ColumnPlan(dict(entry['positions']), dict(entry['converters']), source='cache')
+
+    def resolve(self, header, sample=()):
+        """Detect columns and converters for a header not seen before, and cache them."""
+        self.misses += 1
+        positions = detect_columns(header)
+        if not positions:
+            raise CSVFormatError('no recognizable columns in header')
+        converters = infer_converters(positions, sample)
+        self.mappings[header_fingerprint(header)] = {
+            'header': list(header),
+            'positions': positions,
+            'converters': converters,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'hits': 0
+        }
+        self.dirty = True
+        return ColumnPlan(dict(positions), dict(converters), source='detected')
+
+    def forget(self, header=None):
+        """Drop the mapping for one header (or every mapping)."""
+        if header is None:
+            self.mappings = {}
+        else:
+            self.mappings.pop(header_fingerprint(header), None)
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty or not self.path:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': MAPPING_VERSION, 'mappings': self.mappings}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    cache = DEFAULT_CACHE
+    if '--cache' in args:
+        i = args.index('--cache')
+        cache = args[i + 1]
+        del args[i:i + 2]
+
+    resolver = ColumnMappingResolver(cache)
+    if args == ['--forget']:
+        resolver.forget()
+        resolver.save()
+        print(f"✅ Cleared {cache}")
+        return 0
+    if len(args) != 1:
+        print(__doc__)
+        return 2
+
+    with open(args[0], 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            print(f"❌ {args[0]}: empty file")
+            return 1
+        plan = resolver.lookup(header)
+        if plan is None:
+            sample = [row for _, row in zip(range(DEFAULT_SAMPLE_ROWS), reader)]
+            try:
+                plan = resolver.resolve(header, sample)
+            except CSVFormatError as e:
+                print(f"❌ {args[0]}: {e}")
+                return 1
+    resolver.save()
+
+    print(f"✅ {args[0]}: {len(plan.positions)} column(s) mapped ({plan.source})")
+    for name, pos in sorted(plan.positions.items(), key=lambda item: item[1]):
+        converter = plan.converters.get(name, 'text')
+        print(f"  {header[pos]!r:<28} -> {name:<16} {converter}")
+    unmapped = [h for i, h in enumerate(header) if i not in set(plan.positions.values())]
+    if unmapped:
+        print(f"⚠️  Unmapped: {', '.join(unmapped)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
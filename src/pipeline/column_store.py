@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Columnar, memory-mapped property store for analytics.
+
+Every analytics page starts with DataManager.getAllProperties(), which
+deserializes each nested property object before a single number is read.
+This store keeps the same data column by column on disk:
+
+    one float32 file per scoring variable (feature_columns order, `|| default`s applied)
+    one int32 code file per dictionary column (city, state, property_type),
+    with the distinct values in the manifest
+    listing keys as an int64 offsets file over one UTF-8 blob
+
+Opening a store reads only manifest.json. Columns are np.memmap views, so
+slicing is zero-copy and a query pages in just the columns it touches:
+
+    store = ColumnStore('.property_store')
+    rows = store.mask('city', 'Tampa') & store.where('price_current', high=400_000)
+    store.group_mean('state', 'price_current', rows)   # {'FL': 287512.0, ...}
+    store.score('investor', rows)                      # (n,) overall, scored in chunks
+
+ColumnStoreWriter appends RecordBatches from csv_ingest (the importer path,
+`csv_ingest.py feed.csv --store DIR`) or FeatureColumns from a JSON export.
+It writes into DIR.tmp and swaps the directory in on close, so readers never
+see a half-written store.
+
+Usage:
+    python column_store.py build feed.csv|export.json [--store .property_store] [--mappings .column_mappings.json]
+    python column_store.py info [--store .property_store]
+    python column_store.py --bench 1000000
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from batch_scoring import BatchScoringEngine, load_scoring_config
+from feature_columns import FeatureColumns, FeatureExtractor, _obj
+
+STORE_VERSION = 1
+DEFAULT_STORE = '.property_store'
+MANIFEST = 'manifest.json'
+DICTIONARY_COLUMNS = ('city', 'state', 'property_type')
+VALUE_DTYPE = np.float32
+CODE_DTYPE = np.int32
+OFFSET_DTYPE = np.int64
+DEFAULT_CHUNK_ROWS = 65_536
+
+
+class ColumnStoreError(ValueError):
+    """Missing, outdated or inconsistent store (rebuild it)."""
+
+
+def _value_file(name):
+    return name + '.f32'
+
+
+def _code_file(name):
+    return name + '.codes'
+
+
+def _swap_directory(tmp, path):
+    """Replace directory `path` by `tmp`; open memmaps of the old files stay valid."""
+    old = path + '.old'
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+class ColumnStoreWriter:
+    """Appends property columns to a new store; close() publishes it."""
+
+    def __init__(self, path=DEFAULT_STORE, variables=None, source=''):
+        self.path = path
+        self.tmp = path + '.tmp'
+        self.variables = list(variables or load_scoring_config().variables)
+        self.source = source
+        self.rows = 0
+        self.key_bytes = 0
+        self.dictionaries = {name: {} for name in DICTIONARY_COLUMNS}
+        self._extractor = None
+
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        os.makedirs(self.tmp)
+        self._files = {name: open(os.path.join(self.tmp, _value_file(name)), 'wb') for name in self.variables}
+        self._codes = {name: open(os.path.join(self.tmp, _code_file(name)), 'wb') for name in DICTIONARY_COLUMNS}
+        self._offsets = open(os.path.join(self.tmp, 'keys.offsets'), 'wb')
+        self._blob = open(os.path.join(self.tmp, 'keys.blob'), 'wb')
+        np.zeros(1, dtype=OFFSET_DTYPE).tofile(self._offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _encode(self, name, values):
+        """Dictionary codes for one text column; new values get the next code."""
+        dictionary = self.dictionaries[name]
+        return np.fromiter((dictionary.setdefault(v or '', len(dictionary)) for v in values),
+                           dtype=CODE_DTYPE, count=len(values))
+
+    def append(self, columns, text=None, keys=None):
+        """
+        Append FeatureColumns (variables in this store's order), {dictionary
+        column: [str]} and listing keys (default: columns.ids).
+        """
+        if list(columns.variables) != self.variables:
+            raise ColumnStoreError('feature columns were extracted for a different variable order')
+        n = len(columns)
+        matrix = columns.matrix
+        for j, name in enumerate(self.variables):
+            np.ascontiguousarray(matrix[:, j], dtype=VALUE_DTYPE).tofile(self._files[name])
+
+        text = text or {}
+        for name in DICTIONARY_COLUMNS:
+            values = text.get(name)
+            self._encode(name, [''] * n if values is None else values).tofile(self._codes[name])
+
+        encoded = [str(k).encode('utf-8') for k in (columns.ids if keys is None else keys)]
+        lengths = np.fromiter(map(len, encoded), dtype=OFFSET_DTYPE, count=n)
+        (self.key_bytes + np.cumsum(lengths)).tofile(self._offsets)
+        self._blob.write(b''.join(encoded))
+        self.key_bytes += int(lengths.sum())
+        self.rows += n
+
+    def append_batch(self, batch):
+        """Append a csv_ingest RecordBatch, scored inputs as transformForScoring builds them."""
+        from incremental_import import listing_keys, scoring_inputs
+
+        if len(batch) == 0:
+            return
+        if self._extractor is None:
+            self._extractor = FeatureExtractor(self.variables)
+        columns = self._extractor.extract(scoring_inputs(batch, np.arange(len(batch))))
+        self.append(columns, {name: batch.column(name) for name in DICTIONARY_COLUMNS}, listing_keys(batch))
+
+    def append_properties(self, properties):
+        """Append stored property records (the scoring shape feature_columns reads)."""
+        if self._extractor is None:
+            self._extractor = FeatureExtractor(self.variables)
+        columns = self._extractor.extract(properties)
+        text = {
+            'city': [_obj(_obj(p).get('address')).get('city') or '' for p in properties],
+            'state': [_obj(_obj(p).get('address')).get('state') or '' for p in properties],
+            'property_type': [_obj(p).get('property_type') or '' for p in properties],
+        }
+        self.append(columns, text)
+
+    def _close_files(self):
+        for f in (*self._files.values(), *self._codes.values(), self._offsets, self._blob):
+            f.close()
+
+    def close(self):
+        self._close_files()
+        manifest = {
+            'version': STORE_VERSION,
+            'rows': self.rows,
+            'variables': self.variables,
+            'dictionaries': {name: list(values) for name, values in self.dictionaries.items()},
+            'source': self.source,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        with open(os.path.join(self.tmp, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        _swap_directory(self.tmp, self.path)
+
+    def abort(self):
+        self._close_files()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+class ColumnStore:
+    """Read side: columns are opened lazily as read-only memmaps."""
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        try:
+            with open(os.path.join(path, MANIFEST), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ColumnStoreError(f"no readable store at {path}: {e}") from e
+        if manifest.get('version') != STORE_VERSION:
+            raise ColumnStoreError(f"store version {manifest.get('version')} != {STORE_VERSION}")
+
+        self.rows = manifest['rows']
+        self.variables = manifest['variables']
+        self.dictionaries = manifest['dictionaries']
+        self.source = manifest.get('source', '')
+        self.created_at = manifest.get('created_at')
+        self._position = {name: j for j, name in enumerate(self.variables)}
+        self._maps = {}
+
+    def __len__(self):
+        return self.rows
+
+    def _map(self, filename, dtype, count):
+        if filename not in self._maps:
+            if count == 0:
+                self._maps[filename] = np.zeros(0, dtype=dtype)
+            else:
+                path = os.path.join(self.path, filename)
+                if os.path.getsize(path) != count * np.dtype(dtype).itemsize:
+                    raise ColumnStoreError(f"{filename} does not hold {count:,} values")
+                self._maps[filename] = np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+        return self._maps[filename]
+
+    def column(self, name):
+        """(N,) float32 memmap of one scoring variable."""
+        if name not in self._position:
+            raise KeyError(f"no column '{name}' in {self.path}")
+        return self._map(_value_file(name), VALUE_DTYPE, self.rows)
+
+    def codes(self, name):
+        """(N,) int32 memmap of dictionary codes (index into dictionaries[name])."""
+        if name not in self.dictionaries:
+            raise KeyError(f"no dictionary column '{name}' in {self.path}")
+        return self._map(_code_file(name), CODE_DTYPE, self.rows)
+
+    def text(self, name, rows=None):
+        """Decoded values of a dictionary column."""
+        codes = self.codes(name) if rows is None else self.codes(name)[rows]
+        return np.array(self.dictionaries[name], dtype=np.str_)[codes] if len(codes) else np.zeros(0, np.str_)
+
+    def keys(self, rows=None):
+        """Listing keys (MLS:/ADDR: from the CSV path, property_id from JSON exports)."""
+        offsets = self._map('keys.offsets', OFFSET_DTYPE, self.rows + 1)
+        blob = self._map('keys.blob', np.uint8, int(offsets[-1]))
+        rows = _row_index(slice(None) if rows is None else rows)
+        if isinstance(rows, slice):
+            rows = range(*rows.indices(self.rows))
+        return [bytes(blob[offsets[i]:offsets[i + 1]]).decode('utf-8') for i in rows]
+
+    def mask(self, name, *values):
+        """Rows whose dictionary column equals any of `values` (compares int codes only)."""
+        wanted = [i for i, v in enumerate(self.dictionaries[name]) if v in values]
+        return np.isin(self.codes(name), np.array(wanted, dtype=CODE_DTYPE))
+
+    def where(self, name, low=None, high=None):
+        """Rows with low <= column <= high (NaN never matches)."""
+        values = self.column(name)
+        result = ~np.isnan(values)
+        if low is not None:
+            result &= values >= low
+        if high is not None:
+            result &= values <= high
+        return result
+
+    def group_mean(self, by, name, rows=None):
+        """{dictionary value: mean of column} over `rows`, NaN ignored."""
+        codes = np.asarray(self.codes(by))
+        values = np.asarray(self.column(name), dtype=np.float64)
+        if rows is not None:
+            rows = _row_index(rows)
+            codes, values = codes[rows], values[rows]
+        ok = ~np.isnan(values)
+        size = len(self.dictionaries[by])
+        counts = np.bincount(codes[ok], minlength=size)
+        sums = np.bincount(codes[ok], weights=values[ok], minlength=size)
+        return {value: float(sums[i] / counts[i]) for i, value in enumerate(self.dictionaries[by]) if counts[i]}
+
+    def counts(self, by, rows=None):
+        """{dictionary value: rows}"""
+        codes = self.codes(by) if rows is None else self.codes(by)[_row_index(rows)]
+        counts = np.bincount(codes, minlength=len(self.dictionaries[by]))
+        return {value: int(counts[i]) for i, value in enumerate(self.dictionaries[by]) if counts[i]}
+
+    def matrix(self, rows=None, variables=None):
+        """(n, V) Fortran-order float32 matrix of the given rows; only those rows are read."""
+        variables = list(variables or self.variables)
+        index = _row_index(slice(None) if rows is None else rows)
+        n = len(range(*index.indices(self.rows))) if isinstance(index, slice) else len(index)
+        out = np.empty((n, len(variables)), dtype=VALUE_DTYPE, order='F')
+        for j, name in enumerate(variables):
+            out[:, j] = self.column(name)[index]
+        return out
+
+    def features(self, rows=None):
+        """FeatureColumns for BatchScoringEngine.score_columns and friends."""
+        index = np.arange(self.rows) if rows is None else _row_index(rows)
+        return FeatureColumns(list(self.variables), self.matrix(index), self.keys(index))
+
+    def score(self, profile='balanced', rows=None, engine=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """(n,) overall score under one profile, scored chunk by chunk to bound memory."""
+        engine = engine or BatchScoringEngine()
+        if list(self.variables) != engine.config.variables:
+            raise ColumnStoreError('store was written for a different variable order; rebuild it')
+        index = np.arange(self.rows) if rows is None else _row_index(rows)
+        out = np.empty(len(index), dtype=np.float32)
+        for start in range(0, len(index), chunk_rows):
+            chunk = index[start:start + chunk_rows]
+            if rows is None:
+                chunk = slice(start, start + len(chunk))    # contiguous: plain memmap slices
+            out[start:start + chunk_rows] = engine.score_profiles(self.matrix(chunk), [profile])[profile].overall
+        return out
+
+
+def _row_index(rows):
+    """Row index array from a boolean mask, an index array or a slice."""
+    if isinstance(rows, slice):
+        return rows
+    rows = np.asarray(rows)
+    return np.flatnonzero(rows) if rows.dtype == bool else rows
+
+
+def build_store(source, path=DEFAULT_STORE, resolver=None, chunk_size=DEFAULT_CHUNK_ROWS):
+    """Write a store from a feed CSV or a JSON export; returns the row count."""
+    with ColumnStoreWriter(path, source=os.path.basename(source)) as writer:
+        if source.lower().endswith('.json'):
+            with open(source, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get('properties') or _obj(data.get('data')).get('properties') or []
+            for start in range(0, len(data), chunk_size):
+                writer.append_properties(data[start:start + chunk_size])
+        else:
+            from csv_ingest import CSVIngestor
+            for batch in CSVIngestor(source, resolver=resolver, required=()):
+                writer.append_batch(batch)
+        return writer.rows
+
+
+def _bench(n):
+    engine = BatchScoringEngine()
+    cfg = engine.config
+    rng = np.random.default_rng(0)
+    path = os.path.join(tempfile.mkdtemp(), 'store')
+    cities = ['Saint Pete Beach', 'Treasure Island', 'Tampa', 'Clearwater', 'St. Petersburg']
+    states = ['FL', 'GA', 'AL']
+    types = ['single_family', 'condo', 'townhouse']
+
+    t0 = time.perf_counter()
+    with ColumnStoreWriter(path, cfg.variables) as writer:
+        for start in range(0, n, DEFAULT_CHUNK_ROWS):
+            m = min(DEFAULT_CHUNK_ROWS, n - start)
+            matrix = np.asfortranarray(rng.uniform(cfg.mins, cfg.maxs, size=(m, len(cfg.variables)))
+                                       .astype(VALUE_DTYPE))
+            text = {'city': [cities[i] for i in rng.integers(0, len(cities), m)],
+                    'state': [states[i] for i in rng.integers(0, len(states), m)],
+                    'property_type': [types[i] for i in rng.integers(0, len(types), m)]}
+            writer.append(FeatureColumns(cfg.variables, matrix, [f'MLS:TB{start + i}' for i in range(m)]), text)
+    print(f"Wrote {n:,} rows x {len(cfg.variables)} columns in {time.perf_counter() - t0:.2f}s")
+
+    timings = []
+
+    def timed(label, fn):
+        t = time.perf_counter()
+        result = fn()
+        timings.append((label, time.perf_counter() - t))
+        return result
+
+    store = timed('open', lambda: ColumnStore(path))
+    rows = timed('filter city + price', lambda: store.mask('city', 'Tampa') & store.where('price_current', high=400_000))
+    timed('mean price by state', lambda: store.group_mean('state', 'price_current'))
+    timed(f'score {int(rows.sum()):,} filtered rows', lambda: store.score('balanced', rows, engine))
+    timed(f'score all {n:,} rows', lambda: store.score('balanced', engine=engine))
+    for label, seconds in timings:
+        print(f"  {label:<32} {seconds * 1000:9.1f} ms")
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    return 0
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args:
+        print(__doc__)
+        return 2
+    if args[0] == '--bench':
+        return _bench(int(args[1]))
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    path = option('--store', DEFAULT_STORE)
+    if args[0] == 'build' and len(args) > 1:
+        resolver = None
+        if '--mappings' in args:
+            from column_mapping import ColumnMappingResolver
+            resolver = ColumnMappingResolver(option('--mappings', None))
+        t0 = time.perf_counter()
+        rows = build_store(args[1], path, resolver)
+        if resolver is not None:
+            resolver.save()
+        print(f"✅ {rows:,} rows written to {path} in {time.perf_counter() - t0:.2f}s")
+        return 0
+
+    if args[0] == 'info':
+        try:
+            store = ColumnStore(path)
+        except ColumnStoreError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ {path}: {len(store):,} rows x {len(store.variables)} columns "
+              f"(from {store.source or '?'}, {store.created_at})")
+        for name in DICTIONARY_COLUMNS:
+            top = sorted(store.counts(name).items(), key=lambda item: -item[1])[:5]
+            print(f"  {name:<14} {len(store.dictionaries[name]):>5} values  "
+                  + ', '.join(f'{v or "(blank)"} {c:,}' for v, c in top))
+        return 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Streaming CSV ingestion for property exports.
+
+DataImporter.parseCSV / ImportExportHandler.parseCSV load the whole file,
+split it on '\\n' and toggle a quote flag per character, so a quoted field
+with a newline (MLS descriptions) breaks the row and a state-wide export has
+to fit in memory. Here the file is read through a fixed-size buffer and
+parsed by the csv module, which implements RFC 4180: quoted fields, ""
+escapes, embedded commas and embedded newlines. Rows are mapped through the
+CSV_FORMAT.txt column set and handed out as typed, columnar RecordBatches of
+a fixed number of rows, so memory stays bounded by the batch size no matter
+how big the file is. A row with the wrong field count or broken quoting is
+reported as a RowError on its batch and skipped; only a bad header stops
+the feed.
+
+    for batch in read_csv_batches('florida_export.csv'):
+        batch.column('price')       # float64 array, NaN where missing/unparseable
+        batch.to_records()          # DataImporter.mapCSVRow-shaped dicts
+
+Usage:
+    python csv_ingest.py export.csv [--batch-size 10000] [--buffer-kb 1024] [--mappings .column_mappings.json] [--store .property_store]
+    python csv_ingest.py --generate 100000 synthetic.csv
+"""
+
+import csv
+import datetime
+import io
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import numpy as np
+
+TEXT = 'text'
+INT = 'int'
+FLOAT = 'float'
+
+# CSV_FORMAT.txt header, in order
+CSV_FORMAT_COLUMNS = (
+    ('street', TEXT),
+    ('city', TEXT),
+    ('state', TEXT),
+    ('zip', TEXT),
+    ('price', FLOAT),
+    ('bedrooms', INT),
+    ('bathrooms', FLOAT),
+    ('sqft_living', FLOAT),
+    ('sqft_lot', FLOAT),
+    ('year_built', INT),
+    ('property_type', TEXT),
+    ('mls_number', TEXT),
+)
+
+# Extra columns seen in our exports (sample_properties.csv) and MLS feeds
+OPTIONAL_COLUMNS = (
+    ('status', TEXT),
+    ('days_on_market', INT),
+    ('garage_spaces', INT),
+    ('latitude', FLOAT),
+    ('longitude', FLOAT),
+    ('description', TEXT),
+    ('listing_url', TEXT),
+    ('hoa_fees', FLOAT),
+    ('annual_taxes', FLOAT),
+)
+
+COLUMN_TYPES = dict(CSV_FORMAT_COLUMNS + OPTIONAL_COLUMNS)
+REQUIRED_COLUMNS = tuple(name for name, _ in CSV_FORMAT_COLUMNS)
+
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_BUFFER_BYTES = 1024 * 1024
+
+_NUMBER_JUNK = re.compile(r'[^\d.\-]')
+
+# Raise the per-field cap (128 KB) so a long listing description is not an error
+csv.field_size_limit(16 * 1024 * 1024)
+
+
+class CSVFormatError(ValueError):
+    """The file cannot be ingested (missing or unreadable header)."""
+
+
+def parse_number(text):
+    """DataImporter.parseNumber, but missing/unparseable -> NaN instead of 0."""
+    cleaned = _NUMBER_JUNK.sub('', text)
+    try:
+        return float(cleaned)
+    except ValueError:
+        return float('nan')
+
+
+# How a numeric column's cells are converted (picked per column by column_mapping)
+AUTO = 'auto'        # try a straight conversion, clean cell by cell if that fails
+PLAIN = 'plain'      # every cell is a bare number
+BLANKS = 'blanks'    # bare numbers and empty cells
+DIRTY = 'dirty'      # currency symbols, thousands separators, units, ...
+
+
+def to_numeric(values, kind, converter=AUTO):
+    """List of cell strings -> float64 array (NaN = missing)."""
+    array = None
+    if converter in (AUTO, PLAIN, BLANKS):
+        try:
+            if converter == BLANKS:
+                values = [v or 'nan' for v in values]
+            array = np.array(values, dtype=np.float64)
+        except ValueError:
+            array = None    # the sample did not see everything: clean this batch
+    if array is None:
+        array = np.array([parse_number(v) for v in values], dtype=np.float64)
+    if kind == INT:
+        np.trunc(array, out=array)      # parseInt semantics
+    return array
+
+
+@dataclass
+class RowError:
+    row: int          # 1-based record number (header = 1), like importFromCSV
+    line: int         # physical line where the record ended
+    message: str
+
+
+@dataclass
+class RecordBatch:
+    """One batch of rows, column by column."""
+    columns: dict                  # name -> np.ndarray (numeric) or list of str (text)
+    row_numbers: np.ndarray        # 1-based record numbers, header = 1
+    errors: list = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.row_numbers)
+
+    def column(self, name):
+        return self.columns.get(name)
+
+    def to_records(self):
+        """Rows in the DataImporter.mapCSVRow shape (what the app stores)."""
+        cols = self.columns
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+        def number(name, i, default=0):
+            value = cols[name][i]
+            return default if np.isnan(value) else (int(value) if COLUMN_TYPES[name] == INT else float(value))
+
+        records = []
+        for i in range(len(self)):
+            basic, financial, location = {}, {}, {}
+            if 'street' in cols:
+                basic['address'] = cols['street'][i]
+            if 'city' in cols:
+                location['city'] = cols['city'][i]
+            if 'state' in cols:
+                location['state'] = cols['state'][i]
+            if 'zip' in cols:
+                location['zipCode'] = cols['zip'][i]
+            if 'price' in cols:
+                financial['listingPrice'] = number('price', i)
+            if 'bedrooms' in cols:
+                basic['bedrooms'] = number('bedrooms', i)
+            if 'bathrooms' in cols:
+                basic['bathrooms'] = number('bathrooms', i)
+            if 'sqft_living' in cols:
+                basic['squareFeet'] = number('sqft_living', i)
+            if 'sqft_lot' in cols:
+                basic['lotSize'] = number('sqft_lot', i)
+            if 'year_built' in cols:
+                basic['yearBuilt'] = number('year_built', i, None) or None
+            if 'property_type' in cols:
+                basic['propertyType'] = cols['property_type'][i]
+            if 'description' in cols:
+                basic['description'] = cols['description'][i]
+            if 'mls_number' in cols:
+                basic['mlsNumber'] = cols['mls_number'][i]
+            if 'days_on_market' in cols:
+                financial['daysOnMarket'] = number('days_on_market', i)
+            if 'status' in cols:
+                basic['status'] = cols['status'][i]
+            if 'garage_spaces' in cols:
+                basic['garageSpaces'] = number('garage_spaces', i)
+            if 'listing_url' in cols:
+                basic['listingUrl'] = cols['listing_url'][i]
+            if 'hoa_fees' in cols:
+                financial['hoaFees'] = number('hoa_fees', i)
+            if 'annual_taxes' in cols:
+                financial['annualTaxes'] = number('annual_taxes', i)
+            # Coordinates in both location and basic, like mapCSVRow; 0/NaN = none
+            for name, key in (('latitude', 'latitude'), ('longitude', 'longitude')):
+                if name in cols:
+                    value = number(name, i)
+                    if value:
+                        location[key] = value
+                        basic.setdefault('coordinates', {})[key] = value
+
+            records.append({
+                'id': f"prop_{int(time.time() * 1000)}_{uuid.uuid4().hex[:9]}",
+                'source': 'csv_import',
+                'importDate': now,
+                'basic': basic,
+                'financial': financial,
+                'location': location,
+                'features': {},
+                'condition': {},
+            })
+        return records
+
+
+@dataclass
+class IngestStats:
+    rows: int = 0
+    batches: int = 0
+    bad_rows: int = 0
+    skipped: int = 0
+    bytes_read: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class ColumnPlan:
+    """Which cell feeds which column, and how to convert it."""
+    positions: dict                                   # column name -> cell index
+    converters: dict = field(default_factory=dict)    # column name -> AUTO/PLAIN/BLANKS/DIRTY
+    source: str = 'exact'                             # exact | detected | cache
+
+    def check(self, required):
+        missing = [c for c in required if c not in self.positions]
+        if missing:
+            raise CSVFormatError(f"missing column(s): {', '.join(missing)}")
+        return self
+
+
+def resolve_header(header, required=REQUIRED_COLUMNS):
+    """{column name: position} for the CSV_FORMAT.txt / optional columns present."""
+    positions = {}
+    for i, raw in enumerate(header):
+        name = raw.strip().lower()
+        if name in COLUMN_TYPES and name not in positions:
+            positions[name] = i
+    return ColumnPlan(positions).check(required).positions
+
+
+class CSVIngestor:
+    """Streams one CSV file into RecordBatches."""
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, buffer_bytes=DEFAULT_BUFFER_BYTES,
+                 required=REQUIRED_COLUMNS, encoding='utf-8-sig', resolver=None, sample_rows=200, skip=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer_bytes = buffer_bytes
+        self.required = required
+        self.encoding = encoding
+        self.resolver = resolver          # e.g. column_mapping.ColumnMappingResolver
+        self.sample_rows = sample_rows
+        self.skip = skip                  # skip(raw cells) -> True drops the row before it is typed
+        self.header = None
+        self.plan = None
+        self.stats = IngestStats()
+
+    @property
+    def positions(self):
+        return self.plan.positions if self.plan else None
+
+    def _build_batch(self, rows, row_numbers, errors):
+        columns = {}
+        converters = self.plan.converters
+        for name, pos in self.plan.positions.items():
+            values = [row[pos].strip() for row in rows]
+            kind = COLUMN_TYPES[name]
+            columns[name] = values if kind == TEXT else to_numeric(values, kind, converters.get(name, AUTO))
+        return RecordBatch(columns, np.array(row_numbers, dtype=np.int64), errors)
+
+    def _plan(self, header, reader):
+        """ColumnPlan for this header, plus any rows read ahead to build it."""
+        if self.resolver is None:
+            return ColumnPlan(resolve_header(header, self.required)), []
+
+        plan = self.resolver.lookup(header)
+        sample = []
+        if plan is None:
+            for _ in range(self.sample_rows):
+                try:
+                    sample.append(next(reader))
+                except StopIteration:
+                    break
+                except csv.Error as e:
+                    sample.append(csv.Error(str(e), reader.line_num))   # replayed as a row error
+            plan = self.resolver.resolve(header, [row for row in sample if not isinstance(row, csv.Error)])
+        return plan.check(self.required), sample
+
+    def batches(self):
+        t0 = time.perf_counter()
+        raw = open(self.path, 'rb', buffering=self.buffer_bytes)
+        text = io.TextIOWrapper(raw, encoding=self.encoding, newline='', errors='replace')
+        try:
+            reader = csv.reader(text, strict=True)
+            try:
+                header = next(reader)
+            except StopIteration:
+                raise CSVFormatError('empty file')
+            except csv.Error as e:
+                raise CSVFormatError(f"header: {e}") from None
+            self.header = header
+            self.plan, pending = self._plan(header, reader)
+            width = len(header)
+
+            rows, row_numbers, errors = [], [], []
+            record = 1
+            pending.reverse()
+            while True:
+                try:
+                    row = pending.pop() if pending else next(reader)
+                except StopIteration:
+                    break
+                except csv.Error as e:
+                    row = csv.Error(str(e), reader.line_num)
+                record += 1
+                if isinstance(row, csv.Error):
+                    # Broken quoting spoils only this record: the reader resumes on the next line
+                    message, line_num = row.args
+                    errors.append(RowError(record, line_num, f"bad quoting: {message}"))
+                    self.stats.bad_rows += 1
+                    continue
+                if not row or (len(row) == 1 and not row[0].strip()):
+                    continue      # blank line
+                if len(row) != width:
+                    errors.append(RowError(record, reader.line_num,
+                                           f"expected {width} fields, got {len(row)}"))
+                    self.stats.bad_rows += 1
+                    continue
+                if self.skip is not None and self.skip(row):
+                    self.stats.skipped += 1
+                    continue
+                rows.append(row)
+                row_numbers.append(record)
+                if len(rows) == self.batch_size:
+                    yield self._emit(rows, row_numbers, errors, raw, t0)
+                    rows, row_numbers, errors = [], [], []
+            if rows or errors:
+                yield self._emit(rows, row_numbers, errors, raw, t0)
+        finally:
+            self.stats.bytes_read = raw.tell() if not raw.closed else self.stats.bytes_read
+            text.close()
+            self.stats.seconds = time.perf_counter() - t0
+
+    def _emit(self, rows, row_numbers, errors, raw, t0):
+        batch = self._build_batch(rows, row_numbers, errors)
+        self.stats.rows += len(rows)
+        self.stats.batches += 1
+        self.stats.bytes_read = raw.tell()
+        self.stats.seconds = time.perf_counter() - t0
+        return batch
+
+    __iter__ = batches
+
+
+def read_csv_batches(path, batch_size=DEFAULT_BATCH_SIZE, buffer_bytes=DEFAULT_BUFFER_BYTES, resolver=None):
+    """Convenience generator over CSVIngestor(path, ...).batches()."""
+    yield from CSVIngestor(path, batch_size, buffer_bytes, resolver=resolver).batches()
+
+
+def generate_csv(path, n, seed=0):
+    """Synthetic export in the CSV_FORMAT.txt layout (+ quoted multiline descriptions)."""
+    rng = random.Random(seed)
+    cities = ['Saint Pete Beach', 'Treasure Island', 'Tampa', 'Clearwater', 'St. Petersburg']
+    names = [n for n, _ in CSV_FORMAT_COLUMNS] + [n for n, _ in OPTIONAL_COLUMNS]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for i in range(n):
+            description = rng.choice([
+                'Waterfront, "turnkey" home',
+                'Updated kitchen\nNew roof 2021\nNo HOA',
+                '',
+                'Corner lot, pool, 2-car garage',
+            ])
+            writer.writerow([
+                f"{rng.randint(100, 9999)} {rng.choice(['Gulf Blvd', '41st Ave', 'Blind Pass Dr'])}",
+                rng.choice(cities), 'FL', f"337{rng.randint(0, 99):02d}",
+                rng.randint(150, 3000) * 1000, rng.randint(1, 6), rng.choice([1, 1.5, 2, 2.5, 3]),
+                rng.randint(600, 5000), rng.randint(2000, 20000), rng.randint(1920, 2024),
+                rng.choice(['single_family', 'condo', 'townhouse']), f"TB{8000000 + i}",
+                'active', rng.randint(0, 200), rng.randint(0, 3),
+                round(27.6 + rng.random(), 6), round(-82.8 + rng.random() * 0.4, 6), description,
+                f"https://example.com/listing/TB{8000000 + i}", rng.choice(['', 0, 150, 420]),
+                rng.randint(1500, 12000),
+            ])
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it is not
+    available (the resource module is Unix-only)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args:
+        print(__doc__)
+        return 2
+
+    if args[0] == '--generate':
+        n, path = int(args[1]), args[2]
+        generate_csv(path, n)
+        print(f"Wrote {n:,} rows to {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+        return 0
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    resolver = None
+    if '--mappings' in args:
+        from column_mapping import ColumnMappingResolver
+        resolver = ColumnMappingResolver(option('--mappings', None))
+
+    writer = None
+    if '--store' in args:
+        from column_store import ColumnStoreWriter
+        writer = ColumnStoreWriter(option('--store', None), source=os.path.basename(args[0]))
+
+    ingestor = CSVIngestor(args[0], int(option('--batch-size', DEFAULT_BATCH_SIZE)),
+                           int(option('--buffer-kb', DEFAULT_BUFFER_BYTES // 1024)) * 1024,
+                           resolver=resolver)
+    try:
+        for batch in ingestor:
+            for error in batch.errors[:5]:
+                print(f"  ⚠️ row {error.row} (line {error.line}): {error.message}")
+            if writer is not None:
+                writer.append_batch(batch)
+    except CSVFormatError as e:
+        if writer is not None:
+            writer.abort()
+        print(f"❌ {args[0]}: {e}")
+        return 1
+    if writer is not None:
+        writer.close()
+        print(f"  column store: {writer.rows:,} rows in {writer.path}")
+
+    if resolver is not None:
+        resolver.save()
+        print(f"  column mapping: {ingestor.plan.source}")
+
+    stats = ingestor.stats
+    peak_mb = peak_rss_mb()
+    peak = f", peak RSS {peak_mb:.0f} MB" if peak_mb is not None else ""
+    print(f"✅ {stats.rows:,} rows in {stats.batches} batches, {stats.bad_rows} bad rows, "
+          f"{stats.bytes_read / 1e6:.1f} MB in {stats.seconds:.2f}s "
+          f"({stats.rows_per_sec:,.0f} rows/sec{peak})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
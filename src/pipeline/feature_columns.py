@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Columnar feature extraction for the scoring variables.
+
+ScoringEngine.getPropertyValue rebuilds its whole ~100-entry mapping (with
+four inspection.red_flags.find scans) for every single variable, so scoring
+one property is O(V^2). Here each property record is walked exactly once:
+its nested objects (analytics, analytics.variable_values, square_feet, ...)
+are resolved once, every variable is read from them, and the values land in
+a preallocated float32 column per variable, NaN where missing.
+
+The `|| default` substitutions from getPropertyValue (condition_rating -> 7,
+insurance_cost_annual -> 1200, ...) are applied afterwards, vectorized per
+column over NaN. JS `||` tests the raw value, not the number, so while
+walking a record a falsy raw value (missing, null, 0, '', false) in a
+defaulted column is stored as NaN, and a truthy one is kept even when it
+converts to 0 (the string '0' stays 0).
+
+Scoring (batch_scoring.BatchScoringEngine.score_columns), ranking and export
+all consume FeatureColumns instead of the nested dicts.
+
+Usage:
+    python feature_columns.py properties.json [out.csv]
+"""
+
+import csv
+import datetime
+import json
+import math
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from batch_scoring import load_scoring_config
+
+# variable -> path of a plain read in getPropertyValue
+FIELD_PATHS = {
+    'sqft_living': ('square_feet', 'living'),
+    'sqft_lot': ('square_feet', 'lot'),
+    'bedrooms': ('bedrooms',),
+    'bathrooms_total': ('bathrooms', 'total'),
+    'year_built': ('year_built',),
+    'garage_spaces': ('garage_spaces',),
+    'stories': ('stories',),
+    'price_current': ('price', 'current'),
+    'price_per_sqft': ('analytics', 'price_per_sqft'),
+    'price_vs_market': ('analytics', 'price_vs_market'),
+    'annual_taxes': ('taxes', 'annual_amount'),
+    'hoa_fees_monthly': ('hoa_fees', 'monthly'),
+    'appreciation_rate_5yr': ('analytics', 'appreciation_rate'),
+    'walk_score': ('analytics', 'walk_score'),
+    'transit_score': ('analytics', 'transit_score'),
+    'bike_score': ('analytics', 'bike_score'),
+    'crime_index': ('analytics', 'crime_index'),
+    'school_rating_elementary': ('analytics', 'school_ratings', 'elementary'),
+    'school_rating_middle': ('analytics', 'school_ratings', 'middle'),
+    'school_rating_high': ('analytics', 'school_ratings', 'high'),
+    'days_on_market': ('days_on_market', 'current'),
+    'outdoor_space_sqft': ('square_feet', 'lot'),
+    'pricing_vs_comps_pct': ('analytics', 'price_vs_market'),
+}
+
+# analytics.variable_values.<variable> || default
+VARIABLE_VALUE_DEFAULTS = {
+    'condition_rating': 7, 'roof_type_quality': 5, 'windows_efficiency': 5,
+    'insulation_rating': 5, 'foundation_quality': 7, 'accessibility_features': 0,
+    'construction_quality': 7,
+    'price_history_volatility': 10, 'insurance_cost_annual': 1200,
+    'utility_costs_monthly': 200, 'maintenance_cost_annual': 2000,
+    'rental_income_potential': 0, 'cap_rate': 0,
+    'commute_time_work': 30, 'distance_shopping_miles': 2, 'distance_hospital_miles': 5,
+    'distance_airport_miles': 20, 'noise_level': 30, 'air_quality_index': 50,
+    'neighborhood_growth_rate': 5, 'new_development_score': 5, 'gentrification_index': 50,
+    'parks_recreation_access': 5, 'restaurant_retail_density': 50,
+    'list_to_sale_ratio': 0.98, 'inventory_level_months': 3, 'absorption_rate': 6,
+    'competitive_listings_count': 10, 'recent_sales_volume': 50,
+    'price_trend_30day_pct': 0, 'price_trend_90day_pct': 2, 'seasonality_factor': 1,
+    'interest_rate_impact': 5,
+    'hurricane_risk': 10, 'mold_presence_score': 10, 'radon_level': 2,
+    'environmental_hazards': 10, 'title_issues_score': 5, 'hoa_litigation_risk': 10,
+    'deck_patio_sqft': 0, 'kitchen_update_score': 5, 'bathroom_update_score': 5,
+    'smart_home_features_count': 0, 'energy_efficiency_score': 50, 'view_quality_score': 5,
+    'privacy_rating': 5, 'finished_basement_sqft': 0,
+    'cash_flow_monthly': 0, 'roi_estimate_annual': 5, 'equity_potential': 0,
+    'value_add_opportunities_score': 30, 'development_potential_score': 20,
+    'rental_demand_score': 50, 'tenant_quality_score': 60, 'vacancy_risk_score': 30,
+    'market_cycle_position': 5, 'comparable_performance_score': 50,
+    'unique_features_count': 3, 'condition_vs_comps_score': 50,
+    'location_vs_comps_score': 50, 'features_vs_comps_score': 50,
+    'marketing_reach_score': 50, 'showing_availability_score': 70,
+}
+
+# plain reads that also carry a `|| default`
+FIELD_DEFAULTS = {
+    'hoa_fees_monthly': 0,
+    'appreciation_rate_5yr': 5,
+    'outdoor_space_sqft': 0,
+    'pricing_vs_comps_pct': 0,
+}
+
+DEFAULTS = {**VARIABLE_VALUE_DEFAULTS, **FIELD_DEFAULTS}
+
+RED_FLAG_VARIABLES = {
+    'foundation_issues_score': 'foundation',
+    'roof_issues_score': 'roof',
+    'electrical_issues_score': 'electrical',
+    'plumbing_issues_score': 'plumbing',
+}
+
+COMPUTED_VARIABLES = {
+    'roof_age', 'flood_zone_risk', 'earthquake_risk', 'fire_risk',
+    'asbestos_risk', 'lead_paint_risk', 'pool_present', 'fireplace_count',
+    'hardwood_floors_pct', 'presentation_quality_score', *RED_FLAG_VARIABLES,
+}
+
+NAN = float('nan')
+
+
+def _obj(value):
+    """Optional chaining: anything that is not an object reads as empty."""
+    return value if isinstance(value, dict) else {}
+
+
+def to_number(value):
+    """JS-ish numeric coercion of a raw field; missing/non-numeric -> NaN."""
+    kind = type(value)
+    if kind is float or kind is int:
+        return float(value)
+    if value is None:
+        return NAN
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip()) if value.strip() else 0.0
+        except ValueError:
+            return NAN
+    return NAN
+
+
+def _js_truthy(value):
+    if value is None or value is False or value == '' or value == 0:
+        return False
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return True
+
+
+def _js_less(prop, key, limit):
+    """`property.year_built < limit` with JS coercion (null -> 0, undefined -> NaN)."""
+    if key not in prop:
+        return False
+    value = prop[key]
+    if value is None:
+        return 0 < limit
+    number = to_number(value)
+    return not math.isnan(number) and number < limit
+
+
+def _includes(container, item):
+    """Array.prototype.includes / String.prototype.includes."""
+    if isinstance(container, (list, str)):
+        return item in container
+    return False
+
+
+def _computed_values(prop, resolved, year):
+    """Every derived variable of getPropertyValue, from one look at the record."""
+    analytics = resolved[('analytics',)]
+    features = _obj(prop.get('features'))
+    interior = features.get('interior')
+    exterior = features.get('exterior')
+
+    # one pass over red_flags: first flag per category wins, like find()
+    first_severity = {}
+    flags = _obj(prop.get('inspection')).get('red_flags')
+    if isinstance(flags, list):
+        for flag in flags:
+            if isinstance(flag, dict):
+                first_severity.setdefault(flag.get('category'), flag.get('severity'))
+
+    year_built = prop.get('year_built')
+    photos = _obj(prop.get('media')).get('photos')
+
+    values = {
+        'roof_age': year - (to_number(year_built) if _js_truthy(year_built) else 2000),
+        'flood_zone_risk': 80.0 if _js_truthy(analytics.get('flood_zone')) else 10.0,
+        'earthquake_risk': 80.0 if analytics.get('earthquake_risk') == 'high' else 20.0,
+        'fire_risk': 80.0 if analytics.get('fire_risk') == 'high' else 20.0,
+        'asbestos_risk': 60.0 if _js_less(prop, 'year_built', 1980) else 10.0,
+        'lead_paint_risk': 60.0 if _js_less(prop, 'year_built', 1978) else 10.0,
+        'pool_present': 1.0 if _includes(exterior, 'pool') else 0.0,
+        'fireplace_count': float(sum(1 for f in interior if isinstance(f, str) and 'fireplace' in f))
+        if isinstance(interior, list) else 0.0,
+        'hardwood_floors_pct': 80.0 if _includes(interior, 'hardwood') else 20.0,
+        'presentation_quality_score': 80.0 if isinstance(photos, (list, str)) and len(photos) > 10 else 40.0,
+    }
+    for variable, category in RED_FLAG_VARIABLES.items():
+        values[variable] = 80.0 if first_severity.get(category) == 'critical' else 10.0
+    return values
+
+
+@dataclass
+class FeatureColumns:
+    """One float32 column per scoring variable (NaN = missing), plus row ids."""
+    variables: list
+    matrix: np.ndarray   # (N, V), Fortran order so every column is contiguous
+    ids: list
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def column(self, name):
+        return self.matrix[:, self.variables.index(name)]
+
+    def take(self, rows):
+        """Subset of rows (index array or boolean mask)."""
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        return FeatureColumns(self.variables, np.asfortranarray(self.matrix[rows]),
+                              [self.ids[i] for i in rows])
+
+
+class FeatureExtractor:
+    """Compiles the getPropertyValue mapping for a variable order, once."""
+
+    def __init__(self, variables=None, year=None):
+        self.variables = list(variables or load_scoring_config().variables)
+        self.year = year or datetime.date.today().year
+        self._position = {name: i for i, name in enumerate(self.variables)}
+
+        unknown = [v for v in self.variables
+                   if v not in FIELD_PATHS and v not in VARIABLE_VALUE_DEFAULTS and v not in COMPUTED_VARIABLES]
+        if unknown:
+            raise KeyError(f"no getPropertyValue mapping for: {', '.join(unknown)}")
+
+        # Every parent object any variable reads from, shortest path first
+        parents = {('analytics',), ('analytics', 'variable_values')}
+        for path in FIELD_PATHS.values():
+            for i in range(1, len(path)):
+                parents.add(path[:i])
+        self._parents = sorted(parents, key=len)
+
+        # parent path -> {key: [column, ...]} for plain reads; a key can feed
+        # several variables (square_feet.lot -> sqft_lot and outdoor_space_sqft)
+        self._readers = {}
+        self._computed = []
+        for j, name in enumerate(self.variables):
+            if name in FIELD_PATHS:
+                path = FIELD_PATHS[name]
+                parent, key = path[:-1], path[-1]
+            elif name in VARIABLE_VALUE_DEFAULTS:
+                parent, key = ('analytics', 'variable_values'), name
+            else:
+                self._computed.append((j, name))
+                continue
+            self._readers.setdefault(parent, {}).setdefault(key, []).append(j)
+        self._readers = list(self._readers.items())
+        self._empty = [NAN] * len(self.variables)
+
+        self._defaults = [(self._position[v], d) for v, d in DEFAULTS.items() if v in self._position]
+        self._defaulted = {j for j, _ in self._defaults}
+
+    def row(self, prop):
+        """Raw values (before defaults; NaN where `||` would default) for one property, in variable order."""
+        prop = _obj(prop)
+        resolved = {(): prop}
+        for path in self._parents:
+            resolved[path] = _obj(resolved[path[:-1]].get(path[-1]))
+
+        row = self._empty[:]
+        defaulted = self._defaulted
+        for parent, keymap in self._readers:
+            obj = resolved[parent]
+            # walk whichever side is smaller: the record's keys or the wanted keys
+            if len(obj) <= len(keymap):
+                pairs = ((obj[key], keymap[key]) for key in obj if key in keymap)
+            else:
+                pairs = ((obj[key], columns) for key, columns in keymap.items() if key in obj)
+            for value, columns in pairs:
+                number = to_number(value)
+                falsy = (number == 0 or number != number) and not _js_truthy(value)
+                for j in columns:
+                    row[j] = NAN if falsy and j in defaulted else number
+
+        computed = _computed_values(prop, resolved, self.year)
+        for j, name in self._computed:
+            row[j] = computed[name]
+        return row
+
+    def apply_defaults(self, matrix):
+        """The `|| default` substitutions, vectorized: NaN -> default (row() already mapped falsy raw values to NaN)."""
+        for j, default in self._defaults:
+            col = matrix[:, j]
+            col[np.isnan(col)] = default
+        return matrix
+
+    def extract(self, properties, chunk_size=8192):
+        """Walk each property once into preallocated float32 columns."""
+        if not isinstance(properties, list):
+            properties = list(properties)
+        n = len(properties)
+        matrix = np.full((n, len(self.variables)), np.nan, dtype=np.float32, order='F')
+        ids = []
+        for start in range(0, n, chunk_size):
+            chunk = properties[start:start + chunk_size]
+            matrix[start:start + len(chunk)] = [self.row(p) for p in chunk]
+            ids.extend(_obj(p).get('property_id', start + i) for i, p in enumerate(chunk))
+        self.apply_defaults(matrix)
+        return FeatureColumns(self.variables, matrix, ids)
+
+
+def extract_features(properties, variables=None, year=None):
+    """Convenience wrapper: FeatureExtractor(variables, year).extract(properties)."""
+    return FeatureExtractor(variables, year).extract(properties)
+
+
+def export_csv(columns, path, scores=None):
+    """Write property_id, every variable column and optional {name: (N,) scores}."""
+    scores = scores or {}
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['property_id', *columns.variables, *scores])
+        extra = np.column_stack(list(scores.values())) if scores else None
+        for i, values in enumerate(columns.matrix.tolist()):
+            row = [columns.ids[i], *('' if math.isnan(v) else round(v, 4) for v in values)]
+            if extra is not None:
+                row.extend(round(float(v), 4) for v in extra[i])
+            writer.writerow(row)
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args:
+        print(__doc__)
+        return 2
+
+    from batch_scoring import BatchScoringEngine
+
+    with open(args[0], 'r', encoding='utf-8') as f:
+        properties = json.load(f)
+    if isinstance(properties, dict):
+        properties = properties.get('properties', [])
+
+    columns = extract_features(properties)
+    results = BatchScoringEngine().score_columns(columns)
+    print(f"Extracted {len(columns)} properties x {len(columns.variables)} variables")
+    if len(args) > 1:
+        export_csv(columns, args[1], {f'score_{name}': r.overall for name, r in results.items()})
+        print(f"Wrote {args[1]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Indexed property search over a local SQLite store.
+
+DataManager.searchProperties (data-manager.js) loads every property and
+filters in JS. Here the searchable fields live in one SQLite table with
+compound indexes, and a small planner turns the searchProperties criteria
+into one indexed query:
+
+    1. every index is matched against the criteria: equality columns from the
+       left, then at most one range column (the usual B-tree prefix rule)
+    2. the matched prefix is costed with column statistics - per-value counts
+       for city/status/property_type, a quantile sketch for the numeric columns
+    3. the index with the fewest estimated rows wins (INDEXED BY). When even
+       that would read more than SCAN_FRACTION of the table, a plain scan does.
+
+The remaining predicates run inside SQLite on the index entries it yields.
+explain() shows the whole decision:
+
+    index = PropertyIndex('.property_index.sqlite')
+    index.search({'city': 'Tampa', 'maxPrice': 400000, 'minBedrooms': 3})
+    index.explain({'city': 'Tampa', 'maxPrice': 400000}).describe()
+
+Criteria use the searchProperties names, and a falsy value means "no filter"
+as in JS. One difference: a listing without a price never matches a price
+range here. In the JS filter, `undefined < minPrice` is false, so such a
+listing slips through.
+
+Usage:
+    python property_query.py load feed.csv|export.json [--db .property_index.sqlite]
+    python property_query.py search [--db ...] [--city Tampa] [--maxPrice 400000] [--explain] ...
+    python property_query.py --bench 1000000
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+DEFAULT_DB = '.property_index.sqlite'
+SCHEMA_VERSION = 2
+SCAN_FRACTION = 0.3
+SKETCH_SIZE = 1024
+DEFAULT_LIMIT = 1000
+
+COLUMNS = (
+    ('property_id', 'TEXT PRIMARY KEY'),
+    ('price', 'REAL'),
+    ('bedrooms', 'REAL'),
+    ('bathrooms', 'REAL'),
+    ('property_type', 'TEXT'),
+    ('city', 'TEXT'),
+    ('status', 'TEXT'),
+    ('state', 'TEXT'),
+    ('zip', 'TEXT'),
+    ('record', 'TEXT'),       # JSON of the stored property, when loaded from an export
+)
+RESULT_COLUMNS = tuple(name for name, _ in COLUMNS if name != 'record')
+EQUALITY_COLUMNS = ('city', 'status', 'property_type')
+RANGE_COLUMNS = ('price', 'bedrooms', 'bathrooms')
+
+# Equality columns first, then one range column. The other searchable columns
+# trail along so residual predicates are checked on index entries, before
+# any table row is read.
+INDEXES = (
+    ('idx_city_status_price', ('city', 'status', 'price', 'bedrooms', 'bathrooms', 'property_type')),
+    ('idx_type_status_price', ('property_type', 'status', 'price', 'bedrooms', 'bathrooms', 'city')),
+    ('idx_status_price', ('status', 'price', 'bedrooms', 'bathrooms', 'property_type', 'city')),
+    ('idx_price', ('price', 'bedrooms', 'bathrooms', 'property_type', 'city', 'status')),
+    ('idx_bedrooms_bathrooms', ('bedrooms', 'bathrooms', 'price', 'property_type', 'city', 'status')),
+    ('idx_bathrooms', ('bathrooms', 'bedrooms', 'price', 'property_type', 'city', 'status')),
+)
+
+# searchProperties criterion -> (column, operator)
+CRITERIA = {
+    'minPrice': ('price', '>='),
+    'maxPrice': ('price', '<='),
+    'minBedrooms': ('bedrooms', '>='),
+    'minBathrooms': ('bathrooms', '>='),
+    'propertyType': ('property_type', '='),
+    'city': ('city', '='),
+    'status': ('status', '='),
+}
+
+
+@dataclass
+class Predicate:
+    column: str
+    op: str
+    value: object
+
+    def sql(self):
+        return f"{self.column} {self.op} ?"
+
+
+def parse_criteria(criteria):
+    """searchProperties criteria -> [Predicate]; falsy values are no filter, like JS."""
+    predicates = []
+    for key, value in (criteria or {}).items():
+        if key not in CRITERIA:
+            raise KeyError(f"unknown search criterion '{key}' ({', '.join(CRITERIA)})")
+        if value:
+            column, op = CRITERIA[key]
+            predicates.append(Predicate(column, op, value))
+    return predicates
+
+
+@dataclass
+class ColumnStats:
+    rows: int
+    values: dict      # equality column -> {value: count}
+    sketch: dict      # range column -> sorted sample of non-null values
+    nulls: dict       # range column -> null fraction
+
+    def selectivity(self, predicate):
+        if self.rows == 0:
+            return 0.0
+        if predicate.column in self.values:
+            return self.values[predicate.column].get(predicate.value, 0) / self.rows
+        sample = self.sketch.get(predicate.column)
+        if sample is None or len(sample) == 0:
+            return 1.0
+        if predicate.op == '>=':
+            inside = 1.0 - np.searchsorted(sample, predicate.value, side='left') / len(sample)
+        else:
+            inside = np.searchsorted(sample, predicate.value, side='right') / len(sample)
+        return float(inside) * (1.0 - self.nulls.get(predicate.column, 0.0))
+
+    def estimate(self, predicates):
+        """Rows matching all predicates, columns assumed independent."""
+        fraction = 1.0
+        for column in dict.fromkeys(p.column for p in predicates):
+            on_column = [self.selectivity(p) for p in predicates if p.column == column]
+            if len(on_column) == 2:
+                # min and max: the two ranges overlap on present values only
+                present = 1.0 - self.nulls.get(column, 0.0)
+                fraction *= max(0.0, on_column[0] + on_column[1] - present)
+            else:
+                fraction *= on_column[0]
+        return int(round(self.rows * fraction))
+
+
+@dataclass
+class QueryPlan:
+    index: str                    # index name, or None for a table scan
+    index_columns: tuple          # the columns of the index the query can use
+    index_predicates: list        # predicates answered by the index
+    residual: list                # predicates checked on the rows the index yields
+    estimated_rows: int
+    table_rows: int
+    candidates: list = field(default_factory=list)   # [(index, used columns, estimated rows)]
+    sql: str = ''
+    params: tuple = ()
+    sqlite_plan: list = field(default_factory=list)  # EXPLAIN QUERY PLAN detail lines
+
+    def describe(self):
+        lines = [f"{'INDEX ' + self.index if self.index else 'TABLE SCAN'}  "
+                 f"~{self.estimated_rows:,} of {self.table_rows:,} rows"]
+        if self.index_predicates:
+            lines.append('  index:    ' + ' AND '.join(f"{p.column} {p.op} {p.value!r}" for p in self.index_predicates))
+        if self.residual:
+            lines.append('  residual: ' + ' AND '.join(f"{p.column} {p.op} {p.value!r}" for p in self.residual))
+        for name, used, estimate in self.candidates:
+            lines.append(f"  candidate {name:<24} ({', '.join(used)}) ~{estimate:,}")
+        lines.extend(f"  sqlite:   {detail}" for detail in self.sqlite_plan)
+        return '\n'.join(lines)
+
+
+def _match_index(columns, predicates):
+    """Predicates an index can answer: equality prefix, then one range column."""
+    used, answered = [], []
+    for column in columns:
+        equal = [p for p in predicates if p.column == column and p.op == '=']
+        ranged = [p for p in predicates if p.column == column and p.op != '=']
+        if equal:
+            used.append(column)
+            answered.extend(equal)
+            continue
+        if ranged:
+            used.append(column)
+            answered.extend(ranged)
+        break
+    return tuple(used), answered
+
+
+class PropertyIndex:
+    """SQLite table of the searchable property fields, with a cost-based index choice."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode = WAL' if path != ':memory:' else 'PRAGMA journal_mode = MEMORY')
+        self.db.execute('PRAGMA synchronous = NORMAL')
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            # An old layout is only an index over the real data: rebuild
+            self.db.execute('DROP TABLE IF EXISTS properties')
+        self.db.execute(f"CREATE TABLE IF NOT EXISTS properties "
+                        f"({', '.join(f'{name} {kind}' for name, kind in COLUMNS)})")
+        for name, columns in INDEXES:
+            self.db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON properties ({', '.join(columns)})")
+        self.db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self.db.commit()
+        self._stats = None
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM properties').fetchone()[0]
+
+    # ----- loading -----
+
+    def upsert(self, rows):
+        """Insert or replace rows of (property_id, price, bedrooms, ..., record) in one transaction."""
+        placeholders = ', '.join('?' * len(COLUMNS))
+        with self.db:
+            self.db.executemany(f"INSERT OR REPLACE INTO properties VALUES ({placeholders})", rows)
+        self._stats = None
+
+    def add_batch(self, batch):
+        """Index a csv_ingest RecordBatch (listing keys as property_id)."""
+        from incremental_import import listing_keys
+
+        n = len(batch)
+        keys = listing_keys(batch)
+
+        def number(name):
+            values = batch.column(name)
+            if values is None:
+                return [None] * n
+            return [None if v != v else float(v) for v in values.tolist()]
+
+        def text(name):
+            values = batch.column(name)
+            return [v or None for v in values] if values is not None else [None] * n
+
+        columns = [number('price'), number('bedrooms'), number('bathrooms'),
+                   text('property_type'), text('city'), text('status'), text('state'), text('zip')]
+        self.upsert((str(key), *row, None) for key, *row in zip(keys, *columns) if key)
+
+    def add_properties(self, properties):
+        """Index stored property records (the shape searchProperties reads)."""
+        def obj(value):
+            return value if isinstance(value, dict) else {}
+
+        def number(value):
+            return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+        self.upsert((
+            str(p.get('property_id')),
+            number(obj(p.get('price')).get('current')),
+            number(p.get('bedrooms')),
+            number(obj(p.get('bathrooms')).get('total')),
+            p.get('property_type') or None,
+            obj(p.get('address')).get('city') or None,
+            obj(p.get('status')).get('current') or None,
+            obj(p.get('address')).get('state') or None,
+            obj(p.get('address')).get('zip') or None,
+            json.dumps(p, separators=(',', ':')),
+        ) for p in properties if isinstance(p, dict) and p.get('property_id'))
+
+    def delete(self, property_ids):
+        with self.db:
+            self.db.executemany('DELETE FROM properties WHERE property_id = ?', ((i,) for i in property_ids))
+        self._stats = None
+
+    # ----- planning -----
+
+    def analyze(self):
+        """Refresh the column statistics the planner costs indexes with."""
+        rows = len(self)
+        values = {}
+        for column in EQUALITY_COLUMNS:
+            values[column] = dict(self.db.execute(
+                f"SELECT {column}, COUNT(*) FROM properties WHERE {column} IS NOT NULL GROUP BY {column}"))
+        sketch, nulls = {}, {}
+        step = max(1, rows // SKETCH_SIZE)
+        for column in RANGE_COLUMNS:
+            sample = np.array([v for (v,) in self.db.execute(
+                f"SELECT {column} FROM properties WHERE rowid % ? = 0", (step,))], dtype=object)
+            present = np.array([v for v in sample if v is not None], dtype=np.float64)
+            sketch[column] = np.sort(present)
+            nulls[column] = 1.0 - len(present) / len(sample) if len(sample) else 0.0
+        self._stats = ColumnStats(rows, values, sketch, nulls)
+        self.db.execute('ANALYZE')
+        return self._stats
+
+    @property
+    def stats(self):
+        return self._stats if self._stats is not None else self.analyze()
+
+    def plan(self, criteria, limit=DEFAULT_LIMIT, order_by=None):
+        predicates = parse_criteria(criteria)
+        stats = self.stats
+
+        candidates = []
+        for name, columns in INDEXES:
+            used, answered = _match_index(columns, predicates)
+            if not used:
+                continue
+            candidates.append((name, used, answered, stats.estimate(answered)))
+
+        # Fewest rows, then the longest usable prefix
+        candidates.sort(key=lambda c: (c[3], -len(c[1])))
+        best = candidates[0] if candidates else None
+        if best is None or best[3] > SCAN_FRACTION * stats.rows:
+            index, used, answered, estimate = None, (), [], stats.rows
+        else:
+            index, used, answered, estimate = best
+        residual = [p for p in predicates if p not in answered]
+
+        source = f"properties INDEXED BY {index}" if index else 'properties NOT INDEXED'
+        where = ' AND '.join(p.sql() for p in predicates) or '1'
+        sql = f"SELECT {', '.join(RESULT_COLUMNS)} FROM {source} WHERE {where}"
+        if order_by:
+            column, _, direction = order_by.partition(' ')
+            if column not in RESULT_COLUMNS or direction.upper() not in ('', 'ASC', 'DESC'):
+                raise ValueError(f"cannot order by '{order_by}'")
+            sql += f" ORDER BY {column} {direction}".rstrip()
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        params = tuple(p.value for p in predicates)
+
+        return QueryPlan(index, used, answered, residual, estimate, stats.rows,
+                         [(name, used_columns, rows) for name, used_columns, _, rows in candidates],
+                         sql, params)
+
+    def explain(self, criteria, limit=DEFAULT_LIMIT, order_by=None):
+        """The chosen plan, its alternatives and SQLite's own EXPLAIN QUERY PLAN."""
+        plan = self.plan(criteria, limit, order_by)
+        plan.sqlite_plan = [row[-1] for row in self.db.execute('EXPLAIN QUERY PLAN ' + plan.sql, plan.params)]
+        return plan
+
+    # ----- querying -----
+
+    def search(self, criteria, limit=DEFAULT_LIMIT, order_by=None):
+        """Matching rows as dicts of the indexed fields (property_id, price, ..., zip)."""
+        plan = self.plan(criteria, limit, order_by)
+        cursor = self.db.execute(plan.sql, plan.params)
+        return [dict(zip(RESULT_COLUMNS, row)) for row in cursor]
+
+    def count(self, criteria):
+        plan = self.plan(criteria, limit=None)
+        sql = 'SELECT COUNT(*) FROM ' + plan.sql.split(' FROM ', 1)[1]
+        return self.db.execute(sql, plan.params).fetchone()[0]
+
+    def records(self, property_ids):
+        """Stored JSON records for these ids (loaded from an export), in the given order."""
+        found = {}
+        ids = list(property_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            query = f"SELECT property_id, record FROM properties WHERE property_id IN ({', '.join('?' * len(chunk))})"
+            found.update((pid, json.loads(record)) for pid, record in self.db.execute(query, chunk) if record)
+        return [found[pid] for pid in ids if pid in found]
+
+
+def load(source, path=DEFAULT_DB, resolver=None):
+    """Index a feed CSV or a JSON export; returns (rows in the index, rows added)."""
+    index = PropertyIndex(path)
+    before = len(index)
+    if source.lower().endswith('.json'):
+        with open(source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('properties') or (data.get('data') or {}).get('properties') or []
+        index.add_properties(data)
+    else:
+        from csv_ingest import CSVIngestor
+        for batch in CSVIngestor(source, resolver=resolver, required=()):
+            index.add_batch(batch)
+    index.analyze()
+    rows = len(index)
+    index.close()
+    return rows, rows - before
+
+
+def _bench(n):
+    rng = np.random.default_rng(0)
+    cities = np.array(['Saint Pete Beach', 'Treasure Island', 'Tampa', 'Clearwater', 'St. Petersburg',
+                       'Largo', 'Dunedin', 'Gulfport', 'Seminole', 'Madeira Beach'])
+    statuses = np.array(['active', 'active', 'active', 'pending', 'sold'])
+    types = np.array(['single_family', 'condo', 'townhouse', 'multi_family'])
+    path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    index = PropertyIndex(path)
+
+    t0 = time.perf_counter()
+    chunk = 100_000
+    for start in range(0, n, chunk):
+        m = min(chunk, n - start)
+        price = (rng.integers(100, 3000, m) * 1000).astype(float)
+        beds = rng.integers(1, 7, m).astype(float)
+        baths = rng.choice([1.0, 1.5, 2.0, 2.5, 3.0, 4.0], m)
+        city = cities[rng.integers(0, len(cities), m)]
+        status = statuses[rng.integers(0, len(statuses), m)]
+        kind = types[rng.integers(0, len(types), m)]
+        index.upsert((f"MLS:TB{start + i}", float(price[i]), float(beds[i]), float(baths[i]),
+                      str(kind[i]), str(city[i]), str(status[i]), 'FL', '33701', None) for i in range(m))
+    index.analyze()
+    print(f"Indexed {n:,} rows in {time.perf_counter() - t0:.1f}s ({os.path.getsize(path) / 1e6:.0f} MB)")
+
+    queries = [
+        {'city': 'Tampa', 'status': 'active', 'maxPrice': 400_000},
+        {'propertyType': 'condo', 'minPrice': 2_500_000},
+        {'minPrice': 1_000_000, 'maxPrice': 1_010_000},
+        {'minBedrooms': 6, 'minBathrooms': 4},
+        {'status': 'sold', 'minBedrooms': 3},
+        {'city': 'Largo', 'propertyType': 'townhouse', 'minBedrooms': 5, 'maxPrice': 300_000},
+    ]
+    for criteria in queries:
+        t = time.perf_counter()
+        rows = index.search(criteria)
+        page = time.perf_counter() - t
+        t = time.perf_counter()
+        total = index.count(criteria)
+        counted = time.perf_counter() - t
+        plan = index.plan(criteria)
+        print(f"  {page * 1000:7.1f} ms page of {len(rows):>5,}  {counted * 1000:7.1f} ms count {total:>8,}  "
+              f"{plan.index or 'scan':<24} {criteria}")
+    index.close()
+    return 0
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args:
+        print(__doc__)
+        return 2
+    if args[0] == '--bench':
+        return _bench(int(args[1]))
+
+    def option(flag, default=None):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    path = option('--db', DEFAULT_DB)
+    if args[0] == 'load' and len(args) > 1:
+        resolver = None
+        if '--mappings' in args:
+            from column_mapping import ColumnMappingResolver
+            resolver = ColumnMappingResolver(option('--mappings'))
+        t0 = time.perf_counter()
+        rows, added = load(args[1], path, resolver)
+        if resolver is not None:
+            resolver.save()
+        print(f"✅ {path}: {rows:,} rows ({added:+,}) in {time.perf_counter() - t0:.2f}s")
+        return 0
+
+    if args[0] == 'search':
+        criteria = {}
+        for key in CRITERIA:
+            value = option('--' + key)
+            if value is not None:
+                criteria[key] = float(value) if CRITERIA[key][1] != '=' else value
+        try:
+            index = PropertyIndex(path)
+            if '--explain' in args:
+                print(index.explain(criteria).describe())
+            t0 = time.perf_counter()
+            rows = index.search(criteria, limit=int(option('--limit', DEFAULT_LIMIT)))
+        except (KeyError, sqlite3.Error) as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ {len(rows):,} match(es) in {(time.perf_counter() - t0) * 1000:.1f} ms")
+        for row in rows[:20]:
+            print(f"  {row['property_id']:<20} {row['price'] or 0:>12,.0f}  {row['city'] or '':<18} "
+                  f"{row['status'] or '':<10} {row['property_type'] or ''}")
+        return 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Compact property records for Python-side processing.
+
+A stored property is a dict of dicts (basic / financial / location /
+analytics / analytics.variable_values), and every field carries its own key
+string, hash slot and boxed number. PropertyRecord keeps one property in a
+__slots__ object instead:
+
+    numeric fields     one array('d') (NaN = missing), read as attributes
+    text fields        slots; low-cardinality ones (city, state, type, status,
+                       source) are sys.intern'ed, so 1M rows share a few hundred strings
+    variable_values    one array('d') over a process-wide key order
+    everything else    compact JSON bytes, decoded only when a view needs it
+    _flags             one int: the path each field was read from, which
+                       numbers were ints, and the coordinate mirror bit
+
+The nested views are built on access and not cached:
+
+    record = PropertyRecord.from_dict(prop)
+    record.price, record.city                # plain attributes
+    record.location                          # {'city': ..., 'latitude': ..., ...}
+    record.variable('condition_rating')      # no dict materialized
+    record.to_dict()                         # the property as it was read
+
+Coordinates are stored once. The views put them where mapCSVRow does
+(location and basic.coordinates).
+
+Both the import shape (basic.squareFeet, financial.listingPrice, ...) and
+the stored-property shape (square_feet.living, price.current, ...) are read.
+The views always use the import shape; to_dict() puts every field back at
+the path it came from, ints as ints, so it returns the dict that was read.
+
+Usage:
+    python property_records.py export.json|feed.csv
+    python property_records.py --bench 100000
+"""
+
+import json
+import math
+import sys
+import time
+import tracemalloc
+from array import array
+
+NAN = float('nan')
+
+# field -> paths tried in order; the value comes from the first path present,
+# the others stay in the record untouched. Views put it at the first path,
+# to_dict() at the one it was read from (at most 4 paths: 2 bits in _flags).
+NUMERIC_FIELDS = (
+    ('price', (('financial', 'listingPrice'), ('price', 'current'))),
+    ('bedrooms', (('basic', 'bedrooms'), ('bedrooms',))),
+    ('bathrooms', (('basic', 'bathrooms'), ('bathrooms', 'total'))),
+    ('sqft_living', (('basic', 'squareFeet'), ('square_feet', 'living'))),
+    ('sqft_lot', (('basic', 'lotSize'), ('square_feet', 'lot'))),
+    ('year_built', (('basic', 'yearBuilt'), ('year_built',))),
+    ('garage_spaces', (('basic', 'garageSpaces'), ('garage_spaces',))),
+    ('days_on_market', (('financial', 'daysOnMarket'), ('days_on_market', 'current'))),
+    ('hoa_fees', (('financial', 'hoaFees'), ('hoa_fees', 'monthly'))),
+    ('annual_taxes', (('financial', 'annualTaxes'), ('taxes', 'annual_amount'))),
+    ('latitude', (('location', 'latitude'), ('location', 'lat'), ('basic', 'coordinates', 'latitude'),
+                  ('address', 'latitude'))),
+    ('longitude', (('location', 'longitude'), ('location', 'lng'), ('basic', 'coordinates', 'longitude'),
+                   ('address', 'longitude'))),
+)
+TEXT_FIELDS = (
+    ('street', (('basic', 'address'), ('address', 'street'))),
+    ('zip', (('location', 'zipCode'), ('address', 'zip'))),
+    ('mls_number', (('basic', 'mlsNumber'), ('mls_number',))),
+)
+INTERNED_FIELDS = (
+    ('city', (('location', 'city'), ('address', 'city'))),
+    ('state', (('location', 'state'), ('address', 'state'))),
+    ('property_type', (('basic', 'propertyType'), ('property_type',))),
+    ('status', (('basic', 'status'), ('status', 'current'))),
+    ('source', (('source',),)),
+)
+ID_KEYS = ('property_id', 'id')
+# mapCSVRow mirrors the coordinates here; a mirror equal to the stored value is
+# dropped and only a flag bit records that it was there
+COORDINATE_MIRROR = {'latitude': ('basic', 'coordinates', 'latitude'),
+                     'longitude': ('basic', 'coordinates', 'longitude')}
+MIRRORED_COORDINATES = 1
+
+NUMERIC_INDEX = {name: i for i, (name, _) in enumerate(NUMERIC_FIELDS)}
+STRING_FIELDS = TEXT_FIELDS + INTERNED_FIELDS
+
+# _flags layout above the mirror bit: one "was an int" bit per numeric field,
+# then 2 path-index bits per captured field (numeric, then string), then one
+# "was an int" bit per variable_values slot
+INT_SHIFT = 1
+PATH_SHIFT = INT_SHIFT + len(NUMERIC_FIELDS)
+PATH_BITS = 2
+VARIABLE_INT_SHIFT = PATH_SHIFT + PATH_BITS * (len(NUMERIC_FIELDS) + len(STRING_FIELDS))
+
+# variable_values key order shared by all records; keys are only appended,
+# so an older record's array is a prefix of the current order
+VARIABLE_KEYS = []
+_VARIABLE_INDEX = {}
+
+
+def _variable_slot(key):
+    slot = _VARIABLE_INDEX.get(key)
+    if slot is None:
+        slot = _VARIABLE_INDEX[key] = len(VARIABLE_KEYS)
+        VARIABLE_KEYS.append(sys.intern(key))
+    return slot
+
+
+def _storable(value):
+    """True for a number a float64 slot gives back unchanged (bools, huge ints and
+    NaN, which the slot uses for "missing", are not)."""
+    kind = type(value)
+    return (kind is float and value == value) or (kind is int and -2 ** 53 <= value <= 2 ** 53)
+
+
+def _typed(value, is_int):
+    return int(value) if is_int else value
+
+
+def _get(prop, path):
+    for key in path:
+        if not isinstance(prop, dict) or key not in prop:
+            return _MISSING
+        prop = prop[key]
+    return prop
+
+
+_MISSING = object()
+
+
+def _take(prop, path):
+    """Pop the value at `path` from the (already copied) nested dicts, or return None.
+    Parents left empty by the pop are removed too."""
+    parents = [prop]
+    for key in path[:-1]:
+        child = parents[-1].get(key)
+        if not isinstance(child, dict):
+            return None
+        parents.append(child)
+    if path[-1] not in parents[-1]:
+        return None
+    value = parents[-1].pop(path[-1])
+    for depth in range(len(path) - 1, 0, -1):
+        if parents[depth]:
+            break
+        del parents[depth - 1][path[depth - 1]]
+    return value
+
+
+def _copy_nested(value):
+    """Copy of the dict levels only, so captured keys can be popped off."""
+    return {k: _copy_nested(v) if type(v) is dict else v for k, v in value.items()}
+
+
+def _put(target, path, value):
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+    target[path[-1]] = value
+
+
+class PropertyRecord:
+    """One property in slots and packed arrays; nested views are built on access."""
+
+    __slots__ = ('property_id', 'id_key', '_flags', '_numbers', '_variables', '_extra') + \
+        tuple(name for name, _ in STRING_FIELDS)
+
+    def __init__(self, property_id=None, numbers=None, variables=None, extra=None, id_key='property_id',
+                 flags=0, **text):
+        self.property_id = property_id
+        self.id_key = id_key
+        self._flags = flags
+        self._numbers = numbers if numbers is not None else array('d', [NAN] * len(NUMERIC_FIELDS))
+        self._variables = variables
+        self._extra = extra
+        for name, _ in TEXT_FIELDS:
+            setattr(self, name, text.get(name))
+        for name, _ in INTERNED_FIELDS:
+            value = text.get(name)
+            setattr(self, name, sys.intern(value) if isinstance(value, str) else value)
+
+    @classmethod
+    def from_dict(cls, prop):
+        prop = _copy_nested(prop)
+
+        id_key = next((key for key in ID_KEYS if prop.get(key) is not None), 'property_id')
+        property_id = prop.pop(id_key, None)
+
+        flags = 0
+        numbers = array('d', [NAN] * len(NUMERIC_FIELDS))
+        captured = {}
+        for i, (name, paths) in enumerate(NUMERIC_FIELDS):
+            for p, path in enumerate(paths):
+                if _storable(_get(prop, path)):
+                    value = captured[name] = _take(prop, path)
+                    numbers[i] = value
+                    flags |= p << (PATH_SHIFT + PATH_BITS * i)
+                    if type(value) is int:
+                        flags |= 1 << (INT_SHIFT + i)
+                    break
+
+        mirrored = [(path, captured.get(name)) for name, path in COORDINATE_MIRROR.items()]
+        if all(value is not None and type(_get(prop, path)) is type(value) and _get(prop, path) == value
+               for path, value in mirrored):
+            for path, _ in mirrored:
+                _take(prop, path)
+            flags |= MIRRORED_COORDINATES
+
+        text = {}
+        for j, (name, paths) in enumerate(STRING_FIELDS, len(NUMERIC_FIELDS)):
+            for p, path in enumerate(paths):
+                if isinstance(_get(prop, path), str):
+                    text[name] = _take(prop, path)
+                    flags |= p << (PATH_SHIFT + PATH_BITS * j)
+                    break
+
+        variables = None
+        analytics = prop.get('analytics')
+        values = analytics.get('variable_values') if isinstance(analytics, dict) else None
+        if isinstance(values, dict):
+            numeric, kept, size = [], {}, 0
+            for key, value in values.items():
+                if _storable(value):
+                    slot = _VARIABLE_INDEX.get(key)
+                    if slot is None:
+                        slot = _variable_slot(key)
+                    numeric.append((slot, value))
+                    size = max(size, slot + 1)
+                    if type(value) is int:
+                        flags |= 1 << (VARIABLE_INT_SHIFT + slot)
+                else:
+                    kept[key] = value
+            if numeric:
+                variables = array('d', [NAN]) * size
+                for slot, value in numeric:
+                    variables[slot] = value
+                if kept:
+                    analytics['variable_values'] = kept
+                else:
+                    _take(prop, ('analytics', 'variable_values'))
+
+        extra = json.dumps(prop, separators=(',', ':')).encode() if prop else None
+        return cls(property_id, numbers, variables, extra, id_key, flags, **text)
+
+    # ----- fields -----
+
+    def number(self, name):
+        """Numeric field or None."""
+        return self._number_at(NUMERIC_INDEX[name])
+
+    def _number_at(self, i):
+        value = self._numbers[i]
+        return None if math.isnan(value) else _typed(value, self._flags >> (INT_SHIFT + i) & 1)
+
+    def _path(self, field, paths):
+        """The path field number `field` (numeric, then string) was read from."""
+        return paths[self._flags >> (PATH_SHIFT + PATH_BITS * field) & 3]
+
+    def variable(self, key):
+        """One analytics.variable_values entry or None, without building the dict."""
+        slot = _VARIABLE_INDEX.get(key)
+        if slot is None or self._variables is None or slot >= len(self._variables):
+            return None
+        value = self._variables[slot]
+        return None if math.isnan(value) else _typed(value, self._flags >> (VARIABLE_INT_SHIFT + slot) & 1)
+
+    @property
+    def extra(self):
+        """Uncaptured fields as a fresh nested dict."""
+        return json.loads(self._extra) if self._extra else {}
+
+    # ----- nested views -----
+
+    def _section(self, section, extra=None):
+        view = dict((extra if extra is not None else self.extra).get(section) or {})
+        for i, (_, paths) in enumerate(NUMERIC_FIELDS):
+            if paths[0][0] == section and not math.isnan(self._numbers[i]):
+                _put(view, paths[0][1:], self._number_at(i))
+        for name, paths in STRING_FIELDS:
+            value = getattr(self, name)
+            if paths[0][0] == section and value is not None:
+                _put(view, paths[0][1:], value)
+        if section == 'basic' and self._flags & MIRRORED_COORDINATES:
+            for name, path in COORDINATE_MIRROR.items():
+                if self.number(name) is not None:
+                    _put(view, path[1:], self.number(name))
+        return view
+
+    @property
+    def basic(self):
+        return self._section('basic')
+
+    @property
+    def financial(self):
+        return self._section('financial')
+
+    @property
+    def location(self):
+        return self._section('location')
+
+    @property
+    def variable_values(self):
+        values = dict(((self.extra.get('analytics') or {}).get('variable_values')) or {})
+        self._fill_variables(values)
+        return values
+
+    def _fill_variables(self, values):
+        if self._variables is None:
+            return
+        ints = self._flags >> VARIABLE_INT_SHIFT
+        for slot, value in enumerate(self._variables):
+            if not math.isnan(value):
+                values[VARIABLE_KEYS[slot]] = int(value) if ints >> slot & 1 else value
+
+    @property
+    def analytics(self):
+        view = dict(self.extra.get('analytics') or {})
+        values = self.variable_values
+        if values:
+            view['variable_values'] = values
+        return view
+
+    def to_dict(self):
+        """The full property, every captured field back at the path it was read from."""
+        prop = {self.id_key: self.property_id} if self.property_id is not None else {}
+        prop.update(self.extra)
+        for i, (_, paths) in enumerate(NUMERIC_FIELDS):
+            value = self._number_at(i)
+            if value is not None:
+                _put(prop, self._path(i, paths), value)
+        for j, (name, paths) in enumerate(STRING_FIELDS, len(NUMERIC_FIELDS)):
+            value = getattr(self, name)
+            if value is not None:
+                _put(prop, self._path(j, paths), value)
+        if self._flags & MIRRORED_COORDINATES:
+            for name, path in COORDINATE_MIRROR.items():
+                if self.number(name) is not None:
+                    _put(prop, path, self.number(name))
+        if self._variables is not None:
+            analytics = prop.setdefault('analytics', {})
+            self._fill_variables(analytics.setdefault('variable_values', {}))
+        return prop
+
+    def __repr__(self):
+        return (f"PropertyRecord({self.property_id!r}, {self.street!r}, {self.city!r}, "
+                f"price={self.number('price')})")
+
+
+def _numeric_getter(i):
+    def get(self):
+        return self._number_at(i)
+    return property(get)
+
+
+for _i, (_name, _) in enumerate(NUMERIC_FIELDS):
+    setattr(PropertyRecord, _name, _numeric_getter(_i))
+
+
+def records_from_batch(batch):
+    """PropertyRecords straight from a csv_ingest RecordBatch (no per-row dicts)."""
+    cols = batch.columns
+    fields = {'price': 'price', 'bedrooms': 'bedrooms', 'bathrooms': 'bathrooms',
+              'sqft_living': 'sqft_living', 'sqft_lot': 'sqft_lot', 'year_built': 'year_built',
+              'garage_spaces': 'garage_spaces', 'days_on_market': 'days_on_market',
+              'hoa_fees': 'hoa_fees', 'annual_taxes': 'annual_taxes',
+              'latitude': 'latitude', 'longitude': 'longitude'}
+    numeric = [(NUMERIC_INDEX[name], cols[column].tolist()) for name, column in fields.items() if column in cols]
+    text = [(name, cols[name]) for name, _ in STRING_FIELDS if name in cols]
+
+    records = []
+    for i in range(len(batch)):
+        numbers = array('d', [NAN] * len(NUMERIC_FIELDS))
+        for j, values in numeric:
+            numbers[j] = values[i]
+        # mapCSVRow treats 0 coordinates as none
+        for name in ('latitude', 'longitude'):
+            if numbers[NUMERIC_INDEX[name]] == 0:
+                numbers[NUMERIC_INDEX[name]] = NAN
+        record = PropertyRecord(None, numbers, None, None, 'id', MIRRORED_COORDINATES,
+                                source='csv_import', **{name: values[i] or None for name, values in text})
+        records.append(record)
+    return records
+
+
+def load_records(source):
+    """PropertyRecords from a JSON export or a feed CSV."""
+    if source.lower().endswith('.json'):
+        with open(source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('properties') or (data.get('data') or {}).get('properties') or []
+        return [PropertyRecord.from_dict(p) for p in data if isinstance(p, dict)]
+
+    from csv_ingest import CSVIngestor
+    records = []
+    for batch in CSVIngestor(source, required=()):
+        records.extend(records_from_batch(batch))
+    return records
+
+
+def _synthetic(n):
+    """Import-shaped properties with the scoring variable_values filled in."""
+    import random
+
+    from feature_columns import VARIABLE_VALUE_DEFAULTS
+
+    rng = random.Random(0)
+    cities = ['Saint Pete Beach', 'Treasure Island', 'Tampa', 'Clearwater', 'St. Petersburg', 'Largo']
+    for i in range(n):
+        lat, lng = 27.6 + rng.random(), -82.9 + rng.random()
+        yield {
+            'id': f'prop_{i:08d}',
+            'source': 'csv_import',
+            'importDate': '2026-10-01T00:00:00+00:00',
+            'basic': {'address': f'{rng.randint(1, 9999)} Gulf Blvd', 'bedrooms': rng.randint(1, 6),
+                      'bathrooms': rng.choice([1, 1.5, 2, 2.5, 3]), 'squareFeet': rng.randint(700, 4000),
+                      'lotSize': rng.randint(2000, 12000), 'yearBuilt': rng.randint(1950, 2024),
+                      'propertyType': 'single_family', 'mlsNumber': f'TB{i}', 'status': 'active',
+                      'coordinates': {'latitude': lat, 'longitude': lng}},
+            'financial': {'listingPrice': rng.randint(150, 2500) * 1000, 'daysOnMarket': rng.randint(0, 200),
+                          'hoaFees': 0, 'annualTaxes': rng.randint(1000, 30000)},
+            'location': {'city': rng.choice(cities), 'state': 'FL', 'zipCode': f'337{rng.randint(0, 99):02d}',
+                         'latitude': lat, 'longitude': lng},
+            'analytics': {'variable_values': {key: rng.randint(0, 10) if type(default) is int else
+                                              round(rng.uniform(0, 10), 2)
+                                              for key, default in VARIABLE_VALUE_DEFAULTS.items()}},
+            'features': {}, 'condition': {},
+        }
+
+
+def _stored_shape(prop):
+    """The same property as DataManager stores it (price.current, address.city, ...)."""
+    basic, financial, location = prop['basic'], prop['financial'], prop['location']
+    return {
+        'property_id': prop['id'],
+        'mls_number': basic['mlsNumber'],
+        'address': {'street': basic['address'], 'city': location['city'], 'state': location['state'],
+                    'zip': location['zipCode'], 'latitude': location['latitude'],
+                    'longitude': location['longitude']},
+        'price': {'current': financial['listingPrice']},
+        'status': {'current': basic['status']},
+        'property_type': basic['propertyType'],
+        'bedrooms': basic['bedrooms'],
+        'bathrooms': {'total': basic['bathrooms']},
+        'square_feet': {'living': basic['squareFeet'], 'lot': basic['lotSize']},
+        'year_built': basic['yearBuilt'],
+        'days_on_market': {'current': financial['daysOnMarket']},
+        'taxes': {'annual_amount': financial['annualTaxes']},
+        'analytics': prop['analytics'],
+        'created_at': 1790000000000,
+    }
+
+
+def _same(a, b):
+    """Equal including int vs float (3 == 3.0 is not a round trip)."""
+    return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+
+
+def _measure(build):
+    """Build once untraced for the time, then again under tracemalloc for the bytes held."""
+    t0 = time.perf_counter()
+    build()
+    seconds = time.perf_counter() - t0
+    tracemalloc.start()
+    held = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held, size, seconds
+
+
+def _bench(n):
+    dicts, dict_bytes, dict_seconds = _measure(lambda: list(_synthetic(n)))
+    records, record_bytes, record_seconds = _measure(lambda: [PropertyRecord.from_dict(p) for p in dicts])
+
+    sample = dicts[: min(n, 1000)]
+    sample += [_stored_shape(p) for p in sample]
+    assert all(_same(PropertyRecord.from_dict(p).to_dict(), p) for p in sample), 'round trip changed a property'
+
+    print(f"{n:,} properties, {len(VARIABLE_KEYS)} variable_values each")
+    for label, size, action, seconds in (('dict of dicts', dict_bytes, 'generated', dict_seconds),
+                                         ('PropertyRecord', record_bytes, 'converted', record_seconds)):
+        print(f"  {label:<16} {size / 1e6:9.1f} MB  {size / n:7.0f} B/property  "
+              f"~{size / n * 1e6 / 1e9:5.2f} GB per 1M  {action} in {seconds:.2f}s")
+    print(f"  ratio {record_bytes / dict_bytes:.2f}")
+
+    t0 = time.perf_counter()
+    total = sum(r.price for r in records if r.city == 'Tampa')
+    scan = time.perf_counter() - t0
+    print(f"  attribute scan (Tampa price sum {total:,.0f}) {scan * 1000:.1f} ms; round trip checked on {len(sample)} "
+          f"(import and stored shape)")
+    del dicts
+    return 0
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args:
+        print(__doc__)
+        return 2
+    if args[0] == '--bench':
+        return _bench(int(args[1]) if len(args) > 1 else 100_000)
+
+    t0 = time.perf_counter()
+    records = load_records(args[0])
+    print(f"✅ {len(records):,} records from {args[0]} in {time.perf_counter() - t0:.2f}s")
+    for record in records[:10]:
+        print(f"  {record!r}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
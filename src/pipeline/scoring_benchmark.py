@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Cross-engine parity and speed benchmark for property scoring.
+
+Generates a randomized property set (NDJSON, same shape as the records in
+IndexedDB), then scores it twice, each engine in its own process:
+
+    js      - ScoringEngine.calculateScore from src/core/scoring-engine.js,
+              run under node the same way test_scores_node.js does
+    python  - feature_columns.FeatureExtractor + batch_scoring.BatchScoringEngine
+
+Parity is asserted on the overall score of every property and on each
+variable's normalized value for a sample of rows. Speed is reported per
+engine and size: properties/sec, p50/p99 latency and peak RSS. JSON parsing
+is excluded from the timings on both sides. JS latency is per
+calculateScore call; the Python engine scores in batches, so its latency is
+per batch (the batch size is printed with it).
+
+Exit status is 1 if any size breaks parity, so this can gate scoring changes.
+
+Usage:
+    python scoring_benchmark.py                          # 1k, 100k and 1M, balanced profile
+    python scoring_benchmark.py --sizes 1k,100k --profile investor
+    python scoring_benchmark.py --tolerance 1e-3 --keep  # keep the generated data
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from batch_scoring import ENGINE_PATH, BatchScoringEngine, load_scoring_config
+from feature_columns import VARIABLE_VALUE_DEFAULTS, FeatureExtractor
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+DEFAULT_TOLERANCE = 1e-3      # score points (0-100); the Python engine runs in float32
+SAMPLE_ROWS = 10_000          # rows whose per-variable values are compared
+BATCH_SIZE = 8192
+
+_NODE_RUNNER = r"""
+const fs = require('fs');
+const readline = require('readline');
+const [enginePath, dataPath, profile, count, sampleEvery, outDir] = process.argv.slice(1);
+const code = fs.readFileSync(enginePath, 'utf8');
+const ScoringEngine = new Function(code + '\nreturn ScoringEngine;')();
+const engine = new ScoringEngine();
+
+const variables = [];
+for (const vars of Object.values(engine.getVariableSystem())) variables.push(...Object.keys(vars));
+
+const n = Number(count), every = Number(sampleEvery);
+const overall = new Float64Array(n);
+const latency = new Float64Array(n);
+const sample = new Float64Array(Math.ceil(n / every) * variables.length);
+
+(async () => {
+    const lines = readline.createInterface({ input: fs.createReadStream(dataPath), crlfDelay: Infinity });
+    let i = 0, scoring = 0n;
+    for await (const line of lines) {
+        if (!line) continue;
+        const property = JSON.parse(line);
+        const t0 = process.hrtime.bigint();
+        const scores = engine.calculateScore(property, profile);
+        const dt = process.hrtime.bigint() - t0;
+        scoring += dt;
+        latency[i] = Number(dt) / 1e3;
+        overall[i] = scores.overall;
+        if (i % every === 0) {
+            const base = (i / every) * variables.length;
+            variables.forEach((v, j) => { sample[base + j] = scores.by_variable[v].normalized; });
+        }
+        i++;
+    }
+    fs.writeFileSync(outDir + '/overall.bin', Buffer.from(overall.buffer, 0, i * 8));
+    fs.writeFileSync(outDir + '/sample.bin', Buffer.from(sample.buffer));
+    const sorted = Float64Array.from(latency.subarray(0, i)).sort();
+    process.stdout.write(JSON.stringify({
+        count: i,
+        seconds: Number(scoring) / 1e9,
+        p50: sorted[Math.floor(0.50 * (i - 1))],
+        p99: sorted[Math.floor(0.99 * (i - 1))],
+        latency_unit: 'us/property',
+        peak_rss_kb: process.resourceUsage().maxRSS,
+        variables
+    }));
+})();
+"""
+
+
+def parse_size(text):
+    """'1k' -> 1000, '1M' -> 1000000, '2500' -> 2500."""
+    text = text.strip()
+    scale = {'k': 1_000, 'K': 1_000, 'm': 1_000_000, 'M': 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale != 1 else text) * scale)
+
+
+# ============================================
+# DATA GENERATION
+# ============================================
+
+def _maybe(rng, value, missing=0.1):
+    """value, or None (dropped from the record) with probability `missing`."""
+    return None if rng.random() < missing else value
+
+
+def _prune(obj):
+    return {k: v for k, v in obj.items() if v is not None}
+
+
+def generate_property(rng, i, ranges):
+    """One random property record. Values spill a little past each variable's
+    range (to exercise clamping) and some are 0 or missing (to exercise the
+    `|| default` and missing -> 50 paths)."""
+
+    def around(name, integer=False):
+        lo, hi = ranges[name]
+        pad = (hi - lo) * 0.1
+        value = rng.uniform(lo - pad, hi + pad)
+        if rng.random() < 0.03:
+            value = 0
+        return round(value) if integer else round(value, 3)
+
+    year_built = _maybe(rng, rng.randint(1900, 2024))
+    variable_values = _prune({
+        name: _maybe(rng, around(name), 0.3) for name in VARIABLE_VALUE_DEFAULTS if name in ranges
+    })
+    red_flags = [
+        {'category': rng.choice(('foundation', 'roof', 'electrical', 'plumbing', 'hvac')),
+         'severity': rng.choice(('critical', 'major', 'minor'))}
+        for _ in range(rng.randint(0, 3))
+    ]
+
+    return _prune({
+        'property_id': f'BENCH{i:08d}',
+        'bedrooms': _maybe(rng, around('bedrooms', integer=True)),
+        'bathrooms': _prune({'total': _maybe(rng, around('bathrooms_total'))}),
+        'square_feet': _prune({
+            'living': _maybe(rng, around('sqft_living', integer=True)),
+            'lot': _maybe(rng, around('sqft_lot', integer=True)),
+        }),
+        'year_built': year_built,
+        'garage_spaces': _maybe(rng, around('garage_spaces', integer=True)),
+        'stories': _maybe(rng, around('stories', integer=True)),
+        'price': _prune({'current': _maybe(rng, around('price_current', integer=True))}),
+        'taxes': _prune({'annual_amount': _maybe(rng, around('annual_taxes', integer=True))}),
+        'hoa_fees': _prune({'monthly': _maybe(rng, around('hoa_fees_monthly', integer=True), 0.4)}),
+        'days_on_market': _prune({'current': _maybe(rng, around('days_on_market', integer=True))}),
+        'analytics': _prune({
+            'price_per_sqft': _maybe(rng, around('price_per_sqft')),
+            'price_vs_market': _maybe(rng, around('price_vs_market')),
+            'appreciation_rate': _maybe(rng, around('appreciation_rate_5yr')),
+            'walk_score': _maybe(rng, around('walk_score', integer=True)),
+            'transit_score': _maybe(rng, around('transit_score', integer=True)),
+            'bike_score': _maybe(rng, around('bike_score', integer=True)),
+            'crime_index': _maybe(rng, around('crime_index')),
+            'school_ratings': _prune({
+                level: _maybe(rng, around(f'school_rating_{level}'))
+                for level in ('elementary', 'middle', 'high')
+            }),
+            'flood_zone': _maybe(rng, rng.choice(('X', 'AE', 'VE', '')), 0.3),
+            'earthquake_risk': rng.choice(('low', 'moderate', 'high')),
+            'fire_risk': rng.choice(('low', 'moderate', 'high')),
+            'variable_values': variable_values,
+        }),
+        'features': {
+            'interior': rng.sample(('hardwood', 'fireplace', 'gas fireplace', 'granite', 'carpet'),
+                                   rng.randint(0, 4)),
+            'exterior': rng.sample(('pool', 'deck', 'patio', 'fence'), rng.randint(0, 3)),
+        },
+        'inspection': {'red_flags': red_flags},
+        'media': {'photos': ['p'] * rng.randint(0, 20)},
+    })
+
+
+def write_dataset(path, n, seed=0, config=None):
+    """Write n random properties to path as NDJSON."""
+    config = config or load_scoring_config()
+    ranges = {name: (float(lo), float(hi)) for name, lo, hi in zip(config.variables, config.mins, config.maxs)}
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n):
+            f.write(json.dumps(generate_property(rng, i, ranges), separators=(',', ':')))
+            f.write('\n')
+
+
+# ============================================
+# ENGINE RUNNERS (each in its own process)
+# ============================================
+
+def run_node(data_path, n, profile, sample_every, out_dir):
+    proc = subprocess.run(
+        ['node', '-e', _NODE_RUNNER, os.path.abspath(ENGINE_PATH), data_path, profile,
+         str(n), str(sample_every), out_dir],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(proc.stdout)
+
+
+def run_python(data_path, n, profile, sample_every, out_dir):
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--engine-python', data_path, profile,
+         str(n), str(sample_every), out_dir],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(proc.stdout)
+
+
+def _python_engine(data_path, profile, n, sample_every, out_dir):
+    """Child-process side of run_python: score data_path in batches."""
+    engine = BatchScoringEngine()
+    extractor = FeatureExtractor(engine.config.variables)
+    overall = np.empty(n, dtype=np.float64)
+    samples = []
+    latencies = []
+    scoring = 0.0
+    count = 0
+
+    def score_batch(batch):
+        nonlocal scoring, count
+        t0 = time.perf_counter()
+        columns = extractor.extract(batch)
+        result = engine.score_profiles(columns.matrix, [profile])[profile]
+        dt = time.perf_counter() - t0
+        scoring += dt
+        latencies.append(dt * 1e3)
+        overall[count:count + len(batch)] = result.overall
+        first = -count % sample_every
+        samples.append(result.by_variable[first::sample_every])
+        count += len(batch)
+
+    batch = []
+    with open(data_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                batch.append(json.loads(line))
+            if len(batch) == BATCH_SIZE:
+                score_batch(batch)
+                batch = []
+    if batch:
+        score_batch(batch)
+
+    overall[:count].tofile(os.path.join(out_dir, 'overall.bin'))
+    np.concatenate(samples).astype(np.float64).tofile(os.path.join(out_dir, 'sample.bin'))
+    latencies.sort()
+    print(json.dumps({
+        'count': count,
+        'seconds': scoring,
+        'p50': latencies[int(0.50 * (len(latencies) - 1))],
+        'p99': latencies[int(0.99 * (len(latencies) - 1))],
+        'latency_unit': f'ms/batch (<= {BATCH_SIZE})',
+        'peak_rss_kb': _peak_rss_kb(),
+        'variables': engine.config.variables,
+    }))
+
+
+def _peak_rss_kb():
+    """Peak RSS of this process in KB, or None where the Unix-only resource module is missing."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+# ============================================
+# PARITY + REPORT
+# ============================================
+
+def compare(js_dir, py_dir, variables, tolerance):
+    """Max abs differences between the engines' outputs; (ok, details)."""
+    js_overall = np.fromfile(os.path.join(js_dir, 'overall.bin'))
+    py_overall = np.fromfile(os.path.join(py_dir, 'overall.bin'))
+    if js_overall.shape != py_overall.shape:
+        return False, {'error': f'row counts differ: js {len(js_overall)}, python {len(py_overall)}'}
+
+    js_sample = np.fromfile(os.path.join(js_dir, 'sample.bin')).reshape(-1, len(variables))
+    py_sample = np.fromfile(os.path.join(py_dir, 'sample.bin')).reshape(-1, len(variables))
+    js_sample = js_sample[:len(py_sample)]
+
+    overall_diff = np.abs(js_overall - py_overall)
+    variable_diff = np.abs(js_sample - py_sample).max(axis=0)
+    failing = {variables[j]: float(variable_diff[j]) for j in np.flatnonzero(variable_diff > tolerance)}
+    details = {
+        'overall_max_diff': float(overall_diff.max()) if len(overall_diff) else 0.0,
+        'worst_row': int(overall_diff.argmax()) if len(overall_diff) else None,
+        'variable_max_diff': float(variable_diff.max()) if len(variable_diff) else 0.0,
+        'sampled_rows': len(py_sample),
+        'failing_variables': failing,
+    }
+    ok = details['overall_max_diff'] <= tolerance and not failing
+    return ok, details
+
+
+def benchmark(n, profile='balanced', tolerance=DEFAULT_TOLERANCE, seed=0, workdir=None):
+    """Generate n properties, score them with both engines, compare. Returns a report dict."""
+    workdir = workdir or tempfile.mkdtemp(prefix='scoring_bench_')
+    data_path = os.path.join(workdir, f'properties_{n}.ndjson')
+    js_dir = os.path.join(workdir, f'js_{n}')
+    py_dir = os.path.join(workdir, f'py_{n}')
+    os.makedirs(js_dir, exist_ok=True)
+    os.makedirs(py_dir, exist_ok=True)
+
+    t0 = time.perf_counter()
+    write_dataset(data_path, n, seed)
+    generated = time.perf_counter() - t0
+
+    sample_every = max(1, n // SAMPLE_ROWS)
+    js = run_node(data_path, n, profile, sample_every, js_dir)
+    py = run_python(data_path, n, profile, sample_every, py_dir)
+    ok, parity = compare(js_dir, py_dir, py['variables'], tolerance)
+    return {'n': n, 'profile': profile, 'generated_seconds': generated,
+            'engines': {'js': js, 'python': py}, 'parity_ok': ok, 'parity': parity}
+
+
+def _format_rss(kb):
+    return f"{kb / 1024:>7.1f} MB" if kb is not None else f"{'n/a':>7}"
+
+
+def print_report(report, tolerance):
+    n = report['n']
+    print(f"\n{n:,} properties ({report['profile']}, generated in {report['generated_seconds']:.1f}s)")
+    for name, stats in report['engines'].items():
+        rate = stats['count'] / stats['seconds'] if stats['seconds'] else float('inf')
+        unit = stats['latency_unit']
+        print(f"  {name:<7} {rate:>12,.0f} props/sec   p50 {stats['p50']:>9.2f}  p99 {stats['p99']:>9.2f} "
+              f"{unit:<22} peak RSS {_format_rss(stats['peak_rss_kb'])}")
+    parity = report['parity']
+    if 'error' in parity:
+        print(f"  ❌ parity: {parity['error']}")
+        return
+    mark = '✅' if report['parity_ok'] else '❌'
+    print(f"  {mark} parity: overall max diff {parity['overall_max_diff']:.2e} (row {parity['worst_row']}), "
+          f"per-variable max diff {parity['variable_max_diff']:.2e} over {parity['sampled_rows']:,} rows, "
+          f"tolerance {tolerance:g}")
+    for variable, diff in parity['failing_variables'].items():
+        print(f"     {variable}: {diff:.4f}")
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    if args and args[0] == '--engine-python':
+        data_path, profile, n, sample_every, out_dir = args[1:6]
+        _python_engine(data_path, profile, int(n), int(sample_every), out_dir)
+        return 0
+    if '-h' in args or '--help' in args:
+        print(__doc__)
+        return 0
+
+    def option(flag, default):
+        if flag in args:
+            return args[args.index(flag) + 1]
+        return default
+
+    sizes = [parse_size(s) for s in option('--sizes', '').split(',') if s] or list(DEFAULT_SIZES)
+    profile = option('--profile', 'balanced')
+    tolerance = float(option('--tolerance', DEFAULT_TOLERANCE))
+    seed = int(option('--seed', 0))
+    keep = '--keep' in args
+
+    if profile not in load_scoring_config().profiles:
+        print(f"❌ unknown profile '{profile}'")
+        return 2
+
+    workdir = tempfile.mkdtemp(prefix='scoring_bench_')
+    failed = False
+    try:
+        for n in sizes:
+            report = benchmark(n, profile, tolerance, seed, workdir)
+            print_report(report, tolerance)
+            failed = failed or not report['parity_ok']
+            if not keep:
+                os.remove(os.path.join(workdir, f'properties_{n}.ndjson'))
+    finally:
+        if keep:
+            print(f"\nData kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print('\n' + ('❌ PARITY FAILED' if failed else '✅ Engines agree'))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
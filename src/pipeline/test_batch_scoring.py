@@ -0,0 +1,43 @@
+"""JS parity of batch_scoring on a fixed property set (needs node)."""
+
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from scoring_benchmark import DEFAULT_TOLERANCE, benchmark, compare, run_node, run_python
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='scoring-engine.js is read through node')
+
+# Raw values where JS `||` and number coercion are easy to get wrong
+EDGE_CASES = [
+    {'property_id': 'string-zero', 'analytics': {'variable_values': {'condition_rating': '0', 'cap_rate': '7.5'}}},
+    {'property_id': 'number-zero', 'analytics': {'variable_values': {'condition_rating': 0, 'noise_level': ''}}},
+    {'property_id': 'nulls', 'year_built': None, 'square_feet': {'living': None},
+     'analytics': {'variable_values': {'insurance_cost_annual': None}}},
+    {'property_id': 'empty'},
+    {'property_id': 'out-of-range', 'bedrooms': 40, 'square_feet': {'living': 50, 'lot': 10 ** 7},
+     'year_built': 1850, 'analytics': {'school_ratings': {'high': 11}, 'variable_values': {'cap_rate': -3}}},
+]
+
+
+@pytest.mark.parametrize('profile', ['balanced', 'investor'])
+def test_generated_fixture_matches_js(tmp_path, profile):
+    report = benchmark(300, profile=profile, seed=0, workdir=str(tmp_path))
+    assert report['parity_ok'], report['parity']
+    assert report['engines']['js']['count'] == report['engines']['python']['count'] == 300
+
+
+def test_edge_cases_match_js(tmp_path):
+    data = tmp_path / 'edge.ndjson'
+    data.write_text(''.join(json.dumps(p) + '\n' for p in EDGE_CASES))
+    js_dir, py_dir = tmp_path / 'js', tmp_path / 'py'
+    js_dir.mkdir()
+    py_dir.mkdir()
+
+    run_node(str(data), len(EDGE_CASES), 'balanced', 1, str(js_dir))
+    py = run_python(str(data), len(EDGE_CASES), 'balanced', 1, str(py_dir))
+    ok, details = compare(str(js_dir), str(py_dir), py['variables'], DEFAULT_TOLERANCE)
+    assert ok, details
+    assert np.isfinite(np.fromfile(py_dir / 'overall.bin')).all()
@@ -0,0 +1,87 @@
+"""Column store writes, filters and scoring (needs node for the engine config)."""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from batch_scoring import BatchScoringEngine
+from column_store import ColumnStore, ColumnStoreError, ColumnStoreWriter, _value_file, build_store
+from csv_ingest import CSVIngestor, generate_csv
+from feature_columns import FeatureExtractor
+from incremental_import import listing_keys, scoring_inputs
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='scoring-engine.js is read through node')
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return BatchScoringEngine()
+
+
+@pytest.fixture(scope='module')
+def feed(tmp_path_factory):
+    """A 3000-row feed, its batches, and a store built from it in 1000-row chunks."""
+    root = tmp_path_factory.mktemp('store')
+    source = str(root / 'feed.csv')
+    generate_csv(source, 3000)
+    store = str(root / 'store')
+    assert build_store(source, store, chunk_size=1000) == 3000
+    return list(CSVIngestor(source, required=())), ColumnStore(store)
+
+
+def test_columns_match_the_feed(feed):
+    batches, store = feed
+    assert len(store) == 3000
+    assert store.keys() == [key for batch in batches for key in listing_keys(batch)]
+    cities = np.concatenate([batch.column('city') for batch in batches])
+    assert store.text('city').tolist() == cities.tolist()
+    assert store.counts('city') == {city: int((cities == city).sum()) for city in set(cities)}
+    assert store.keys(np.array([5, 2])) == [store.keys()[5], store.keys()[2]]
+
+
+def test_filters_match_numpy(feed):
+    batches, store = feed
+    cities = np.concatenate([batch.column('city') for batch in batches])
+    prices = store.column('price_current')
+    assert (store.mask('city', 'Tampa', 'Largo') == np.isin(cities, ['Tampa', 'Largo'])).all()
+    assert (store.where('price_current', 300_000, 500_000) == ((prices >= 300_000) & (prices <= 500_000))).all()
+
+    rows = store.mask('city', 'Tampa')
+    expected = float(np.nanmean(np.asarray(prices, dtype=np.float64)[rows]))
+    assert store.group_mean('city', 'price_current', rows) == pytest.approx({'Tampa': expected})
+
+
+def test_scores_match_the_engine(feed, engine):
+    batches, store = feed
+    extractor = FeatureExtractor(engine.config.variables)
+    X = np.concatenate([extractor.extract(scoring_inputs(b, np.arange(len(b)))).matrix for b in batches])
+    expected = engine.score_profiles(X, ['investor'])['investor'].overall
+
+    np.testing.assert_allclose(store.score('investor', engine=engine), expected, atol=1e-4)
+    # Chunk boundaries and a row subset give the same scores
+    np.testing.assert_allclose(store.score('investor', engine=engine, chunk_rows=7), expected, atol=1e-4)
+    rows = store.mask('city', 'Tampa')
+    np.testing.assert_allclose(store.score('investor', rows, engine, chunk_rows=100), expected[rows], atol=1e-4)
+
+
+def test_unpublished_or_damaged_store(tmp_path, engine):
+    path = str(tmp_path / 'store')
+    with pytest.raises(RuntimeError):
+        with ColumnStoreWriter(path, engine.config.variables):
+            raise RuntimeError('import failed')
+    assert not os.path.exists(path) and not os.path.exists(path + '.tmp')
+    with pytest.raises(ColumnStoreError):
+        ColumnStore(path)
+
+    with ColumnStoreWriter(path, engine.config.variables) as writer:
+        writer.append_properties([{'property_id': 'p1', 'price': {'current': 250000}}])
+    store = ColumnStore(path)
+    assert store.keys() == ['p1'] and store.column('price_current')[0] == 250000
+
+    variable = engine.config.variables[0]
+    with open(os.path.join(path, _value_file(variable)), 'ab') as f:
+        f.write(b'\0\0\0\0')
+    with pytest.raises(ColumnStoreError):
+        ColumnStore(path).column(variable)
@@ -0,0 +1,115 @@
+"""Streaming CSV ingestion and header-fingerprint column mapping."""
+
+import csv
+
+import numpy as np
+import pytest
+
+from column_mapping import ColumnMappingResolver, detect_columns, header_fingerprint, infer_converter
+from csv_ingest import (BLANKS, DIRTY, PLAIN, CSVFormatError, CSVIngestor, generate_csv, parse_number,
+                        read_csv_batches, to_numeric)
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_generated_feed_batches(tmp_path):
+    path = str(tmp_path / 'feed.csv')
+    generate_csv(path, 2500)
+    batches = list(read_csv_batches(path, batch_size=1000))
+    assert [len(b) for b in batches] == [1000, 1000, 500]
+    rows = np.concatenate([b.row_numbers for b in batches])
+    assert rows[0] == 2 and (np.diff(rows) == 1).all()
+
+    with open(path, newline='', encoding='utf-8') as f:
+        expected = list(csv.DictReader(f))
+    assert batches[0].column('description') == [r['description'] for r in expected[:1000]]
+    np.testing.assert_array_equal(batches[2].column('price'), [float(r['price']) for r in expected[2000:]])
+
+
+def test_quoted_newlines_commas_and_escapes(tmp_path):
+    path = write(tmp_path / 'quoted.csv',
+                 'street,price,description\n'
+                 '"1 Gulf Blvd, Unit 4","$350,000","Line one\nLine ""two"""\n'
+                 '2 Gulf Blvd,,plain\n')
+    batch, = CSVIngestor(path, required=())
+    assert batch.column('street') == ['1 Gulf Blvd, Unit 4', '2 Gulf Blvd']
+    assert batch.column('description') == ['Line one\nLine "two"', 'plain']
+    assert batch.column('price')[0] == 350000
+    assert np.isnan(batch.column('price')[1])
+    assert batch.row_numbers.tolist() == [2, 3]
+
+
+def test_bad_rows_are_reported_not_fatal(tmp_path):
+    path = write(tmp_path / 'bad.csv',
+                 'street,price,city\n'
+                 '1 A,100,Tampa\n'
+                 '"2 B"x,200,Tampa\n'          # broken quoting
+                 '3 C,300\n'                   # short row
+                 '4 D,400,Tampa\n')
+    ingestor = CSVIngestor(path, required=())
+    batch, = ingestor
+    assert batch.column('street') == ['1 A', '4 D']
+    assert [(e.row, e.message.split(':')[0]) for e in batch.errors] == [(3, 'bad quoting'), (4, 'expected 3 fields, got 2')]
+    assert ingestor.stats.bad_rows == 2
+
+
+def test_bad_quoting_in_sampled_rows(tmp_path):
+    path = write(tmp_path / 'bad.csv', 'Property Address,Asking Price\n1 A,100\n"2 B"x,200\n3 C,300\n')
+    batch, = CSVIngestor(path, required=(), resolver=ColumnMappingResolver(None))
+    assert batch.column('street') == ['1 A', '3 C']
+    assert [(e.row, e.line) for e in batch.errors] == [(3, 3)]
+
+
+def test_header_problems_stop_the_feed(tmp_path):
+    with pytest.raises(CSVFormatError, match='empty'):
+        list(CSVIngestor(write(tmp_path / 'empty.csv', ''), required=()))
+    with pytest.raises(CSVFormatError, match='missing column'):
+        list(CSVIngestor(write(tmp_path / 'partial.csv', 'street,price\n1 A,100\n')))
+
+
+def test_parse_number_and_converters():
+    assert parse_number('$1,250,000') == 1250000
+    assert np.isnan(parse_number('n/a'))
+    np.testing.assert_array_equal(to_numeric(['1', '2.5'], 'float', PLAIN), [1, 2.5])
+    np.testing.assert_array_equal(to_numeric(['1', ''], 'float', BLANKS), [1, np.nan])
+    # A converter the sample got wrong still parses the batch
+    np.testing.assert_array_equal(to_numeric(['1', '$2,000'], 'int', PLAIN), [1, 2000])
+    np.testing.assert_array_equal(to_numeric(['2.7', '3'], 'int', DIRTY), [2, 3])
+
+
+def test_detect_columns_exact_before_fuzzy():
+    header = ['Property Address', 'City', 'Asking Price', 'Beds', 'Baths', 'Sq Ft', 'Lot Size', 'MLS #', 'Zip']
+    positions = detect_columns(header)
+    assert positions == {'street': 0, 'city': 1, 'price': 2, 'bedrooms': 3, 'bathrooms': 4, 'sqft_living': 5,
+                         'sqft_lot': 6, 'mls_number': 7, 'zip': 8}
+    # canonical names win over keywords that also match
+    assert detect_columns(['lot', 'sqft_lot'])['sqft_lot'] == 1
+
+
+def test_infer_converter():
+    assert infer_converter(['1', '2.5']) == PLAIN
+    assert infer_converter(['1', '']) == BLANKS
+    assert infer_converter(['1', '$2']) == DIRTY
+
+
+def test_mapping_cache_round_trip(tmp_path):
+    cache = str(tmp_path / 'mappings.json')
+    header = ['Address', 'Price', 'Beds']
+    resolver = ColumnMappingResolver(cache)
+    assert resolver.lookup(header) is None
+    plan = resolver.resolve(header, [['1 A', '$100', '3'], ['2 B', '200', '']])
+    assert plan.converters == {'price': DIRTY, 'bedrooms': BLANKS}
+    resolver.save()
+
+    again = ColumnMappingResolver(cache)
+    cached = again.lookup([' address ', 'PRICE', 'beds'])       # same normalized header
+    assert cached.positions == plan.positions and cached.source == 'cache'
+    assert header_fingerprint(header) != header_fingerprint(['Beds', 'Price', 'Address'])
+
+    again.forget(header)
+    assert again.lookup(header) is None
+    with pytest.raises(CSVFormatError):
+        again.resolve(['foo', 'qux'])
@@ -0,0 +1,102 @@
+"""Change sets and carried-over scores of incremental_import (needs node for the engine config)."""
+
+import csv
+import shutil
+
+import numpy as np
+import pytest
+
+from csv_ingest import generate_csv
+from incremental_import import ImportSnapshot, IncrementalImporter, address_key
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='scoring-engine.js is read through node')
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+
+
+@pytest.fixture
+def feeds(tmp_path):
+    """Night 1 (20 listings) and night 2: one price drop, one status change,
+    one description edit, one listing removed and one new listing."""
+    first = tmp_path / 'night1.csv'
+    generate_csv(str(first), 20)
+    header, *rows = read_rows(first)
+    col = {name: i for i, name in enumerate(header)}
+
+    edited = [list(row) for row in rows]
+    edited[0][col['price']] = str(int(float(rows[0][col['price']])) - 50_000)
+    edited[1][col['status']] = 'pending'
+    edited[2][col['description']] = 'Brand new dock'
+    removed = edited.pop(3)
+    added = list(rows[4])
+    added[col['mls_number']] = 'TB9999999'
+    edited.append(added)
+
+    second = tmp_path / 'night2.csv'
+    write_rows(second, [header] + edited)
+    return first, second, rows, col, removed
+
+
+def test_change_set_contents(tmp_path, feeds):
+    first, second, rows, col, removed = feeds
+    state = str(tmp_path / 'state.npz')
+
+    changes, stats = IncrementalImporter(state).run(str(first))
+    assert len(changes.new) == 20 and changes.rescored == 20
+
+    changes, stats = IncrementalImporter(state).run(str(second))
+    key = lambda row: 'MLS:' + row[col['mls_number']]
+    old_price = float(rows[0][col['price']])
+
+    assert changes.price_changed == [(key(rows[0]), rows[0][col['street']], old_price, old_price - 50_000)]
+    assert changes.status_changed == [(key(rows[1]), rows[1][col['street']], 'active', 'pending')]
+    assert changes.changed == [key(rows[2])]
+    assert changes.removed == [(key(removed), removed[col['street']])]
+    assert [new[0] for new in changes.new] == ['MLS:TB9999999']
+    assert changes.unchanged == 16
+    # Only the new listing and the repriced one reach the scoring engine
+    assert changes.rescored == 2
+    assert stats.skipped == 16
+
+    kinds = [alert['type'] for alert in changes.to_alerts(created_at=0)]
+    assert sorted(kinds) == ['NEW_LISTING', 'PRICE_DROP', 'STATUS_CHANGE', 'STATUS_CHANGE']
+
+
+def test_carried_scores_match_a_full_import(tmp_path, feeds):
+    first, second, *_ = feeds
+    incremental = str(tmp_path / 'incremental.npz')
+    IncrementalImporter(incremental).run(str(first))
+    IncrementalImporter(incremental).run(str(second))
+
+    full = str(tmp_path / 'full.npz')
+    IncrementalImporter(full).run(str(second))
+
+    a, b = ImportSnapshot.load(incremental), ImportSnapshot.load(full)
+    assert a.keys.tolist() == b.keys.tolist()
+    np.testing.assert_allclose(a.scores, b.scores, atol=1e-4)
+
+
+def test_profile_change_rescores_every_row(tmp_path, feeds):
+    first, *_ = feeds
+    state = str(tmp_path / 'state.npz')
+    IncrementalImporter(state, profile='balanced').run(str(first))
+
+    changes, stats = IncrementalImporter(state, profile='investor').run(str(first))
+    assert changes.rescored == 20 and stats.skipped == 0
+    assert changes.counts()['unchanged'] == 20
+
+    changes, _ = IncrementalImporter(state, profile='investor').run(str(first))
+    assert changes.rescored == 0
+
+
+def test_address_key_normalizes_like_the_deduper():
+    assert address_key('123 North Gulf Boulevard, Unit #4', '33706-1234') == '123 n gulf blvd apt 4|33706'
+    assert address_key('', '33706') == ''
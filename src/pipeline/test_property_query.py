@@ -0,0 +1,117 @@
+"""Index choice and results of the property_query planner."""
+
+import numpy as np
+import pytest
+
+from property_query import PropertyIndex
+
+CITIES = ['Saint Pete Beach', 'Treasure Island', 'Tampa', 'Clearwater', 'St. Petersburg',
+          'Largo', 'Dunedin', 'Gulfport', 'Seminole', 'Madeira Beach']
+STATUSES = ['active', 'active', 'active', 'pending', 'sold']
+TYPES = ['single_family', 'condo', 'townhouse', 'multi_family']
+N = 5000
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    return {
+        'price': (rng.integers(100, 3000, N) * 1000).astype(float),
+        'bedrooms': rng.integers(1, 7, N).astype(float),
+        'bathrooms': rng.choice([1.0, 1.5, 2.0, 2.5, 3.0, 4.0], N),
+        'city': np.array(CITIES)[rng.integers(0, len(CITIES), N)],
+        'status': np.array(STATUSES)[rng.integers(0, len(STATUSES), N)],
+        'property_type': np.array(TYPES)[rng.integers(0, len(TYPES), N)],
+    }
+
+
+@pytest.fixture(scope='module')
+def index(data):
+    index = PropertyIndex(':memory:')
+    index.upsert((f"MLS:TB{i}", float(data['price'][i]), float(data['bedrooms'][i]), float(data['bathrooms'][i]),
+                  str(data['property_type'][i]), str(data['city'][i]), str(data['status'][i]), 'FL', '33701', None)
+                 for i in range(N))
+    # One listing without a price: never inside a price range
+    index.upsert([('MLS:NOPRICE', None, 3.0, 2.0, 'condo', 'Tampa', 'active', 'FL', '33701', None)])
+    index.analyze()
+    yield index
+    index.close()
+
+
+def brute_force(data, criteria):
+    mask = np.ones(N, dtype=bool)
+    for key, value in criteria.items():
+        if not value:
+            continue
+        if key == 'minPrice':
+            mask &= data['price'] >= value
+        elif key == 'maxPrice':
+            mask &= data['price'] <= value
+        elif key == 'minBedrooms':
+            mask &= data['bedrooms'] >= value
+        elif key == 'minBathrooms':
+            mask &= data['bathrooms'] >= value
+        else:
+            column = {'propertyType': 'property_type'}.get(key, key)
+            mask &= data[column] == value
+    return int(mask.sum())
+
+
+@pytest.mark.parametrize('criteria, expected_index, index_columns', [
+    ({'city': 'Tampa', 'status': 'active', 'maxPrice': 400_000}, 'idx_city_status_price', ('city', 'status', 'price')),
+    ({'city': 'Largo', 'propertyType': 'townhouse'}, 'idx_city_status_price', ('city',)),
+    ({'minPrice': 1_000_000, 'maxPrice': 1_010_000}, 'idx_price', ('price',)),
+    ({'propertyType': 'condo', 'status': 'sold'}, 'idx_type_status_price', ('property_type', 'status')),
+    ({'status': 'pending', 'minPrice': 2_900_000}, 'idx_status_price', ('status', 'price')),
+])
+def test_picks_the_most_selective_index(index, criteria, expected_index, index_columns):
+    plan = index.explain(criteria)
+    assert plan.index == expected_index, plan.describe()
+    assert plan.index_columns == index_columns
+    assert any(expected_index in detail for detail in plan.sqlite_plan), plan.describe()
+    assert len(plan.index_predicates) + len(plan.residual) == len(criteria)
+
+
+@pytest.mark.parametrize('criteria', [
+    {'status': 'active'},                     # 60% of the table
+    {'minBedrooms': 2},
+    {},
+    {'city': '', 'minPrice': 0},              # falsy values are no filter
+])
+def test_unselective_criteria_scan_the_table(index, criteria):
+    plan = index.plan(criteria)
+    assert plan.index is None
+    assert 'NOT INDEXED' in plan.sql
+
+
+@pytest.mark.parametrize('criteria', [
+    {'city': 'Tampa', 'status': 'active', 'maxPrice': 400_000},
+    {'propertyType': 'condo', 'minPrice': 2_500_000},
+    {'minPrice': 1_000_000, 'maxPrice': 1_010_000},
+    {'minBedrooms': 6, 'minBathrooms': 4},
+    {'status': 'sold', 'minBedrooms': 3},
+    {'city': 'Largo', 'propertyType': 'townhouse', 'minBedrooms': 5, 'maxPrice': 300_000},
+])
+def test_results_match_a_full_filter(index, data, criteria):
+    assert index.count(criteria) == brute_force(data, criteria)
+    rows = index.search(criteria, limit=20, order_by='price DESC')
+    prices = [row['price'] for row in rows]
+    assert prices == sorted(prices, reverse=True)
+
+
+def test_estimates_are_close_on_equality_columns(index, data):
+    plan = index.plan({'city': 'Tampa', 'status': 'active'})
+    actual = brute_force(data, {'city': 'Tampa', 'status': 'active'})
+    assert abs(plan.estimated_rows - actual) < 0.25 * actual
+
+
+def test_listing_without_price_never_matches_a_price_range(index):
+    assert index.count({'city': 'Tampa', 'status': 'active', 'propertyType': 'condo'}) == \
+        index.count({'city': 'Tampa', 'status': 'active', 'propertyType': 'condo', 'minPrice': 1}) + 1
+
+
+def test_rejects_unknown_criteria_and_order(index):
+    with pytest.raises(KeyError):
+        index.plan({'bedrooms': 3})
+    with pytest.raises(ValueError):
+        index.plan({'city': 'Tampa'}, order_by='price; DROP TABLE properties')
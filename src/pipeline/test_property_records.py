@@ -0,0 +1,56 @@
+"""PropertyRecord.from_dict(p).to_dict() gives back p, edge cases included."""
+
+import math
+
+import pytest
+
+from property_records import PropertyRecord, _same, _stored_shape, _synthetic
+
+NAN = float('nan')
+
+
+def round_trip(prop):
+    return PropertyRecord.from_dict(prop).to_dict()
+
+
+@pytest.mark.parametrize('prop', list(_synthetic(20)), ids=lambda p: p['id'])
+def test_import_and_stored_shapes(prop):
+    assert _same(round_trip(prop), prop)
+    stored = _stored_shape(prop)
+    assert _same(round_trip(stored), stored)
+
+
+@pytest.mark.parametrize('prop', [
+    {'property_id': 'nan-price', 'price': {'current': NAN}},
+    {'property_id': 'nan-both', 'financial': {'listingPrice': NAN}, 'price': {'current': 250000}},
+    {'property_id': 'nan-variable', 'analytics': {'variable_values': {'cap_rate': NAN, 'noise_level': 30}}},
+    {'property_id': 'infinite', 'financial': {'listingPrice': float('inf')}},
+    {'property_id': 'bools', 'basic': {'bedrooms': True}, 'analytics': {'variable_values': {'pool': False}}},
+    {'property_id': 'huge-int', 'financial': {'listingPrice': 2 ** 60}},
+    {'property_id': 'int-vs-float', 'basic': {'bedrooms': 3, 'bathrooms': 2.0}},
+    {'property_id': 'numeric-strings', 'basic': {'bedrooms': '3', 'squareFeet': ''}},
+    {'property_id': 'nulls', 'basic': {'bedrooms': None, 'address': None}, 'location': {'city': None}},
+    {'property_id': 'mirror-differs', 'location': {'latitude': 27.7, 'longitude': -82.7},
+     'basic': {'coordinates': {'latitude': 27.8, 'longitude': -82.7}}},
+    {'property_id': 'mirror-int', 'location': {'latitude': 27.5, 'longitude': -82}},
+    {'property_id': 'second-path', 'location': {'lat': 27.7, 'lng': -82.7}},
+    {'id': 'id-key', 'source': 'csv_import', 'basic': {'status': 'active'}},
+    {'basic': {'address': '1 Gulf Blvd'}},
+    {'property_id': 'empty-sections', 'basic': {}, 'analytics': {'variable_values': {}}},
+], ids=lambda p: str(p.get('property_id') or p.get('id') or 'no-id'))
+def test_edge_cases(prop):
+    assert _same(round_trip(prop), prop)
+
+
+def test_nan_is_kept_rather_than_read_as_missing():
+    record = PropertyRecord.from_dict({'property_id': 'p', 'price': {'current': NAN}})
+    assert record.price is None
+    assert math.isnan(record.to_dict()['price']['current'])
+
+
+def test_views_use_the_import_shape():
+    record = PropertyRecord.from_dict(_stored_shape(next(_synthetic(1))))
+    assert record.financial['listingPrice'] == record.price
+    assert record.location['city'] == record.city
+    assert record.variable('condition_rating') == record.variable_values['condition_rating']
+    assert record.variable('no_such_variable') is None
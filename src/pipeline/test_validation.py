@@ -0,0 +1,93 @@
+"""Column-wise validation against DataImporter.validateProperty."""
+
+import json
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from csv_ingest import CSVIngestor
+from validation import ValidationEngine
+
+IMPORTER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core', 'data-importer.js')
+
+# parseCSV -> autoDetectColumns -> mapCSVRow -> validateProperty, one result per data row
+_JS_VALIDATE = r"""
+const fs = require('fs');
+const code = fs.readFileSync(process.argv[1], 'utf8');
+const DataImporter = new Function(code.slice(0, code.indexOf('// Export singleton instance')) + '\nreturn DataImporter;')();
+const importer = new DataImporter();
+const data = importer.parseCSV(fs.readFileSync(process.argv[2], 'utf8'));
+const mapping = importer.autoDetectColumns(data[0]);
+process.stdout.write(JSON.stringify(data.slice(1).map(row => {
+    const result = importer.validateProperty(importer.mapCSVRow(row, mapping, data[0]));
+    return [result.isValid, result.qualityScore];
+})));
+"""
+
+HEADER = 'street,city,state,zip,price,bedrooms,bathrooms,sqft_living,sqft_lot,year_built,property_type,mls_number,description'
+ROWS = [
+    '1 Gulf Blvd,Tampa,FL,33701,350000,3,2,1800,6000,1995,single_family,TB1,Pool home',
+    '2 Gulf Blvd,,,,350000,3,2,1800,6000,1995,condo,TB2,',
+    '3 Gulf Blvd,Largo,FL,33770,420000,0,0,0,0,,,TB3,',
+    ',Tampa,FL,33701,250000,2,1,900,0,1980,condo,TB4,No address',
+    '5 Gulf Blvd,Tampa,FL,33701,,2,1,900,0,1980,condo,TB5,No price',
+    '6 Gulf Blvd,Tampa,FL,33701,300000,2,1,50,0,1980,condo,TB6,Tiny',
+    '7 Gulf Blvd,Tampa,FL,33701,300000,2,1,900,0,1700,condo,TB7,Too old',
+]
+
+
+def load_batch(path):
+    batches = list(CSVIngestor(str(path), required=()))
+    assert len(batches) == 1
+    return batches[0]
+
+
+@pytest.fixture
+def feed(tmp_path):
+    path = tmp_path / 'feed.csv'
+    path.write_text('\n'.join([HEADER] + ROWS) + '\n')
+    return path
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='compares against data-importer.js under node')
+def test_quality_and_validity_match_js(feed):
+    proc = subprocess.run(['node', '-e', _JS_VALIDATE, os.path.abspath(IMPORTER_PATH), str(feed)],
+                          capture_output=True, text=True, check=True)
+    js_valid, js_quality = zip(*json.loads(proc.stdout))
+
+    result = ValidationEngine().validate(load_batch(feed))
+    assert result.quality.tolist() == list(js_quality)
+    assert result.valid.tolist() == list(js_valid)
+
+
+def test_error_table(feed):
+    result = ValidationEngine().validate(load_batch(feed))
+    errors = result.errors.to_list()
+    assert [(e['row'], e['field'], e['rule']) for e in errors] == [
+        (5, 'basic.address', 'required'),
+        (6, 'financial.listingPrice', 'required'),
+        (7, 'basic.squareFeet', 'range'),
+        (8, 'basic.yearBuilt', 'range'),
+    ]
+    assert result.errors.counts()[('basic.address', 'required')] == 1
+
+
+def test_zip_and_state_formats(tmp_path):
+    path = tmp_path / 'formats.csv'
+    path.write_text('street,price,state,zip\n'
+                    '1 A,1,FL,33701\n2 B,1,fl,33701-1234\n3 C,1,Florida,3370\n4 D,1,,\n5 E,1,F1,33701_1234\n')
+    result = ValidationEngine().validate(load_batch(path))
+    assert result.valid.tolist() == [True, True, False, True, False]
+    fields = [(e['row'], e['field']) for e in result.errors.to_list()]
+    assert fields == [(4, 'location.zipCode'), (4, 'location.state'), (6, 'location.zipCode'), (6, 'location.state')]
+
+
+def test_quality_counts_missing_fields():
+    from csv_ingest import RecordBatch
+    batch = RecordBatch({'street': ['1 A', '2 B'], 'city': ['Tampa', ''], 'bedrooms': np.array([3.0, np.nan])},
+                        np.array([2, 3]))
+    # Everything but city and bedrooms is absent: 100 - (5 + 5 + 15 + 10 + 10 + 10 + 20) and 5 + 10 more
+    assert ValidationEngine().validate(batch).quality.tolist() == [25, 10]
@@ -0,0 +1,71 @@
+"""Monte Carlo weight uncertainty (needs node for the engine config)."""
+
+import shutil
+
+import numpy as np
+import pytest
+
+from batch_scoring import BatchScoringEngine
+from weight_uncertainty import HISTOGRAM_BINS, MonteCarloScorer, sample_multipliers
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='scoring-engine.js is read through node')
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return BatchScoringEngine()
+
+
+@pytest.fixture(scope='module')
+def X(engine):
+    cfg = engine.config
+    X = np.random.default_rng(0).uniform(cfg.mins, cfg.maxs, size=(400, len(cfg.variables))).astype(np.float32)
+    X[np.random.default_rng(1).random(X.shape) < 0.2] = np.nan
+    return X
+
+
+@pytest.mark.parametrize('method', ['dirichlet', 'gaussian'])
+def test_multipliers_stay_positive_and_centred(method):
+    profile = np.array([1.0, 1.5, 0.5, 2.0])
+    samples = sample_multipliers(profile, 20000, method, rng=np.random.default_rng(0))
+    assert samples.shape == (20000, 4)
+    assert (samples > 0).all()
+    np.testing.assert_allclose(samples.mean(axis=0), profile, rtol=0.02)
+    if method == 'dirichlet':
+        np.testing.assert_allclose(samples.sum(axis=1), profile.sum())
+    with pytest.raises(ValueError):
+        sample_multipliers(profile, 1, 'uniform')
+
+
+def test_summary_statistics(engine, X):
+    result = MonteCarloScorer(engine).run(X, 'investor', n_samples=300, k=10, seed=0)
+    assert result.histogram.shape == (len(X), HISTOGRAM_BINS)
+    assert (result.histogram.sum(axis=1) == 300).all()
+    assert (result.minimum <= result.mean + 1e-4).all() and (result.mean <= result.maximum + 1e-4).all()
+    assert (result.std >= 0).all()
+    assert result.p_top_k.sum() == pytest.approx(10)
+
+    low, high = result.interval(0.9)
+    assert (low <= high).all()
+    assert (low <= np.floor(result.maximum)).all() and (high >= np.floor(result.minimum)).all()
+    # The mean score sits near the fixed-profile score
+    fixed = engine.score_profiles(X, ['investor'])['investor'].overall
+    assert np.abs(result.mean - fixed).max() < 2
+
+
+def test_memory_budget_only_changes_blocking(engine, X):
+    roomy = MonteCarloScorer(engine).run(X, 'balanced', n_samples=250, k=5, seed=3)
+    tight = MonteCarloScorer(engine, memory_budget_mb=0.2)
+    assert tight.block_size(len(X)) < 250 and tight.histogram_rows() < len(X)
+
+    result = tight.run(X, 'balanced', n_samples=250, k=5, seed=3)
+    for name in ('mean', 'std', 'minimum', 'maximum'):
+        np.testing.assert_allclose(getattr(result, name), getattr(roomy, name), atol=1e-4)
+    assert (result.histogram == roomy.histogram).all()
+    assert (result.p_top_k == roomy.p_top_k).all()
+
+
+def test_k_larger_than_rows(engine, X):
+    result = MonteCarloScorer(engine).run(X[:3], n_samples=20, k=10, seed=0)
+    assert result.k == 3
+    assert (result.p_top_k == 1).all()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo weight-uncertainty scoring.
+
+The WEIGHT_PROFILES multipliers (initializeProfiles in scoring-engine.js) are
+point estimates. This samples K multiplier vectors around a profile and scores
+every property under every sample. Because
+
+    overall = partial @ P / (category_weight @ P)
+
+the per-category partial sums (batch_scoring.BatchScoringEngine.partial_sums)
+are computed once and each block of samples is a single (N x C) @ (C x K)
+product. Per property only running moments, a 1-point score histogram and a
+top-k counter are kept, so memory does not grow with K.
+
+Memory: the block buffers (float32 scores, float64 squares, int64 histogram
+bin ids, int64 argpartition indices: CELL_BYTES per property per sample) are
+allocated once and sized to 3/4 of the memory budget; the histogram's
+bincount scratch is capped at the other 1/4 by counting a slice of rows at a
+time. The results add about 1 KB per property on top (mostly the 101-bin
+histogram), and a single sample per block is the floor, so very large N can
+still exceed the budget.
+
+Sampling:
+    dirichlet  multipliers ~ sum(p) * Dirichlet(concentration * p / sum(p))
+               (mean = the profile; larger concentration = tighter)
+    gaussian   multipliers ~ p * (1 + sigma * N(0, 1)), clipped to stay positive
+
+Usage:
+    python weight_uncertainty.py --bench 10000 10000 [dirichlet|gaussian]
+"""
+
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from batch_scoring import BatchScoringEngine
+
+HISTOGRAM_BINS = 101          # scores 0..100 in 1-point bins
+DEFAULT_MEMORY_BUDGET_MB = 256
+CELL_BYTES = 4 + 8 + 8 + 8    # per row and sample: scores, squares, bin ids, argpartition
+HISTOGRAM_SHARE = 0.25        # budget share for the bincount scratch
+MIN_MULTIPLIER = 1e-6         # a sampled 0 would hit the JS `|| 1.0` fallback
+
+
+def sample_multipliers(profile, n_samples, method='dirichlet', concentration=50.0, sigma=0.15, rng=None):
+    """(n_samples, C) category multipliers scattered around profile (C,)."""
+    rng = rng if rng is not None else np.random.default_rng()
+    profile = np.asarray(profile, dtype=np.float64)
+    total = profile.sum()
+
+    if method == 'dirichlet':
+        alpha = concentration * profile / total
+        samples = rng.dirichlet(alpha, size=n_samples) * total
+    elif method == 'gaussian':
+        samples = profile * (1.0 + sigma * rng.standard_normal((n_samples, len(profile))))
+    else:
+        raise ValueError(f"unknown sampling method '{method}' (dirichlet or gaussian)")
+    return np.maximum(samples, MIN_MULTIPLIER)
+
+
+@dataclass
+class WeightUncertainty:
+    """Per-property score distribution over the sampled weight vectors."""
+    n_samples: int
+    k: int
+    mean: np.ndarray         # (N,)
+    std: np.ndarray          # (N,)
+    minimum: np.ndarray      # (N,)
+    maximum: np.ndarray      # (N,)
+    histogram: np.ndarray    # (N, HISTOGRAM_BINS) sample counts per 1-point score bin
+    p_top_k: np.ndarray      # (N,) fraction of samples with the property in the top k
+    seconds: float
+
+    def quantile(self, q):
+        """(N,) approximate score quantile from the histogram (1-point resolution)."""
+        cumulative = np.cumsum(self.histogram, axis=1)
+        target = q * self.n_samples
+        bins = (cumulative < target).sum(axis=1)
+        return np.clip(bins, 0, HISTOGRAM_BINS - 1).astype(np.float64)
+
+    def interval(self, coverage=0.9):
+        tail = (1.0 - coverage) / 2
+        return self.quantile(tail), self.quantile(1.0 - tail)
+
+
+class MonteCarloScorer:
+    """Scores N properties under K sampled weight vectors, block by block."""
+
+    def __init__(self, engine=None, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        self.engine = engine or BatchScoringEngine()
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+
+    def block_size(self, n_rows):
+        """Samples per block: the block buffers take CELL_BYTES per row and sample."""
+        bytes_per_sample = n_rows * CELL_BYTES
+        return max(1, int(self.memory_budget * (1 - HISTOGRAM_SHARE)) // max(1, bytes_per_sample))
+
+    def histogram_rows(self):
+        """Rows per bincount call: its scratch is HISTOGRAM_BINS int64 counters per row."""
+        return max(1, int(self.memory_budget * HISTOGRAM_SHARE) // (HISTOGRAM_BINS * 8))
+
+    def run(self, X=None, profile='balanced', n_samples=1000, k=10, method='dirichlet',
+            concentration=50.0, sigma=0.15, custom_weights=None, seed=None,
+            partial=None, category_weight=None):
+        """
+        Score distribution and P(top-k) for every row of X (or of precomputed
+        partial sums) under n_samples multiplier vectors around `profile`.
+        """
+        t0 = time.perf_counter()
+        cfg = self.engine.config
+        if partial is None:
+            partial, category_weight = self.engine.partial_sums(self.engine.normalize(X), custom_weights)
+        partial = np.asarray(partial, dtype=np.float32)
+        category_weight = np.asarray(category_weight, dtype=np.float64)
+        n_rows = partial.shape[0]
+        k = min(k, n_rows)
+
+        rng = np.random.default_rng(seed)
+        multipliers = sample_multipliers(cfg.profile_vector(profile), n_samples, method,
+                                         concentration, sigma, rng)
+
+        total = np.zeros(n_rows, dtype=np.float64)
+        total_sq = np.zeros(n_rows, dtype=np.float64)
+        minimum = np.full(n_rows, np.inf)
+        maximum = np.full(n_rows, -np.inf)
+        histogram = np.zeros((n_rows, HISTOGRAM_BINS), dtype=np.int64)
+        top_counts = np.zeros(n_rows, dtype=np.int64)
+
+        # Block buffers, allocated once; a shorter last block uses their prefix
+        block = max(1, min(self.block_size(n_rows), n_samples))
+        scores_buf = np.empty(n_rows * block, dtype=np.float32)
+        squares_buf = np.empty(n_rows * block, dtype=np.float64)
+        bins_buf = np.empty(n_rows * block, dtype=np.int64)
+        chunk = min(self.histogram_rows(), n_rows)
+        chunk_offsets = (np.arange(chunk, dtype=np.int64) * HISTOGRAM_BINS)[:, None]
+
+        for start in range(0, n_samples, block):
+            P = multipliers[start:start + block].T                    # (C, B)
+            width = P.shape[1]
+            scores = scores_buf[:n_rows * width].reshape(n_rows, width)
+            squares = squares_buf[:n_rows * width].reshape(n_rows, width)
+            bins = bins_buf[:n_rows * width].reshape(n_rows, width)
+
+            np.matmul(partial, P.astype(np.float32), out=scores)     # (N, B)
+            scores /= (category_weight @ P).astype(np.float32)
+
+            total += scores.sum(axis=1, dtype=np.float64)
+            np.square(scores, out=squares, dtype=np.float64)
+            total_sq += squares.sum(axis=1)
+            np.minimum(minimum, scores.min(axis=1), out=minimum)
+            np.maximum(maximum, scores.max(axis=1), out=maximum)
+
+            # Clipped scores go through the squares buffer; bincount per row slice
+            np.clip(scores, 0, 100, out=squares)
+            np.copyto(bins, squares, casting='unsafe')
+            for row in range(0, n_rows, chunk):
+                rows = bins[row:row + chunk]
+                rows += chunk_offsets[:len(rows)]
+                histogram[row:row + chunk] += np.bincount(
+                    rows.ravel(), minlength=len(rows) * HISTOGRAM_BINS).reshape(len(rows), HISTOGRAM_BINS)
+
+            if k > 0:
+                # The k largest per column sit at the end; no negated copy
+                top = np.argpartition(scores, n_rows - k, axis=0)[n_rows - k:]   # (k, B) row ids
+                top_counts += np.bincount(top.ravel(), minlength=n_rows)
+
+        mean = total / n_samples
+        std = np.sqrt(np.maximum(total_sq / n_samples - mean * mean, 0.0))
+        return WeightUncertainty(
+            n_samples=n_samples,
+            k=k,
+            mean=mean,
+            std=std,
+            minimum=minimum,
+            maximum=maximum,
+            histogram=histogram,
+            p_top_k=top_counts / n_samples,
+            seconds=time.perf_counter() - t0
+        )
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) < 3 or args[0] != '--bench':
+        print(__doc__)
+        return 2
+
+    n_rows, n_samples = int(args[1]), int(args[2])
+    method = args[3] if len(args) > 3 else 'dirichlet'
+    scorer = MonteCarloScorer()
+    cfg = scorer.engine.config
+    rng = np.random.default_rng(0)
+    X = rng.uniform(cfg.mins, cfg.maxs, size=(n_rows, len(cfg.variables))).astype(np.float32)
+
+    result = scorer.run(X, 'balanced', n_samples, k=10, method=method, seed=0)
+    print(f"{n_rows:,} properties x {n_samples:,} {method} weight samples in {result.seconds:.2f}s "
+          f"(blocks of {scorer.block_size(n_rows):,} samples)")
+    low, high = result.interval(0.9)
+    for i in np.argsort(-result.p_top_k)[:10]:
+        print(f"  #{i:<6} mean {result.mean[i]:6.2f} ± {result.std[i]:5.2f}  "
+              f"90% [{low[i]:.0f}, {high[i]:.0f}]  P(top {result.k}) {result.p_top_k[i]:.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
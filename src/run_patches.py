@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Run enhancement patchers with a content-hash ledger.
+
+Declarative patchers (plain content.replace chains) are batched through
+patch_engine in a single pass per page; anything else (patch_real_3d.py,
+modernize_weather_simulator.py, ...) is run as a script. Every patch is
+recorded in the ledger, so a rerun over untouched pages skips straight
+through on a hash lookup and only new or edited patchers are applied.
+
+With no scripts given, every patcher in this folder is discovered and
+grouped by the page it edits. Each page's group runs in its own worker
+process; within a page, patches always run in the same (given or sorted)
+order, so results do not depend on scheduling.
+
+Usage:
+    python run_patches.py                  # all patchers, one worker per core
+    python run_patches.py -j 4             # cap the worker count
+    python run_patches.py flip_y_axis.py add_satellite_view.py patch_real_3d.py
+    python run_patches.py --force ...      # ignore the ledger
+    python run_patches.py --dry-run ...    # show what would run
+"""
+
+import glob
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from patch_engine import PatchSpecError, apply_patches, find_target, load_patch_spec
+from patch_ledger import DEFAULT_LEDGER, PatchLedger, content_hash, script_hash, spec_hash
+
+
+@dataclass
+class PatchStep:
+    """One patcher, resolved to the page it edits."""
+    patch_id: str
+    script: str
+    target: str            # page relative to base_dir - its ledger key
+    path: str              # page relative to the current directory, for reading and writing
+    spec_hash: str
+    spec: object = None    # PatchSpec when declarative, None when run as a script
+
+
+def discover_patchers(directory='.'):
+    """Every script in directory that edits an .html page, sorted by name."""
+    patchers = []
+    for script in sorted(glob.glob(os.path.join(directory, '*.py'))):
+        try:
+            target = find_target(script)
+        except (SyntaxError, OSError):
+            continue
+        if target and target.endswith('.html'):
+            patchers.append(script)
+    return patchers
+
+
+def plan_patches(scripts, base_dir='.'):
+    """
+    Resolve scripts to PatchSteps, in the order given. Returns (steps, errors).
+
+    Targets are keyed relative to base_dir (the ledger's folder), so the
+    ledger matches no matter which directory the runner is started from.
+    """
+    steps = []
+    errors = []
+    for script in scripts:
+        base = os.path.dirname(os.path.abspath(script))
+        patch_id = os.path.splitext(os.path.basename(script))[0]
+        try:
+            spec = load_patch_spec(script)
+            path = os.path.join(base, spec.target)
+            steps.append(PatchStep(patch_id, script, os.path.relpath(path, base_dir),
+                                   os.path.relpath(path), spec_hash(spec), spec))
+            continue
+        except PatchSpecError:
+            pass
+        except (SyntaxError, OSError) as e:
+            errors.append((script, str(e)))
+            continue
+
+        target = find_target(script)
+        if target is None:
+            errors.append((script, 'no target page found'))
+            continue
+        path = os.path.join(base, target)
+        steps.append(PatchStep(patch_id, script, os.path.relpath(path, base_dir),
+                               os.path.relpath(path), script_hash(script)))
+    return steps, errors
+
+
+def group_steps(steps):
+    """Group steps per target page, keeping their relative order."""
+    groups = {}
+    for step in steps:
+        groups.setdefault(step.target, []).append(step)
+    return groups
+
+
+def _run_script(step):
+    """Run a non-declarative patcher from its own folder (they use relative paths)."""
+    script_dir = os.path.dirname(os.path.abspath(step.script))
+    proc = subprocess.run(
+        [sys.executable, os.path.basename(step.script)],
+        cwd=script_dir, capture_output=True, text=True, encoding='utf-8', errors='replace'
+    )
+    return proc.returncode, (proc.stdout + proc.stderr).strip()
+
+
+def run_target(target, steps, ledger, force=False, dry_run=False):
+    """
+    Apply one page's patch group in order, consulting and updating the ledger.
+
+    Consecutive declarative patches are applied together in one pass; their
+    before/after hashes are those of the page around that pass. Returns a
+    list of (patch_id, status, detail) tuples.
+    """
+    path = steps[0].path
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    current = content_hash(content)
+    on_disk = True
+    report = []
+    pending = []
+
+    def flush():
+        nonlocal content, current, on_disk
+        if not pending:
+            return
+        new_content, results, passes = apply_patches(content, [s.spec for s in pending])
+        new_hash = content_hash(new_content) if new_content != content else current
+        for step, result in zip(pending, results):
+            hits = sum(result.hits)
+            status = 'applied' if hits else 'no-op'
+            detail = f"{result.applied}/{len(step.spec.replacements)} replacements"
+            report.append((step.patch_id, status, detail))
+            if not dry_run:
+                ledger.record(target, step.patch_id, step.spec_hash, current, new_hash, hits)
+        if new_content != content:
+            content, current, on_disk = new_content, new_hash, False
+        pending.clear()
+
+    def write():
+        nonlocal on_disk
+        if not on_disk and not dry_run:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        on_disk = True
+
+    for step in steps:
+        if not force and ledger.is_current(target, current, step.patch_id, step.spec_hash):
+            report.append((step.patch_id, 'skipped', 'ledger'))
+            continue
+
+        if step.spec is not None:
+            pending.append(step)
+            continue
+
+        flush()
+        write()
+        if dry_run:
+            report.append((step.patch_id, 'would-run', step.script))
+            continue
+
+        returncode, output = _run_script(step)
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        before, current = current, content_hash(content)
+        if returncode != 0:
+            last_line = output.splitlines()[-1] if output else ''
+            report.append((step.patch_id, 'failed', f"exit {returncode}: {last_line}"))
+            continue
+        status = 'applied' if current != before else 'no-op'
+        report.append((step.patch_id, status, 'script'))
+        ledger.record(target, step.patch_id, step.spec_hash, before, current)
+
+    flush()
+    write()
+    return report
+
+
+def _run_group(target, steps, ledger_entry, force, dry_run):
+    """Worker entry point: run one page's group against its slice of the ledger."""
+    ledger = PatchLedger(None)
+    if ledger_entry is not None:
+        ledger.merge(target, ledger_entry)
+    t0 = time.perf_counter()
+    report = run_target(target, steps, ledger, force=force, dry_run=dry_run)
+    return report, ledger.entry(target), time.perf_counter() - t0
+
+
+def run_all(steps, ledger, workers=None, force=False, dry_run=False):
+    """
+    Run every page's patch group, one page per worker process.
+
+    Pages are independent, so they run concurrently; each worker gets only
+    its page's ledger record and hands it back for merging. Yields
+    (target, group, report, seconds) in the order pages first appear.
+    """
+    groups = group_steps(steps)
+    workers = min(workers or os.cpu_count() or 1, len(groups)) or 1
+
+    if workers == 1:
+        for target, group in groups.items():
+            t0 = time.perf_counter()
+            report = run_target(target, group, ledger, force=force, dry_run=dry_run)
+            yield target, group, report, time.perf_counter() - t0
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            target: pool.submit(_run_group, target, group, ledger.entry(target), force, dry_run)
+            for target, group in groups.items()
+        }
+        for target, future in futures.items():
+            report, entry, seconds = future.result()
+            ledger.merge(target, entry)
+            yield target, groups[target], report, seconds
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    force = '--force' in args
+    dry_run = '--dry-run' in args
+    workers = None
+    if '-j' in args:
+        i = args.index('-j')
+        value = args[i + 1] if i + 1 < len(args) else ''
+        if not value.isdigit() or int(value) < 1:
+            print(f"❌ -j needs a worker count of 1 or more, got {value!r}")
+            print(__doc__)
+            return 2
+        workers = int(value)
+        del args[i:i + 2]
+    scripts = [a for a in args if not a.startswith('--')]
+    base_dir = os.path.dirname(os.path.abspath(scripts[0])) if scripts else os.path.dirname(os.path.abspath(__file__))
+    if not scripts:
+        scripts = discover_patchers(base_dir)
+        if not scripts:
+            print(__doc__)
+            return 2
+
+    steps, errors = plan_patches(scripts, base_dir)
+    for script, reason in errors:
+        print(f"❌ {script}: {reason}")
+
+    ledger = PatchLedger(os.path.join(base_dir, DEFAULT_LEDGER))
+
+    t_start = time.perf_counter()
+    failed = bool(errors)
+    for target, group, report, seconds in run_all(steps, ledger, workers, force, dry_run):
+        skipped = sum(1 for _, status, _ in report if status == 'skipped')
+        print(f"{target}: {len(group)} patches, {skipped} skipped via ledger, {seconds * 1000:.1f}ms")
+        for patch_id, status, detail in report:
+            if status != 'skipped':
+                print(f"  {patch_id}: {status} ({detail})")
+            failed = failed or status == 'failed'
+
+    ledger.save()
+    print(f"Done in {(time.perf_counter() - t_start) * 1000:.1f}ms")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,13 +5,252 @@
  *
  * REPLACES all hardcoded sample data
  *
- * @version 1.0.0
+ * @version 1.1.0
  */
 
+/**
+ * 53-bit string hash (cyrb53), returned as hex
+ */
+function hashString(str, seed = 0) {
+    let h1 = 0xdeadbeef ^ seed;
+    let h2 = 0x41c6ce57 ^ seed;
+    for (let i = 0; i < str.length; i++) {
+        const ch = str.charCodeAt(i);
+        h1 = Math.imul(h1 ^ ch, 2654435761);
+        h2 = Math.imul(h2 ^ ch, 1597334677);
+    }
+    h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+    h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+    return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(16);
+}
+
+/**
+ * JSON with object keys sorted, so equal objects always serialize the same
+ */
+function stableStringify(value) {
+    if (value === null || typeof value !== 'object') return JSON.stringify(value);
+    if (Array.isArray(value)) return '[' + value.map(stableStringify).join(',') + ']';
+    return '{' + Object.keys(value).sort()
+        .map(key => JSON.stringify(key) + ':' + stableStringify(value[key]))
+        .join(',') + '}';
+}
+
+/**
+ * calculateScore result rebuilt from a cache entry. by_variable (100
+ * variables) is not cached; it is recomputed the first time it is read.
+ */
+class CachedScores {
+    constructor(entry, recompute) {
+        this.overall = entry.overall;
+        this.by_category = {};
+        for (const category in entry.by_category) {
+            const data = entry.by_category[category];
+            this.by_category[category] = { score: data.score, weight: data.weight };
+        }
+        this.total_weight = entry.total_weight;
+        this._recompute = recompute;
+        this._by_variable = null;
+    }
+
+    get by_variable() {
+        if (!this._by_variable) {
+            this._by_variable = this._recompute().by_variable;
+        }
+        return this._by_variable;
+    }
+
+    toJSON() {
+        return {
+            overall: this.overall,
+            by_category: this.by_category,
+            by_variable: this.by_variable,
+            total_weight: this.total_weight
+        };
+    }
+}
+
+/**
+ * Content-addressed score cache
+ *
+ * Key = hash(scoring input) | hash(profile) | hash(custom weights) | engine fingerprint,
+ * so an edited property, a different profile or a changed VARIABLE_SYSTEM
+ * simply misses. Entries hold only overall / by_category / total_weight;
+ * by_variable is recomputed on first access. LRU-bounded in memory
+ * (Map insertion order) and persisted to the score_cache IndexedDB store.
+ */
+class ScoreCache {
+    constructor(dataManager, scoringEngine, options = {}) {
+        this.dataManager = dataManager;
+        this.scoringEngine = scoringEngine;
+        this.maxEntries = options.maxEntries || 100000;
+        this.storeName = dataManager?.cacheStores?.scoreCache || null;
+
+        this.entries = new Map();       // key -> entry, least recently used first
+        this.byProperty = new Map();    // property_id -> Set of keys
+        this.pendingPuts = new Map();
+        this.pendingDeletes = new Set();
+        this.hits = 0;
+        this.misses = 0;
+
+        // Scores depend on the engine config and (via roof_age) the current year
+        this.fingerprint = hashString(JSON.stringify({
+            variables: scoringEngine.getVariableSystem(),
+            profiles: scoringEngine.getWeightProfiles(),
+            year: new Date().getFullYear()
+        }));
+        this.keySuffixes = new Map();
+    }
+
+    /**
+     * Load persisted entries (oldest first, so LRU order survives reloads)
+     */
+    async load() {
+        if (!this.persistent()) return 0;
+
+        const stored = await this.dataManager.getAll(this.storeName);
+        const stale = [];
+        stored.sort((a, b) => a.last_used - b.last_used);
+        for (const entry of stored) {
+            if (entry.fingerprint !== this.fingerprint) {
+                stale.push(entry.key);
+                continue;
+            }
+            this.remember(entry);
+        }
+        stale.forEach(key => this.pendingDeletes.add(key));
+        this.evict();
+        return this.entries.size;
+    }
+
+    persistent() {
+        return Boolean(this.storeName && this.dataManager?.db?.objectStoreNames?.contains(this.storeName));
+    }
+
+    keyFor(scoringInput, profileType, customWeights = {}) {
+        // Profile/weights part is the same for a whole batch: hash it once
+        const settings = typeof profileType === 'string' ? profileType : stableStringify(profileType);
+        const weights = stableStringify(customWeights || {});
+        const settingsKey = settings + '\u0000' + weights;
+        let suffix = this.keySuffixes.get(settingsKey);
+        if (!suffix) {
+            suffix = hashString(settingsKey) + '|' + this.fingerprint;
+            this.keySuffixes.set(settingsKey, suffix);
+        }
+        // transformForScoring always builds keys in the same order, so plain JSON is stable
+        return hashString(JSON.stringify(scoringInput)) + '|' + suffix;
+    }
+
+    get(key) {
+        const entry = this.entries.get(key);
+        if (!entry) {
+            this.misses++;
+            return undefined;
+        }
+        // Move to most recently used, and persist that on the next flush (load() orders by last_used)
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        entry.last_used = Date.now();
+        this.pendingPuts.set(key, entry);
+        this.hits++;
+        return entry;
+    }
+
+    set(key, propertyId, scores) {
+        const by_category = {};
+        for (const [category, data] of Object.entries(scores.by_category)) {
+            by_category[category] = { score: data.score, weight: data.weight };
+        }
+        const entry = {
+            key,
+            property_id: propertyId,
+            fingerprint: this.fingerprint,
+            overall: scores.overall,
+            total_weight: scores.total_weight,
+            by_category,
+            last_used: Date.now()
+        };
+        this.remember(entry);
+        this.pendingPuts.set(key, entry);
+        this.pendingDeletes.delete(key);
+        this.evict();
+    }
+
+    remember(entry) {
+        this.entries.delete(entry.key);
+        this.entries.set(entry.key, entry);
+        if (!this.byProperty.has(entry.property_id)) {
+            this.byProperty.set(entry.property_id, new Set());
+        }
+        this.byProperty.get(entry.property_id).add(entry.key);
+    }
+
+    forget(key) {
+        const entry = this.entries.get(key);
+        if (!entry) return;
+        this.entries.delete(key);
+        const keys = this.byProperty.get(entry.property_id);
+        if (keys) {
+            keys.delete(key);
+            if (keys.size === 0) this.byProperty.delete(entry.property_id);
+        }
+        this.pendingPuts.delete(key);
+        this.pendingDeletes.add(key);
+    }
+
+    evict() {
+        while (this.entries.size > this.maxEntries) {
+            this.forget(this.entries.keys().next().value);
+        }
+    }
+
+    /**
+     * Drop every entry for a property (all profiles), or everything when propertyId is null
+     */
+    invalidate(propertyId) {
+        if (propertyId === null || propertyId === undefined) {
+            for (const key of this.entries.keys()) this.pendingDeletes.add(key);
+            this.entries.clear();
+            this.byProperty.clear();
+            this.pendingPuts.clear();
+            return;
+        }
+        for (const key of [...(this.byProperty.get(propertyId) || [])]) {
+            this.forget(key);
+        }
+    }
+
+    /**
+     * Scores object shaped like calculateScore's; by_variable is computed lazily
+     */
+    hydrate(entry, recompute) {
+        return new CachedScores(entry, recompute);
+    }
+
+    /**
+     * Write pending puts/deletes in one transaction
+     */
+    async flush() {
+        if (!this.persistent() || (this.pendingPuts.size === 0 && this.pendingDeletes.size === 0)) {
+            return false;
+        }
+        const puts = [...this.pendingPuts.values()];
+        const deletes = [...this.pendingDeletes];
+        this.pendingPuts.clear();
+        this.pendingDeletes.clear();
+        await this.dataManager.bulkWrite(this.storeName, puts, deletes);
+        return true;
+    }
+
+    stats() {
+        return { entries: this.entries.size, hits: this.hits, misses: this.misses };
+    }
+}
+
 class SharedDataAdapter {
     constructor() {
         this.dataManager = null;
         this.scoringEngine = null;
+        this.scoreCache = null;
         this.initialized = false;
     }
 
@@ -29,6 +268,15 @@ class SharedDataAdapter {
             // Initialize scoring engine
             this.scoringEngine = scoringEngine;
 
+            // Score cache: persisted entries, dropped when a property changes
+            this.scoreCache = new ScoreCache(this.dataManager, this.scoringEngine);
+            try {
+                await this.scoreCache.load();
+            } catch (error) {
+                console.warn('⚠️ Score cache could not be loaded, starting empty:', error);
+            }
+            this.dataManager.onPropertyChange(propertyId => this.scoreCache.invalidate(propertyId));
+
             this.initialized = true;
             console.log('✅ SharedDataAdapter initialized');
         } catch (error) {
@@ -48,50 +296,74 @@ class SharedDataAdapter {
     /**
      * Get properties with scores calculated
      * @param {string} profileType - Weight profile (investor, family, etc.)
+     * @param {Object} customWeights - Optional per-variable weight overrides
      * @returns {Array} Properties with computed scores
      */
-    async getPropertiesWithScores(profileType = 'balanced') {
+    async getPropertiesWithScores(profileType = 'balanced', customWeights = {}) {
         await this.ensureInitialized();
 
         const properties = await this.dataManager.getAllProperties();
-
-        return properties.map(property => {
-            // Transform CSV to scoring engine format with ALL fields it expects
-            const transformed = {
-                bedrooms: property.basic?.bedrooms || 0,
-                bathrooms: { total: property.basic?.bathrooms || 0 },
-                square_feet: {
-                    living: property.basic?.squareFeet || 0,
-                    lot: property.basic?.lotSize || 0
-                },
-                year_built: property.basic?.yearBuilt || 2000,
-                property_type: property.basic?.propertyType || 'single_family',
-                price: { current: property.financial?.listingPrice || 0 },
-                days_on_market: { current: property.financial?.daysOnMarket || 0 },
-                taxes: { annual_amount: property.financial?.annualTaxes || 0 },
-                hoa_fees: { monthly: property.financial?.hoaFees || 0 },
-                address: {
-                    latitude: property.location?.latitude || 0,
-                    longitude: property.location?.longitude || 0,
-                    city: property.location?.city || '',
-                    state: property.location?.state || ''
-                },
-                features: {
-                    interior: property.features?.interior || [],
-                    exterior: property.features?.exterior || []
-                },
-                garage_spaces: 0,
-                stories: 1
-            };
+        const cache = this.scoreCache;
+
+        const scored = properties.map(property => {
+            const transformed = this.transformForScoring(property);
+            const key = cache.keyFor(transformed, profileType, customWeights);
+            const cached = cache.get(key);
+
+            if (cached) {
+                return {
+                    ...property,
+                    computed_scores: cache.hydrate(cached, () =>
+                        this.scoringEngine.calculateScore(transformed, profileType, customWeights))
+                };
+            }
 
             // Calculate scores using weighted engine
-            const scores = this.scoringEngine.calculateScore(transformed, profileType);
+            const scores = this.scoringEngine.calculateScore(transformed, profileType, customWeights);
+            cache.set(key, property.property_id, scores);
 
             return {
                 ...property,
                 computed_scores: scores
             };
         });
+
+        // Persist new entries in the background; a failed write only costs a recompute later
+        cache.flush().catch(error => console.warn('⚠️ Score cache flush failed:', error));
+
+        return scored;
+    }
+
+    /**
+     * Transform CSV to scoring engine format with ALL fields it expects
+     */
+    transformForScoring(property) {
+        return {
+            bedrooms: property.basic?.bedrooms || 0,
+            bathrooms: { total: property.basic?.bathrooms || 0 },
+            square_feet: {
+                living: property.basic?.squareFeet || 0,
+                lot: property.basic?.lotSize || 0
+            },
+            year_built: property.basic?.yearBuilt || 2000,
+            property_type: property.basic?.propertyType || 'single_family',
+            price: { current: property.financial?.listingPrice || 0 },
+            days_on_market: { current: property.financial?.daysOnMarket || 0 },
+            taxes: { annual_amount: property.financial?.annualTaxes || 0 },
+            hoa_fees: { monthly: property.financial?.hoaFees || 0 },
+            address: {
+                latitude: property.location?.latitude || 0,
+                longitude: property.location?.longitude || 0,
+                city: property.location?.city || '',
+                state: property.location?.state || ''
+            },
+            features: {
+                interior: property.features?.interior || [],
+                exterior: property.features?.exterior || []
+            },
+            garage_spaces: 0,
+            stories: 1
+        };
     }
 
     /**
@@ -438,6 +710,14 @@ class SharedDataAdapter {
         await this.ensureInitialized();
         return await this.dataManager.getStats();
     }
+
+    /**
+     * Maintained counts, group counts and price aggregates (see DataManager.getAggregates)
+     */
+    async getAggregates() {
+        await this.ensureInitialized();
+        return this.dataManager.getAggregates();
+    }
 }
 
 // Create singleton instance
@@ -446,4 +726,5 @@ const sharedDataAdapter = new SharedDataAdapter();
 // Export for use in enhancements
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = SharedDataAdapter;
+    module.exports.ScoreCache = ScoreCache;
 }
@@ -0,0 +1,77 @@
+// Test script for snapshot backups: round trip, and truncated / corrupt files
+// are rejected before a restore clears or writes anything
+const fs = require('fs');
+const path = require('path');
+const assert = require('assert');
+
+// Load the scripts into this scope, as the pages do with <script> tags
+const scopedEval = eval;
+scopedEval(fs.readFileSync(path.join(__dirname, 'src/core/snapshot.js'), 'utf8') +
+    fs.readFileSync(path.join(__dirname, 'src/core/data-manager.js'), 'utf8') +
+    ';globalThis.DataManager = DataManager; globalThis.verifySnapshot = verifySnapshot;' +
+    'globalThis.writeSnapshot = writeSnapshot; globalThis.readSnapshot = readSnapshot;' +
+    'globalThis.SNAPSHOT_DEFAULTS = SNAPSHOT_DEFAULTS;');
+
+const RECORDS = 20000;
+
+async function buildSnapshot() {
+    const header = { db: 'test', db_version: 3, stores: [{ name: 'properties', keyPath: 'property_id' }] };
+    async function* sections() {
+        for (let start = 0; start < RECORDS; start += 2000) {
+            const records = [];
+            for (let i = start; i < start + 2000; i++) {
+                records.push({ property_id: `P${i}`, price: { current: 100000 + i }, city: 'Tampa' });
+            }
+            yield { store: 'properties', records };
+        }
+    }
+    const chunks = [];
+    for await (const chunk of writeSnapshot(header, sections())) chunks.push(chunk);
+    return new Uint8Array(await new Blob(chunks).arrayBuffer());
+}
+
+// DataManager with its store writes recorded instead of sent to IndexedDB
+function recordingManager() {
+    const manager = new DataManager();
+    manager.calls = [];
+    manager.clear = async (store) => { manager.calls.push(['clear', store]); };
+    manager.bulkWrite = async (store, records) => { manager.calls.push(['bulkWrite', store, records.length]); };
+    manager.notifyPropertyChange = () => {};
+    return manager;
+}
+
+async function expectRejected(bytes, label) {
+    await assert.rejects(verifySnapshot(bytes), `${label}: verifySnapshot should throw`);
+    const manager = recordingManager();
+    await assert.rejects(manager.importSnapshot(bytes, { clear: true }), `${label}: importSnapshot should throw`);
+    assert.deepStrictEqual(manager.calls, [], `${label}: nothing may be cleared or written`);
+    console.log(`✅ ${label}: rejected before any write`);
+}
+
+(async () => {
+    const bytes = await buildSnapshot();
+
+    const { counts } = await verifySnapshot(bytes);
+    assert.strictEqual(counts.properties, RECORDS);
+    const manager = recordingManager();
+    const written = await manager.importSnapshot(new Blob([bytes]).stream(), { clear: true });
+    assert.strictEqual(written.properties, RECORDS);
+    assert.deepStrictEqual(manager.calls[0], ['clear', 'properties']);
+    console.log(`✅ Round trip: ${RECORDS} records in ${bytes.length} bytes`);
+
+    await expectRejected(bytes.subarray(0, Math.floor(bytes.length * 0.8)), 'Truncated at 80%');
+    await expectRejected(bytes.subarray(0, bytes.length - 4), 'Trailer cut short');
+
+    const corrupt = bytes.slice();
+    corrupt[Math.floor(bytes.length / 2)] ^= 0xff;
+    await expectRejected(corrupt, 'Flipped payload byte');
+
+    // A trailer claiming more records than the blocks hold: {"properties":20000} -> 20009
+    const forged = bytes.slice();
+    const trailer = new TextDecoder().decode(bytes.subarray(bytes.length - 40));
+    forged[bytes.length - 40 + trailer.lastIndexOf(String(RECORDS)) + String(RECORDS).length - 1] = '9'.charCodeAt(0);
+    await expectRejected(forged, 'Trailer count mismatch');
+})().catch(error => {
+    console.error('❌', error.message);
+    process.exit(1);
+});